@@ -0,0 +1,128 @@
+"""
+* Асинхронный режим работы бота (asyncio)
+* *************************
+* Telegram-бот (AsyncTeleBot), IRC-бот (irc.client_aio) и клиент
+* ChatScript работают как задачи одного цикла событий asyncio. Быстрые
+* команды выполняются прямо в цикле событий, а блокирующие (сеть, диск,
+* процессы ОС) - в пулах потоков реестра команд, поэтому для тысяч
+* одновременных чатов не нужны тысячи потоков. Ответы отправляются
+* через общую очередь исходящих сообщений (см. SendScheduler).
+* Режим включается параметром runtime = async в секции [global].
+* Для работы режима требуется библиотека aiohttp:
+* $ pip3 install --trusted-host pypi.org --trusted-host files.pythonhosted.org aiohttp
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import asyncio
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+
+from commands import CommandRegistry
+
+DEFAULT_EXECUTOR_WORKERS: int = 16 # потоки для прочих блокирующих вызовов в цикле событий
+IRC_QUIT_TIMEOUT: float = 3 # сколько секунд максимум ждать отключения от сервера IRC после QUIT
+
+class AsyncRuntime:
+
+    def __init__(self, api_token: str, http_proxy: str, https_proxy: str, registry: CommandRegistry, outbound_bot, on_message=None, irc_factory=None, executor_workers: int = DEFAULT_EXECUTOR_WORKERS, api_url: str = ""):
+        """
+        * @param api_token Токен Telegram-бота
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        * @param registry Реестр команд
+        * @param outbound_bot Экземпляр бота, через который команды отправляют ответы
+        * @param on_message Функция, вызываемая для каждого входящего сообщения: on_message(message)
+        * @param irc_factory Функция, создающая AsyncIRCBot (None - без IRC)
+        * @param executor_workers Количество потоков для прочих блокирующих вызовов
+        * @param api_url Шаблон адреса Telegram Bot API (пустая строка - api.telegram.org)
+        """
+        self.api_token = api_token
+        self.proxy: str = https_proxy if not "".__eq__(https_proxy) else http_proxy # aiohttp принимает один proxy-сервер
+        self.registry = registry
+        self.outbound_bot = outbound_bot
+        self.on_message = on_message
+        self.irc_factory = irc_factory
+        self.executor_workers = executor_workers if executor_workers > 0 else DEFAULT_EXECUTOR_WORKERS
+        self.api_url = api_url
+        self.irc_bot = None
+        self.bot: AsyncTeleBot = None
+        self._polling: asyncio.Future = None
+        self._stopping: bool = False
+        self._tasks = set() # выполняющиеся команды (ссылки нужны, чтобы задачи не были удалены сборщиком мусора)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, message) -> None:
+        if self.on_message is not None:
+            self.on_message(message)
+        self._spawn(self.registry.dispatch_async(self.outbound_bot, message)) # опрос Telegram не ждёт выполнения команды
+
+    async def run(self) -> None:
+        """
+        * Работа бота до остановки опроса Telegram
+        """
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(self.executor_workers, thread_name_prefix="AsyncExecutor"))
+        if self.proxy:
+            asyncio_helper.proxy = self.proxy
+        if self.api_url:
+            asyncio_helper.API_URL = self.api_url
+        self.bot = AsyncTeleBot(self.api_token)
+        self.bot.register_message_handler(self._handle, content_types=["text"])
+        if self.irc_factory is not None:
+            self.irc_bot = self.irc_factory()
+            if self.irc_bot is not None:
+                self._spawn(self.irc_bot.connect_async())
+        self._polling = asyncio.ensure_future(self.bot.polling(non_stop=True, interval=0))
+        try:
+            await self._polling
+        except asyncio.CancelledError:
+            if not self._stopping: # отмена не через stop() (например, Ctrl+C)
+                raise
+        finally:
+            await self.shutdown()
+
+    def stop(self) -> None:
+        """
+        * Остановка опроса Telegram без ожидания текущего запроса getUpdates
+        * (вызывается из цикла событий; после остановки run() отключается от сервера IRC
+        * и завершается, а start() возвращает управление)
+        """
+        self._stopping = True
+        if self._polling is not None:
+            self._polling.cancel()
+
+    async def shutdown(self) -> None:
+        """
+        * Завершение выполняющихся команд и отключение от сервера IRC
+        """
+        if self.irc_bot is not None and self.irc_bot.is_connected:
+            try:
+                self.irc_bot.connection.quit()
+                await asyncio.get_running_loop().run_in_executor(None, self.irc_bot.disconnected.wait, IRC_QUIT_TIMEOUT) # без ожидания полного таймаута
+            except Exception as e:
+                print(f"Ошибка при отключении от сервера IRC: {e}")
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=IRC_QUIT_TIMEOUT)
+        if self.bot is not None:
+            await self.bot.close_session()
+
+    def start(self) -> None:
+        """
+        * Запуск цикла событий (возврат - после остановки бота)
+        """
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt: # перехват Ctrl+C
+            pass
+        except Exception as e:
+            print(f"Ошибка в асинхронном режиме работы бота: {e}")
+            traceback.print_exc()
@@ -0,0 +1,423 @@
+"""
+* Сквозной нагрузочный тест бота
+* *************************
+* Запускаются локальные имитаторы Telegram Bot API (fake_telegram.py),
+* сервера ChatScript (fake_chatscript.py) и сервера IRC (fake_irc.py),
+* а бот (main.py) - отдельным процессом во временном каталоге со своим
+* файлом настроек, в котором api_url указывает на имитатор Telegram.
+* Затем с заданной частотой в бот отправляется смесь сообщений (hello,
+* /date, /irc, /phrase и произвольный текст для ChatScript). Каждое
+* сообщение отправляется из нового чата, поэтому время ответа - это
+* время от постановки сообщения в очередь getUpdates до получения
+* имитатором первого ответа в этот чат.
+* В результате выводятся пропускная способность (сообщений в секунду),
+* p50/p99 времени ответа (всего и по видам сообщений), загрузка CPU
+* и память процесса бота (если установлена библиотека psutil).
+* Результаты сохраняются в JSON-файл для сравнения запусков.
+* Пример запуска:
+* $ python3 bench_e2e.py --rate 50 --duration 30 --mix "hello=1,date=1,irc=1,phrase=1,chatscript=2"
+* $ python3 bench_e2e.py --rate 50 --duration 30 --compare bench_results/e2e_20261018_120000.json
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from fake_chatscript import FakeChatScriptServer
+from fake_irc import FakeIRCServer
+from fake_telegram import FakeTelegramServer, SentMessage
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SCRIPT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILE: str = "settings.ini"
+SETTINGS_CODEPAGE: str = "cp1251"
+PHRASE_FILE: str = "phrase.txt"
+BOT_LOG_FILE: str = "bot.log" # вывод процесса бота (в рабочем каталоге теста)
+DEFAULT_MIX: str = "hello=1,date=1,irc=1,phrase=1,chatscript=1"
+DEFAULT_RESULTS_DIR: str = "bench_results"
+FIRST_CHAT_ID: int = 1000000 # идентификаторы чатов, из которых отправляются сообщения
+QUIT_CHAT_ID: int = 999999
+MESSAGES = { # вид сообщения -> текст
+    "hello": "hello",
+    "date": "/date",
+    "irc": "/irc",
+    "phrase": "/phrase",
+    "chatscript": "Привет! Как дела?"
+}
+SETTINGS_TEMPLATE: str = """[global]
+api_token = 123456:bench
+debug = {debug}
+runtime = {runtime}
+
+[proxy]
+http = DIRECT
+https = DIRECT
+
+[telegram]
+global_rate = 100000
+chat_rate = 100
+group_rate = 6000
+chat_burst = 100
+send_workers = {send_workers}
+api_url = {api_url}
+
+[irc]
+channel = #bench
+nickname = your_friendly_bot
+server = 127.0.0.1
+port = {irc_port}
+flush_interval = 1.0
+
+[chatscript]
+server = 127.0.0.1
+port = {chatscript_port}
+
+[rss]
+feeds =
+
+[phrase]
+files = {phrase_file}
+
+[jokes]
+languages =
+
+[metrics]
+enabled = Y
+listen = 127.0.0.1
+port = {metrics_port}
+"""
+
+class LatencyRecorder:
+    """
+    * Учёт времени ответа бота на каждое отправленное сообщение
+    """
+
+    def __init__(self):
+        self.injected = {} # чат -> (вид сообщения, время отправки)
+        self.latencies = {} # вид сообщения -> список времён ответа (в секундах)
+        self.first_injected: float = 0.0
+        self.last_answered: float = 0.0
+        self.answered: int = 0
+        self._lock = threading.Lock()
+
+    def injected_at(self, chat_id: int, kind: str) -> None:
+        with self._lock:
+            now: float = time.perf_counter()
+            self.injected[chat_id] = (kind, now)
+            if self.first_injected == 0.0:
+                self.first_injected = now
+
+    def on_sent(self, sent: SentMessage) -> None:
+        with self._lock:
+            pending = self.injected.pop(sent.chat_id, None) # учитывается только первый ответ в чат
+            if pending is None:
+                return
+            kind, injected = pending
+            self.latencies.setdefault(kind, []).append(sent.received_at - injected)
+            self.answered += 1
+            self.last_answered = sent.received_at
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self.injected)
+
+class ResourceSampler:
+    """
+    * Периодический замер загрузки CPU и памяти процесса бота (через psutil)
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.interval = interval
+        self.cpu = [] # загрузка CPU (в процентах одного ядра)
+        self.rss = [] # резидентная память (в байтах)
+        self.threads = [] # количество потоков
+        self._process = psutil.Process(pid) if psutil is not None else None
+        self._stopping = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self) -> "ResourceSampler":
+        if self._process is not None:
+            self._process.cpu_percent(None) # первый вызов только запоминает счётчики
+            self._thread = threading.Thread(target=self._run, name="ResourceSampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                with self._process.oneshot():
+                    self.cpu.append(self._process.cpu_percent(None))
+                    self.rss.append(self._process.memory_info().rss)
+                    self.threads.append(self._process.num_threads())
+            except psutil.Error:
+                return
+
+def parse_mix(text: str) -> list:
+    """
+    * Разбор смеси сообщений вида "hello=1,date=2,chatscript=3"
+    *
+    * @return Список пар (вид сообщения, вес)
+    """
+    mix = []
+    for item in text.split(","):
+        if "".__eq__(item.strip()):
+            continue
+        kind, _, weight = item.partition("=")
+        kind = kind.strip().lower().lstrip("/")
+        if kind not in MESSAGES:
+            raise ValueError(f"Неизвестный вид сообщения {kind!r} (допустимые: {', '.join(MESSAGES)})")
+        mix.append((kind, float(weight) if weight.strip() else 1.0))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError("Смесь сообщений пуста")
+    return mix
+
+def percentile(values: list, q: float) -> float:
+    """
+    * Квантиль по отсортированному списку (ближайший ранг)
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q * len(values))) - 1))]
+
+def latency_summary(values: list) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "avg_ms": sum(values) * 1000 / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0
+    }
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def prepare_workdir(args, telegram: FakeTelegramServer, chatscript: FakeChatScriptServer, irc: FakeIRCServer, metrics_port: int) -> str:
+    """
+    * Создание рабочего каталога бота с файлом настроек для имитаторов
+    """
+    workdir: str = tempfile.mkdtemp(prefix="bench_e2e_")
+    shutil.copy(os.path.join(SCRIPT_DIR, PHRASE_FILE), os.path.join(workdir, PHRASE_FILE))
+    settings_text: str = SETTINGS_TEMPLATE.format(
+        debug="Y" if args.debug else "N",
+        runtime=args.runtime,
+        send_workers=args.send_workers,
+        api_url=telegram.api_url,
+        irc_port=irc.port,
+        chatscript_port=chatscript.port,
+        phrase_file=PHRASE_FILE,
+        metrics_port=metrics_port
+    )
+    with open(os.path.join(workdir, SETTINGS_FILE), "w", encoding=SETTINGS_CODEPAGE, newline="\r\n") as f:
+        f.write(settings_text)
+    return workdir
+
+def fetch_metrics(port: int) -> str:
+    """
+    * Метрики бота в формате Prometheus (пустая строка, если сервер метрик недоступен)
+    """
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            return response.read().decode("utf-8")
+    except OSError:
+        return ""
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def wait_for(condition, timeout: float) -> bool:
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return condition()
+
+def drive(telegram: FakeTelegramServer, recorder: LatencyRecorder, mix: list, rate: float, duration: float, seed: int) -> int:
+    """
+    * Отправка сообщений в бот с заданной частотой
+    *
+    * @return Количество отправленных сообщений
+    """
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in mix]
+    weights = [weight for _, weight in mix]
+    total: int = int(rate * duration)
+    started: float = time.perf_counter()
+    for number in range(total):
+        delay: float = started + number / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        kind: str = rng.choices(kinds, weights)[0]
+        chat_id: int = FIRST_CHAT_ID + number
+        recorder.injected_at(chat_id, kind)
+        telegram.inject(chat_id, MESSAGES[kind])
+    return total
+
+def stop_bot(process: subprocess.Popen, telegram: FakeTelegramServer, timeout: float) -> None:
+    """
+    * Остановка бота командой /quit (при неудаче - завершение процесса)
+    """
+    telegram.inject(QUIT_CHAT_ID, "/quit")
+    try:
+        process.wait(timeout)
+        return
+    except subprocess.TimeoutExpired:
+        process.terminate()
+    try:
+        process.wait(5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def print_results(results: dict) -> None:
+    print(f"Отправлено сообщений: {results['sent']}, получено ответов: {results['answered']}, без ответа: {results['unanswered']}.")
+    print(f"Пропускная способность: {results['msgs_per_sec']:.1f} сообщений/с (заданная частота: {results['rate']:.1f}).")
+    print(f"{'вид сообщения':<14} {'ответов':>8} {'сред., мс':>10} {'p50, мс':>10} {'p99, мс':>10} {'макс., мс':>10}")
+    for kind, summary in sorted(results["latency"].items()):
+        print(f"{kind:<14} {summary['count']:>8} {summary['avg_ms']:>10.1f} {summary['p50_ms']:>10.1f} {summary['p99_ms']:>10.1f} {summary['max_ms']:>10.1f}")
+    resources = results["resources"]
+    if resources:
+        print(f"CPU: в среднем {resources['cpu_avg']:.1f}%, максимум {resources['cpu_max']:.1f}%; память (RSS): максимум {resources['rss_max_mb']:.1f} МБ; потоков: максимум {resources['threads_max']}.")
+    else:
+        print("Загрузка CPU и память не измерялись (не установлена библиотека psutil).")
+
+def print_comparison(results: dict, baseline: dict) -> None:
+    """
+    * Сравнение с результатами предыдущего запуска
+    """
+    rows = [
+        ("сообщений/с", results["msgs_per_sec"], baseline.get("msgs_per_sec", 0.0)),
+        ("p50, мс", results["latency"]["all"]["p50_ms"], baseline.get("latency", {}).get("all", {}).get("p50_ms", 0.0)),
+        ("p99, мс", results["latency"]["all"]["p99_ms"], baseline.get("latency", {}).get("all", {}).get("p99_ms", 0.0))
+    ]
+    if results["resources"] and baseline.get("resources"):
+        rows.append(("CPU в среднем, %", results["resources"]["cpu_avg"], baseline["resources"]["cpu_avg"]))
+        rows.append(("RSS максимум, МБ", results["resources"]["rss_max_mb"], baseline["resources"]["rss_max_mb"]))
+    print(f"Сравнение с запуском {baseline.get('started_at', '?')} (ревизия {baseline.get('revision', '?') or '?'}):")
+    for name, value, base in rows:
+        change: str = f"{(value - base) * 100 / base:+.1f}%" if base else "-"
+        print(f"  {name:<18} {base:>10.1f} -> {value:>10.1f} ({change})")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сквозной нагрузочный тест бота")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"смесь сообщений с весами (виды: {', '.join(MESSAGES)})")
+    parser.add_argument("--rate", type=float, default=20.0, help="сообщений в секунду")
+    parser.add_argument("--duration", type=float, default=30.0, help="длительность отправки сообщений (в секундах)")
+    parser.add_argument("--drain", type=float, default=30.0, help="сколько секунд ждать оставшихся ответов")
+    parser.add_argument("--runtime", choices=("threads", "async"), default="threads", help="режим работы бота")
+    parser.add_argument("--send_workers", type=int, default=4, help="количество потоков отправки сообщений бота")
+    parser.add_argument("--chatscript_delay", type=float, default=0.0, help="задержка ответа ChatScript (в секундах)")
+    parser.add_argument("--irc_chatter", type=float, default=2.0, help="сообщений в секунду в канале IRC")
+    parser.add_argument("--startup_timeout", type=float, default=60.0, help="сколько секунд ждать запуска бота")
+    parser.add_argument("--debug", action="store_true", help="включить режим отладки бота (запись сообщений в БД)")
+    parser.add_argument("--seed", type=int, default=1, help="начальное значение генератора случайных чисел")
+    parser.add_argument("--label", default="", help="метка запуска (сохраняется в результатах)")
+    parser.add_argument("--output", default=os.path.join(SCRIPT_DIR, DEFAULT_RESULTS_DIR), help="каталог для результатов")
+    parser.add_argument("--compare", default="", help="файл результатов предыдущего запуска для сравнения")
+    parser.add_argument("--keep", action="store_true", help="не удалять рабочий каталог бота")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    if args.rate <= 0 or args.duration <= 0:
+        parser.error("Частота и длительность должны быть больше 0")
+
+    recorder = LatencyRecorder()
+    telegram = FakeTelegramServer(on_sent=recorder.on_sent).start()
+    chatscript = FakeChatScriptServer(delay=args.chatscript_delay).start()
+    irc = FakeIRCServer(chatter=args.irc_chatter).start()
+    metrics_port: int = free_port()
+    workdir: str = prepare_workdir(args, telegram, chatscript, irc, metrics_port)
+    log_file = open(os.path.join(workdir, BOT_LOG_FILE), "wb")
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPT_DIR, "main.py")], cwd=workdir, stdout=log_file, stderr=subprocess.STDOUT)
+    sampler: ResourceSampler = None
+    results: dict = None
+    try:
+        print(f"Бот запущен (PID {process.pid}, рабочий каталог {workdir}). Ожидание запуска...")
+        if not wait_for(lambda: telegram.polls > 0 or process.poll() is not None, args.startup_timeout) or process.poll() is not None:
+            print(f"Бот не начал опрос Telegram за {args.startup_timeout:.0f} с. Вывод бота: {os.path.join(workdir, BOT_LOG_FILE)}")
+            args.keep = True
+            return
+        if not irc.welcomed.is_set():
+            print("IRC-бот не подключился к имитатору IRC, /irc будет отвечать, что IRC-бот не работает.")
+        sampler = ResourceSampler(process.pid).start()
+        started_at: str = time.strftime("%Y-%m-%d %H:%M:%S")
+        print(f"Отправка {int(args.rate * args.duration)} сообщений с частотой {args.rate:.1f} в секунду...")
+        sent: int = drive(telegram, recorder, mix, args.rate, args.duration, args.seed)
+        wait_for(lambda: recorder.pending() == 0, args.drain)
+        sampler.stop()
+        elapsed: float = recorder.last_answered - recorder.first_injected
+        all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+        results = {
+            "started_at": started_at,
+            "label": args.label,
+            "revision": git_revision(),
+            "runtime": args.runtime,
+            "mix": args.mix,
+            "rate": args.rate,
+            "duration": args.duration,
+            "send_workers": args.send_workers,
+            "chatscript_delay": args.chatscript_delay,
+            "sent": sent,
+            "answered": recorder.answered,
+            "unanswered": recorder.pending(),
+            "msgs_per_sec": recorder.answered / elapsed if elapsed > 0 else 0.0,
+            "latency": dict({"all": latency_summary(all_latencies)}, **{kind: latency_summary(latencies) for kind, latencies in recorder.latencies.items()}),
+            "resources": {
+                "cpu_avg": sum(sampler.cpu) / len(sampler.cpu),
+                "cpu_max": max(sampler.cpu),
+                "rss_max_mb": max(sampler.rss) / 1048576,
+                "threads_max": max(sampler.threads)
+            } if sampler.cpu else {},
+            "telegram_requests": {"getUpdates": telegram.polls, "sent": telegram.sent_count},
+            "chatscript_requests": chatscript.requests_count,
+            "bot_metrics": fetch_metrics(metrics_port)
+        }
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        stop_bot(process, telegram, 15)
+        log_file.close()
+        telegram.stop()
+        chatscript.stop()
+        irc.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print_results(results)
+    os.makedirs(args.output, exist_ok=True)
+    results_file: str = os.path.join(args.output, f"e2e_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(results_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в файл {results_file}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+* Сравнение скорости выдачи случайной фразы
+* *************************
+* Замеряется время получения одной фразы через PhraseStore (индекс
+* смещений строк) и через Miscellaneous.get_phrase_outta_file (если
+* библиотека доступна), а также через простое чтение всего файла.
+* Пример запуска:
+* $ python3 bench_phrase.py --file phrase.txt --iterations 10000
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import random
+import time
+
+from phrasestore import PhraseStore
+
+DEFAULT_ENCODING: str = "cp1251"
+
+def read_whole_file(filename: str, encoding: str) -> str:
+    """
+    * Случайная фраза с чтением и декодированием всего файла
+    * (так фраза выбиралась до появления индекса)
+    """
+    with open(filename, "r", encoding=encoding) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return random.choice(lines) if lines else ""
+
+def measure(name: str, func, iterations: int) -> None:
+    started: float = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed: float = time.perf_counter() - started
+    print(f"{name:<40} {elapsed * 1e6 / iterations:10.2f} мкс/фраза ({iterations} повторов за {elapsed:.3f} с)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение скорости выдачи случайной фразы")
+    parser.add_argument("--file", default="phrase.txt", help="файл фраз")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING, help="кодировка файла")
+    parser.add_argument("--iterations", type=int, default=10000, help="количество повторов")
+    args = parser.parse_args()
+    store: PhraseStore = PhraseStore([args.file], args.encoding)
+    store.get_phrase() # построение индекса не входит в замер
+    measure("PhraseStore.get_phrase", store.get_phrase, args.iterations)
+    measure("PhraseStore.get_phrase (с историей чата)", lambda: store.get_phrase(1), args.iterations)
+    measure("чтение всего файла", lambda: read_whole_file(args.file, args.encoding), args.iterations)
+    try:
+        from miscellaneous import Miscellaneous
+    except ImportError as e:
+        print(f"Miscellaneous.get_phrase_outta_file недоступна: {e}")
+    else:
+        measure("Miscellaneous.get_phrase_outta_file", lambda: Miscellaneous.get_phrase_outta_file(args.file, args.encoding), args.iterations)
+
+if __name__ == "__main__":
+    main()
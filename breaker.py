@@ -0,0 +1,139 @@
+"""
+* Класс "Автоматический выключатель" (circuit breaker)
+* *************************
+* Выключатель защищает программу от долгих обращений к недоступному
+* внешнему сервису. После нескольких ошибок подряд он размыкается
+* ("open") и запросы отклоняются сразу. Фоновая проверка периодически
+* опрашивает сервис, и после его восстановления выключатель через
+* пробное состояние ("half-open") снова замыкается ("closed").
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+BreakerStats = namedtuple("BreakerStats", ["state", "trip_count", "failure_count", "last_trip", "rejected"])
+STATE_CLOSED: str = "closed" # запросы проходят
+STATE_OPEN: str = "open" # запросы отклоняются сразу
+STATE_HALF_OPEN: str = "half-open" # пропускается один пробный запрос
+DEFAULT_FAILURE_THRESHOLD: int = 3 # количество ошибок подряд, после которого выключатель размыкается
+DEFAULT_PROBE_INTERVAL: float = 5.0 # интервал фоновой проверки сервиса (в секундах)
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, probe = None, on_recover = None, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, probe_interval: float = DEFAULT_PROBE_INTERVAL):
+        """
+        * @param name Имя защищаемого сервиса (для сообщений в консоль)
+        * @param probe Функция без параметров, возвращающая True, если сервис доступен
+        * @param on_recover Функция, вызываемая при восстановлении сервиса (должна вернуть True при успехе)
+        * @param failure_threshold Количество ошибок подряд до размыкания
+        * @param probe_interval Интервал фоновой проверки (в секундах)
+        """
+        self.name = name
+        self.probe = probe
+        self.on_recover = on_recover
+        self.failure_threshold = failure_threshold if failure_threshold > 0 else DEFAULT_FAILURE_THRESHOLD
+        self.probe_interval = probe_interval if probe_interval > 0 else DEFAULT_PROBE_INTERVAL
+        self.state: str = STATE_CLOSED
+        self.trip_count: int = 0 # сколько раз выключатель размыкался
+        self.failure_count: int = 0 # количество ошибок подряд
+        self.last_trip: float = 0.0 # время последнего размыкания (Unix time)
+        self.rejected: int = 0 # количество запросов, отклонённых без обращения к сервису
+        self._trial_in_progress: bool = False
+        self._lock = threading.Lock()
+        self._probing: bool = False # работает ли фоновая проверка
+
+    def allow(self) -> bool:
+        """
+        * Можно ли обращаться к сервису прямо сейчас
+        *
+        * @return True, если запрос разрешён
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """
+        * Регистрация успешного обращения к сервису
+        """
+        with self._lock:
+            self.failure_count = 0
+            self._trial_in_progress = False
+            if self.state != STATE_CLOSED:
+                self._set_state(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        * Регистрация ошибки при обращении к сервису
+        """
+        with self._lock:
+            self.failure_count += 1
+            self._trial_in_progress = False
+            if self.state == STATE_HALF_OPEN or (self.state == STATE_CLOSED and self.failure_count >= self.failure_threshold):
+                self._trip()
+
+    def release_trial(self) -> None:
+        """
+        * Отмена пробного обращения без результата (например, запрос отменён при остановке)
+        * (состояние не меняется - следующий запрос в HALF_OPEN снова станет пробным)
+        """
+        with self._lock:
+            self._trial_in_progress = False
+
+    def trip(self) -> None:
+        """
+        * Принудительное размыкание (например, если сервис недоступен при запуске)
+        """
+        with self._lock:
+            if self.state != STATE_OPEN:
+                self._trip()
+
+    def stats(self) -> BreakerStats:
+        """
+        * Состояние выключателя для мониторинга
+        *
+        * @return Состояние, количество размыканий, ошибок подряд, время последнего размыкания, отклонённых запросов
+        """
+        return BreakerStats(self.state, self.trip_count, self.failure_count, self.last_trip, self.rejected)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        print(f"Сервис {self.name}: выключатель переведён в состояние {chr(34)}{state}{chr(34)}.")
+
+    def _trip(self) -> None:
+        self.trip_count += 1
+        self.last_trip = time.time()
+        self._set_state(STATE_OPEN)
+        if self.probe is not None and not self._probing:
+            self._probing = True
+            threading.Thread(target=self._probe_loop, name=f"CircuitBreaker({self.name})", daemon=True).start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self.state != STATE_OPEN:
+                    self._probing = False
+                    return
+            try:
+                recovered: bool = bool(self.probe()) and (self.on_recover is None or bool(self.on_recover()))
+            except Exception as e:
+                print(f"Сервис {self.name}: ошибка при проверке доступности: {e}")
+                recovered = False
+            with self._lock:
+                if self.state != STATE_OPEN or recovered:
+                    if self.state == STATE_OPEN:
+                        self.failure_count = 0
+                        self._set_state(STATE_HALF_OPEN)
+                    self._probing = False
+                    return
@@ -5,6 +5,9 @@
 * обеспечения работоспособности бота в сети IRC (RFC 1459).
 * Для работы программы требуется Python 3.
 * https://github.com/ChatScript/ChatScript
+* Помимо синхронного клиента (ChatScript) имеется асинхронный
+* клиент (AsyncChatScript) с ограничением числа одновременных
+* запросов, который можно вызывать и из обычного потока.
 * Программа является кроссплатформенной. Она должна работать
 * под Microsoft Windows, Linux, macOS и т.д.
 *
@@ -14,12 +17,26 @@
 from socket import socket, AF_INET, SOCK_STREAM, timeout, gaierror
 from collections import namedtuple
 import re
+import asyncio
+import threading
+import time
+import weakref
+
+from breaker import CircuitBreaker, DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL
+from metrics import get_metrics
 
 ConnChatScript = namedtuple("ConnChatScript", ["host", "port", "timeout", "bot_name", "username"])
 DEFAULT_HOST: str = "localhost"
 DEFAULT_PORT: int = 1024
 CODEPAGE: str = "utf-8"
 NULL_BYTE = b'\x00'
+COMMAND_PATTERN = re.compile(r'^:[a-zA-Z]+(\s+.*)?$') # шаблон команды ChatScript
+DEFAULT_MAX_CONCURRENCY: int = 8 # максимальное количество одновременных запросов к серверу
+DEFAULT_CONNECT_TIMEOUT: float = 5 # время ожидания подключения к серверу (в секундах)
+DEFAULT_READ_TIMEOUT: float = 30 # время ожидания данных от сервера (в секундах)
+DEFAULT_BUFFER_SIZE: int = 4096 # начальный размер буфера для ответа сервера
+DEFAULT_PROBE_TIMEOUT: float = 2 # время ожидания при фоновой проверке сервера (в секундах)
+ERROR_PREFIXES = ("Error:", "An error occurred", "Timeout", "Connection reset") # ответы клиента при ошибке
 
 class ChatScript:
 
@@ -40,6 +57,12 @@ class ChatScript:
         * @param message_text Текст отправляемого сообщения
         * @return Текст сообщения от сервера
         """
+        started: float = time.perf_counter()
+        reply: str = self._send_message(message_text)
+        get_metrics().observe("chatscript_request_seconds", time.perf_counter() - started, reply is None or reply.startswith(ERROR_PREFIXES), client="sync")
+        return reply
+
+    def _send_message(self, message_text: str) -> str:
         if self.conn is not None:
             try:
                 message_to_send = (self.conn.username.encode(CODEPAGE) + NULL_BYTE + self.conn.bot_name.encode(CODEPAGE) + NULL_BYTE + message_text.encode(CODEPAGE) + NULL_BYTE)
@@ -47,7 +70,7 @@ class ChatScript:
                     sock.settimeout(self.conn.timeout)
                     sock.connect((self.conn.host, self.conn.port))
                     sock.sendall(message_to_send)
-                    response_bytes = b''
+                    response_bytes = bytearray()
                     while True:
                         try:
                             chunk = sock.recv(128) # читаем по 128 байт
@@ -77,8 +100,7 @@ class ChatScript:
         * @param input_string Строка для проверки
         * @return True, если строка является командой, False в противном случае
         """
-        command_pattern = re.compile(r'^:[a-zA-Z]+(\s+.*)?$')
-        return bool(command_pattern.match(input_string))
+        return bool(COMMAND_PATTERN.match(input_string))
 
     def send_user_message(self, message_text: str) -> str:
         """
@@ -105,7 +127,7 @@ class ChatScript:
                 sock.settimeout(self.conn.timeout)
                 sock.connect((self.conn.host, self.conn.port))
                 is_running = True
-            except Exception as e:
+            except Exception:
                 pass
             finally:
                 sock.close()
@@ -142,3 +164,239 @@ class ChatScript:
         * @return Текст сообщения от сервера
         """
         return self.send_message(":restart")
+
+class AsyncChatScript:
+    """
+    * Асинхронный клиент ChatScript
+    * (использует те же параметры подключения ConnChatScript и тот же протокол)
+    """
+
+    conn: ConnChatScript = None
+    _loop: asyncio.AbstractEventLoop = None # фоновый цикл событий для вызовов из обычных потоков
+    _loop_lock = threading.Lock()
+
+    def __init__(self, conn: ConnChatScript, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.conn = conn
+        self.max_concurrency = max_concurrency if max_concurrency > 0 else DEFAULT_MAX_CONCURRENCY
+        self.connect_timeout = connect_timeout if connect_timeout > 0 else DEFAULT_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout if read_timeout > 0 else DEFAULT_READ_TIMEOUT
+        self.buffer_size = buffer_size if buffer_size > 0 else DEFAULT_BUFFER_SIZE
+        self.in_flight: int = 0 # количество выполняющихся в данный момент запросов
+        self._semaphores = weakref.WeakKeyDictionary() # семафор для каждого цикла событий
+
+    @classmethod
+    def from_client(cls, client: ChatScript, **kwargs) -> "AsyncChatScript":
+        """
+        * Создание асинхронного клиента с параметрами синхронного клиента
+        *
+        * @param client Экземпляр синхронного клиента ChatScript
+        * @return Асинхронный клиент
+        """
+        return cls(client.conn, **kwargs)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _exchange(self, data: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        with socket(AF_INET, SOCK_STREAM) as sock:
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (self.conn.host, self.conn.port)), self.connect_timeout)
+            await asyncio.wait_for(loop.sock_sendall(sock, data), self.read_timeout)
+            buffer = bytearray(self.buffer_size) # ответ читается в заранее выделенный буфер
+            size: int = 0
+            while True:
+                if size == len(buffer): # буфер заполнен - увеличиваем вдвое
+                    buffer.extend(bytes(len(buffer)))
+                with memoryview(buffer) as view, view[size:] as free_space:
+                    received: int = await asyncio.wait_for(loop.sock_recv_into(sock, free_space), self.read_timeout)
+                if received == 0: # соединение закрыто сервером
+                    break
+                size += received
+            return buffer[:size].decode(CODEPAGE, errors='replace')
+
+    async def request(self, message_text: str) -> str:
+        """
+        * Отправка сообщения на сервер ChatScript
+        * (в отличие от send_message() ошибки не перехватываются)
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера
+        """
+        message_to_send = (self.conn.username.encode(CODEPAGE) + NULL_BYTE + self.conn.bot_name.encode(CODEPAGE) + NULL_BYTE + message_text.encode(CODEPAGE) + NULL_BYTE)
+        async with self._semaphore():
+            self.in_flight += 1
+            started: float = time.perf_counter()
+            failed: bool = True
+            try:
+                reply: str = await self._exchange(message_to_send)
+                failed = False
+                return reply
+            finally:
+                self.in_flight -= 1
+                get_metrics().observe("chatscript_request_seconds", time.perf_counter() - started, failed, client="async")
+
+    async def send_message(self, message_text: str) -> str:
+        """
+        * Отправка сообщения на сервер ChatScript и получение ответа от сервера
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера
+        """
+        if self.conn is None:
+            return ""
+        try:
+            return await self.request(message_text)
+        except gaierror:
+            return f"Error: Address-related error occurred. Could not resolve host '{self.conn.host}'."
+        except ConnectionRefusedError:
+            return f"Error: Connection refused. Is the ChatScript server running at {self.conn.host}:{self.conn.port}?"
+        except (asyncio.TimeoutError, timeout):
+            return "Error: Connection timed out."
+        except ConnectionResetError:
+            return "Connection reset by peer."
+        except BrokenPipeError:
+            return "Error: Broken pipe. The connection was unexpectedly closed."
+        except Exception as e:
+            return f"An error occurred: {e}"
+
+    def is_command(self, input_string: str) -> bool:
+        """
+        * Проверяет, является ли входная строка командой ChatScript
+        *
+        * @param input_string Строка для проверки
+        * @return True, если строка является командой, False в противном случае
+        """
+        return bool(COMMAND_PATTERN.match(input_string))
+
+    async def send_user_message(self, message_text: str) -> str:
+        """
+        * Пользовательское сообщение для сервер ChatScript
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера
+        """
+        reply: str = ""
+        if not self.is_command(message_text): # если не команда, то отправляем на сервер
+            reply = await self.send_message(message_text)
+        return reply
+
+    async def is_server_running(self) -> bool:
+        """
+        * Проверка доступности сервера ChatScript
+        *
+        * @return True, если сервер работает, False в противном случае
+        """
+        if self.conn is None:
+            return False
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.conn.host, self.conn.port), self.connect_timeout)
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except Exception:
+            return False
+
+    async def server_reset(self) -> str:
+        """
+        * System Control commands: Start user all over again, flushing his history
+        *
+        * @return Текст сообщения от сервера
+        """
+        return await self.send_message(":reset")
+
+    @classmethod
+    def _background_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._loop_lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="AsyncChatScript", daemon=True).start()
+                cls._loop = loop
+            return cls._loop
+
+    def run_sync(self, coroutine):
+        """
+        * Выполнение сопрограммы клиента из обычного (не асинхронного) потока
+        * (нельзя вызывать из потока, в котором работает цикл событий)
+        *
+        * @param coroutine Сопрограмма
+        * @return Результат сопрограммы
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._background_loop()).result()
+
+    def send_user_message_sync(self, message_text: str) -> str:
+        """
+        * Пользовательское сообщение для сервер ChatScript (вызов из обычного потока)
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера
+        """
+        return self.run_sync(self.send_user_message(message_text))
+
+class ChatScriptGuard:
+    """
+    * Клиент ChatScript, защищённый автоматическим выключателем
+    * (пока сервер недоступен, запросы сразу отклоняются, а фоновая
+    * проверка ждёт его восстановления и заново инициализирует бота)
+    """
+
+    def __init__(self, client: AsyncChatScript, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, probe_interval: float = DEFAULT_PROBE_INTERVAL, probe_timeout: float = DEFAULT_PROBE_TIMEOUT):
+        self.client = client
+        self.probe_client = ChatScript(client.conn.host, client.conn.port, probe_timeout, client.conn.bot_name, client.conn.username)
+        self.needs_reset: bool = False # требуется ли повторная инициализация бота (:reset) после сбоя
+        self.breaker = CircuitBreaker("ChatScript", self.probe_client.is_server_running, self._recover, failure_threshold, probe_interval)
+
+    def _recover(self) -> bool:
+        if not self.needs_reset:
+            return True
+        reply: str = self.probe_client.server_reset()
+        if "".__eq__(reply) or reply.startswith(ERROR_PREFIXES):
+            return False
+        self.needs_reset = False
+        print(f"Бот ChatScript проинициализирован повторно. Получен ответ от сервера: {chr(34)}{reply}{chr(34)}.")
+        return True
+
+    def mark_down(self, needs_reset: bool = True) -> None:
+        """
+        * Сервер недоступен (например, при запуске) - ждать его в фоне
+        *
+        * @param needs_reset Выполнить :reset после восстановления сервера
+        """
+        self.needs_reset = self.needs_reset or needs_reset
+        self.breaker.trip()
+
+    async def send_user_message(self, message_text: str) -> str:
+        """
+        * Пользовательское сообщение для сервер ChatScript
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера (пустая строка, если сервер недоступен)
+        """
+        if self.client.is_command(message_text) or not self.breaker.allow():
+            return ""
+        try:
+            reply: str = await self.client.request(message_text)
+        except Exception as e:
+            self.needs_reset = True
+            self.breaker.record_failure()
+            print(f"Сервер ChatScript не ответил: {e!r}")
+            return ""
+        except BaseException: # asyncio.CancelledError - пробное обращение не должно остаться занятым
+            self.breaker.release_trial()
+            raise
+        self.breaker.record_success()
+        return reply
+
+    def send_user_message_sync(self, message_text: str) -> str:
+        """
+        * Пользовательское сообщение для сервер ChatScript (вызов из обычного потока)
+        *
+        * @param message_text Текст отправляемого сообщения
+        * @return Текст сообщения от сервера
+        """
+        return self.client.run_sync(self.send_user_message(message_text))
@@ -0,0 +1,205 @@
+"""
+* Класс "Выполнение команд ОС"
+* *************************
+* Команды /cmd выполняются с ограничением количества одновременно
+* работающих процессов и времени выполнения: по истечении времени
+* процесс (вместе с запущенными им процессами) принудительно
+* завершается. Вывод читается из канала отдельным потоком по мере
+* появления: последние байты хранятся в памяти для показа хода
+* выполнения, а весь вывод (не больше заданного размера) - во временном
+* файле, который отправляется вложением, если вывод не помещается
+* в сообщение.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import locale
+import os
+import selectors
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from metrics import get_metrics
+
+CommandResult = namedtuple("CommandResult", ["return_code", "tail", "total_bytes", "truncated", "timed_out", "elapsed", "output"])
+DEFAULT_MAX_CONCURRENT: int = 2 # одновременно выполняемых команд
+DEFAULT_TIMEOUT: float = 60 # максимальное время выполнения команды (в секундах)
+DEFAULT_TAIL_BYTES: int = 3072 # сколько последних байт вывода показывается в сообщении
+DEFAULT_FILE_BYTES: int = 10485760 # максимальный размер полного вывода (вложения)
+DEFAULT_PROGRESS_INTERVAL: float = 3.0 # не чаще скольких секунд обновляется ход выполнения
+READ_CHUNK: int = 65536
+KILL_WAIT: float = 5.0 # сколько секунд ждать завершения процесса после принудительной остановки
+READ_POLL: float = 0.5 # как часто поток чтения проверяет, не пора ли остановиться (в секундах)
+
+class CommandRunner:
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, timeout: float = DEFAULT_TIMEOUT, tail_bytes: int = DEFAULT_TAIL_BYTES, file_bytes: int = DEFAULT_FILE_BYTES, progress_interval: float = DEFAULT_PROGRESS_INTERVAL):
+        """
+        * @param max_concurrent Одновременно выполняемых команд
+        * @param timeout Максимальное время выполнения команды (в секундах)
+        * @param tail_bytes Сколько последних байт вывода хранится для сообщения
+        * @param file_bytes Максимальный размер сохраняемого полного вывода (в байтах)
+        * @param progress_interval Не чаще скольких секунд вызывается on_progress
+        """
+        self.max_concurrent = max_concurrent if max_concurrent > 0 else DEFAULT_MAX_CONCURRENT
+        self.timeout = timeout if timeout > 0 else DEFAULT_TIMEOUT
+        self.tail_bytes = tail_bytes if tail_bytes > 0 else DEFAULT_TAIL_BYTES
+        self.file_bytes = file_bytes if file_bytes > 0 else DEFAULT_FILE_BYTES
+        self.progress_interval = progress_interval if progress_interval > 0 else DEFAULT_PROGRESS_INTERVAL
+        self.encoding: str = locale.getpreferredencoding(False)
+        self.running: int = 0
+        self.killed: int = 0 # количество команд, остановленных по времени
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        get_metrics().gauge("cmd_running", lambda: self.running)
+        get_metrics().gauge("cmd_killed_total", lambda: self.killed)
+
+    def decode(self, data: bytes) -> str:
+        return data.decode(self.encoding, errors="replace")
+
+    def run(self, args: list, on_progress=None) -> CommandResult:
+        """
+        * Выполнение команды
+        *
+        * @param args Программа и её параметры
+        * @param on_progress Функция on_progress(tail, elapsed) - последние строки вывода и время выполнения
+        * @return CommandResult (None, если уже выполняется максимальное количество команд);
+        *         поле output - временный файл с полным выводом, его закрывает вызывающий
+        * @raise OSError Программа не найдена или не может быть запущена
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self.running += 1
+        started: float = time.monotonic()
+        output = tempfile.SpooledTemporaryFile(max_size=self.tail_bytes * 4)
+        try:
+            popen_args = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True} # чтобы остановить и дочерние процессы
+            process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **popen_args)
+        except OSError:
+            output.close()
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+            raise
+        reader = _PipeReader(process.stdout, output, self.tail_bytes, self.file_bytes)
+        try:
+            reader.start()
+            deadline: float = started + self.timeout
+            timed_out: bool = False
+            reported_bytes: int = 0
+            while reader.is_alive(): # канал закрывается, когда завершатся процесс и все унаследовавшие его процессы
+                reader.join(min(self.progress_interval, max(deadline - time.monotonic(), 0.0)))
+                if not reader.is_alive():
+                    break
+                if time.monotonic() >= deadline:
+                    timed_out = True
+                    self._kill(process)
+                    reader.join(KILL_WAIT)
+                    if reader.is_alive(): # канал держит процесс, вышедший из группы процессов
+                        reader.cancel() # после этого поток не пишет в output
+                        reader.join(KILL_WAIT)
+                    break
+                if on_progress is not None and reader.total_bytes != reported_bytes:
+                    reported_bytes = reader.total_bytes
+                    on_progress(self.decode(reader.tail()), time.monotonic() - started)
+            try:
+                return_code: int = process.wait(KILL_WAIT)
+            except subprocess.TimeoutExpired: # вывод закрыт, но процесс не завершается
+                timed_out = True
+                self._kill(process)
+                return_code = process.wait()
+            if timed_out:
+                with self._lock:
+                    self.killed += 1
+            elapsed: float = time.monotonic() - started
+            get_metrics().observe("cmd_run_seconds", elapsed, timed_out or return_code != 0)
+            output.seek(0)
+            return CommandResult(return_code, self.decode(reader.tail()), reader.total_bytes, reader.total_bytes > self.tail_bytes, timed_out, elapsed, output)
+        finally:
+            if reader.is_alive(): # канал закроет сам поток чтения
+                reader.cancel()
+            else:
+                process.stdout.close()
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    @staticmethod
+    def _kill(process: subprocess.Popen) -> None:
+        """
+        * Принудительное завершение процесса и его группы процессов
+        """
+        try:
+            if os.name == "nt": # завершение всего дерева процессов
+                subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=KILL_WAIT)
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError): # процесс уже завершился (или taskkill недоступен)
+            pass
+        if os.name == "nt" and process.poll() is None:
+            process.kill()
+
+class _PipeReader(threading.Thread):
+    """
+    * Чтение вывода процесса из канала (канал не переполняется, даже если вывод не нужен)
+    """
+
+    def __init__(self, pipe, output, tail_bytes: int, file_bytes: int):
+        threading.Thread.__init__(self, name="CommandOutput", daemon=True)
+        self.pipe = pipe
+        self.output = output
+        self.tail_bytes = tail_bytes
+        self.file_bytes = file_bytes
+        self.total_bytes: int = 0
+        self._tail: bytes = b""
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def tail(self) -> bytes:
+        with self._lock:
+            return self._tail
+
+    def cancel(self) -> None:
+        """
+        * Остановка чтения: после возврата из метода поток больше не пишет в output
+        """
+        with self._lock:
+            self._cancelled.set()
+
+    def run(self) -> None:
+        selector = None
+        try:
+            if os.name != "nt": # в Windows select() не работает с каналами
+                selector = selectors.DefaultSelector()
+                selector.register(self.pipe, selectors.EVENT_READ)
+            while not self._cancelled.is_set():
+                if selector is not None and not selector.select(READ_POLL):
+                    continue
+                try:
+                    chunk: bytes = self.pipe.read1(READ_CHUNK)
+                except (ValueError, OSError): # канал уже закрыт
+                    break
+                if not chunk:
+                    break
+                with self._lock:
+                    if self._cancelled.is_set():
+                        break
+                    if self.total_bytes < self.file_bytes:
+                        self.output.write(chunk[:self.file_bytes - self.total_bytes])
+                    self._tail = (self._tail + chunk)[-self.tail_bytes:]
+                    self.total_bytes += len(chunk)
+        finally:
+            if selector is not None:
+                selector.close()
+            if self._cancelled.is_set():
+                try:
+                    self.pipe.close()
+                except (ValueError, OSError):
+                    pass
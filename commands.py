@@ -0,0 +1,189 @@
+"""
+* Класс "Реестр команд Telegram-бота"
+* *************************
+* Команды регистрируются декоратором и находятся по первому слову
+* сообщения поиском в словаре. Для каждой команды задаётся способ
+* выполнения: сразу в потоке обработчика (быстрые команды), в пуле
+* потоков ввода-вывода (сеть, диск) или в отдельном небольшом пуле для
+* команд, запускающих процессы ОС. Так медленные команды не задерживают
+* быстрые. Для каждой команды ведётся учёт времени выполнения и ошибок.
+* В асинхронном режиме (asyncio) быстрые команды и команды с асинхронным
+* обработчиком выполняются в цикле событий, остальные - в тех же пулах.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import asyncio
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import get_metrics
+
+EXEC_INLINE: str = "inline" # выполнение в потоке обработчика сообщений
+EXEC_IO: str = "io" # выполнение в пуле потоков ввода-вывода
+EXEC_SUBPROCESS: str = "subprocess" # выполнение в пуле для команд, запускающих процессы ОС
+DEFAULT_IO_WORKERS: int = 8
+DEFAULT_SUBPROCESS_WORKERS: int = 2
+
+class Command:
+    """
+    * Описание зарегистрированной команды
+    """
+
+    def __init__(self, names: tuple, handler, execution: str, takes_args: bool, ignore_case: bool, hidden: bool, description: str):
+        self.names = names
+        self.name = names[0]
+        self.handler = handler
+        self.execution = execution
+        self.takes_args = takes_args # допускаются ли параметры после имени команды
+        self.ignore_case = ignore_case
+        self.hidden = hidden # не показывать в /help
+        self.description = description
+        self.async_handler = None # асинхронный вариант обработчика (для режима asyncio)
+
+class CommandRegistry:
+
+    def __init__(self, io_workers: int = DEFAULT_IO_WORKERS, subprocess_workers: int = DEFAULT_SUBPROCESS_WORKERS):
+        self.commands = [] # команды в порядке регистрации
+        self.fallback: Command = None # обработчик сообщений, не являющихся командами
+        self._by_name = {}
+        self._pools = {
+            EXEC_IO: ThreadPoolExecutor(io_workers if io_workers > 0 else DEFAULT_IO_WORKERS, thread_name_prefix="CommandIO"),
+            EXEC_SUBPROCESS: ThreadPoolExecutor(subprocess_workers if subprocess_workers > 0 else DEFAULT_SUBPROCESS_WORKERS, thread_name_prefix="CommandSubprocess")
+        }
+
+    def command(self, *names, execution: str = EXEC_INLINE, takes_args: bool = False, ignore_case: bool = False, hidden: bool = False, description: str = ""):
+        """
+        * Декоратор для регистрации команды
+        * (обработчик вызывается как handler(bot, message, args))
+        *
+        * @param names Имя команды и её синонимы
+        * @param execution Способ выполнения (EXEC_INLINE, EXEC_IO, EXEC_SUBPROCESS)
+        * @param takes_args Допускаются ли параметры после имени команды
+        * @param ignore_case Не учитывать регистр имени команды
+        * @param hidden Не показывать команду в /help
+        * @param description Описание команды
+        """
+        def decorator(handler):
+            command: Command = Command(names, handler, execution, takes_args, ignore_case, hidden, description)
+            for name in names:
+                self._by_name[name.lower() if ignore_case else name] = command
+            self.commands.append(command)
+            return handler
+        return decorator
+
+    def default(self, execution: str = EXEC_INLINE):
+        """
+        * Декоратор для регистрации обработчика сообщений, не являющихся командами
+        """
+        def decorator(handler):
+            self.fallback = Command(("*",), handler, execution, True, False, True, "")
+            return handler
+        return decorator
+
+    def async_handler(self, name: str):
+        """
+        * Декоратор для регистрации асинхронного варианта обработчика команды
+        * (используется в режиме asyncio вместо обычного обработчика;
+        * "*" - обработчик сообщений, не являющихся командами)
+        *
+        * @param name Имя уже зарегистрированной команды
+        """
+        def decorator(handler):
+            command: Command = self.fallback if name == "*" else self._by_name.get(name)
+            if command is None:
+                raise KeyError(f"Команда {name} не зарегистрирована")
+            command.async_handler = handler
+            return handler
+        return decorator
+
+    def lookup(self, text: str):
+        """
+        * Поиск команды по тексту сообщения
+        *
+        * @param text Текст сообщения
+        * @return Команда (или обработчик по умолчанию) и строка параметров
+        """
+        parts = text.split(None, 1)
+        if parts:
+            token: str = parts[0]
+            args: str = parts[1].strip() if len(parts) > 1 else ""
+            command: Command = self._by_name.get(token)
+            if command is None:
+                command = self._by_name.get(token.lower())
+                if command is not None and not command.ignore_case:
+                    command = None
+            if command is not None and (command.takes_args or "".__eq__(args)):
+                return command, args
+        return self.fallback, text
+
+    def dispatch(self, bot, message) -> None:
+        """
+        * Выполнение команды, соответствующей сообщению
+        *
+        * @param bot Экземпляр бота
+        * @param message Сообщение пользователя
+        """
+        command, args = self.lookup(message.text or "")
+        if command is None:
+            return
+        if command.execution == EXEC_INLINE:
+            self._run(command, bot, message, args)
+        else:
+            self._pools[command.execution].submit(self._run, command, bot, message, args)
+
+    async def dispatch_async(self, bot, message) -> None:
+        """
+        * Выполнение команды, соответствующей сообщению, в цикле событий asyncio
+        *
+        * @param bot Экземпляр бота (для отправки ответов)
+        * @param message Сообщение пользователя
+        """
+        command, args = self.lookup(message.text or "")
+        if command is None:
+            return
+        if command.async_handler is not None:
+            await self._run_async(command, bot, message, args)
+        elif command.execution == EXEC_INLINE:
+            self._run(command, bot, message, args)
+        else:
+            await asyncio.get_running_loop().run_in_executor(self._pools[command.execution], self._run, command, bot, message, args)
+
+    async def _run_async(self, command: Command, bot, message, args: str) -> None:
+        started: float = time.perf_counter()
+        failed: bool = False
+        try:
+            await command.async_handler(bot, message, args)
+        except Exception as e:
+            failed = True
+            print(f"Ошибка при выполнении команды {command.name}: {e}")
+            traceback.print_exc()
+        finally:
+            self._record(command, time.perf_counter() - started, failed)
+
+    def _run(self, command: Command, bot, message, args: str) -> None:
+        started: float = time.perf_counter()
+        failed: bool = False
+        try:
+            command.handler(bot, message, args)
+        except Exception as e:
+            failed = True
+            print(f"Ошибка при выполнении команды {command.name}: {e}")
+            traceback.print_exc()
+        finally:
+            self._record(command, time.perf_counter() - started, failed)
+
+    @staticmethod
+    def _record(command: Command, elapsed: float, failed: bool) -> None:
+        get_metrics().observe("bot_command_seconds", elapsed, failed, command=command.name)
+
+    def help_text(self) -> str:
+        """
+        * Список команд для /help
+        *
+        * @return Строка со всеми видимыми командами и их синонимами
+        """
+        return ", ".join(name for command in self.commands if not command.hidden for name in command.names)
@@ -0,0 +1,208 @@
+"""
+* Базовый класс для отложенной (write-behind) записи в базу данных SQLite
+* *************************
+* Записи ставятся в ограниченную очередь и сохраняются фоновым потоком
+* пакетами (по количеству записей или по времени) через одно
+* долгоживущее соединение в режиме WAL. Поток, поставивший запись
+* в очередь, никогда не ждёт диска.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import sqlite3
+from sqlite3 import IntegrityError, OperationalError, Error
+import threading
+import time
+import queue
+import traceback
+from collections import namedtuple
+
+from metrics import get_metrics
+
+WriterStats = namedtuple("WriterStats", ["queued", "written", "dropped", "batches", "errors"])
+DEFAULT_QUEUE_SIZE: int = 10000 # максимальное количество записей в очереди
+DEFAULT_BATCH_SIZE: int = 100 # максимальное количество записей в одной транзакции
+DEFAULT_FLUSH_INTERVAL: float = 1.0 # максимальное время (в секундах) ожидания перед записью пакета
+_STOP = object() # маркер завершения работы фонового потока
+
+class DBWriter:
+    """
+    * Фоновый пакетный писатель в базу данных SQLite
+    * (наследники переопределяют методы migrate() и write_batch())
+    """
+
+    def __init__(self, db_filename: str, queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.db_filename = db_filename
+        self.batch_size = batch_size if batch_size > 0 else DEFAULT_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval > 0 else DEFAULT_FLUSH_INTERVAL
+        self.written: int = 0 # количество сохранённых записей
+        self.dropped: int = 0 # количество записей, отброшенных из-за переполнения очереди
+        self.batches: int = 0 # количество выполненных транзакций
+        self.errors: int = 0 # количество неудачных транзакций
+        self._queue = queue.Queue(queue_size if queue_size > 0 else DEFAULT_QUEUE_SIZE)
+        self._conn: sqlite3.Connection = None
+        self._thread: threading.Thread = None
+
+    @staticmethod
+    def connect(db_filename: str) -> sqlite3.Connection:
+        """
+        * Открытие соединения с базой данных в режиме WAL
+        * (новые базы данных создаются с auto_vacuum = incremental, см. maintenance.py)
+        *
+        * @param db_filename Имя файла базы данных
+        * @return Соединение с базой данных
+        """
+        conn = sqlite3.connect(db_filename, timeout=30, check_same_thread=False)
+        conn.execute("pragma auto_vacuum=incremental") # действует только до создания первой таблицы
+        conn.execute("pragma journal_mode=wal")
+        conn.execute("pragma synchronous=normal")
+        return conn
+
+    def migrate(self, cur: sqlite3.Cursor) -> None:
+        """
+        * Создание (обновление) схемы базы данных (выполняется один раз при запуске)
+        *
+        * @param cur Курсор базы данных
+        """
+        pass
+
+    def write_batch(self, cur: sqlite3.Cursor, items: list) -> None:
+        """
+        * Запись пакета элементов в базу данных (в рамках одной транзакции)
+        *
+        * @param cur Курсор базы данных
+        * @param items Список элементов из очереди
+        """
+        raise NotImplementedError
+
+    def after_commit(self, items: list) -> None:
+        """
+        * Действия после успешной фиксации пакета
+        *
+        * @param items Список сохранённых элементов
+        """
+        pass
+
+    def start(self) -> bool:
+        """
+        * Открытие соединения, миграция схемы и запуск фонового потока
+        *
+        * @return True, если писатель запущен
+        """
+        if self._thread is not None:
+            return True
+        try:
+            self._conn = self.connect(self.db_filename)
+            cur = self._conn.cursor()
+            try:
+                self.migrate(cur)
+                self._conn.commit()
+            finally:
+                cur.close()
+        except Error as e:
+            print(f"Не удалось подготовить базу данных {self.db_filename}: {e}")
+            return False
+        get_metrics().gauge("sqlite_queue_depth", self._queue.qsize, db=self.db_filename)
+        get_metrics().gauge("sqlite_dropped_total", lambda: self.dropped, db=self.db_filename)
+        self._thread = threading.Thread(target=self._run, name=f"DBWriter({self.db_filename})", daemon=True)
+        self._thread.start()
+        return True
+
+    def put(self, item) -> bool:
+        """
+        * Постановка записи в очередь без ожидания
+        *
+        * @param item Элемент для записи
+        * @return True, если элемент принят, False - если очередь переполнена
+        """
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Завершение работы с записью всех накопленных данных
+        *
+        * @param timeout Максимальное время ожидания (в секундах)
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        self._thread = None
+        if not thread.is_alive() and self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> WriterStats:
+        """
+        * Статистика работы писателя
+        *
+        * @return Длина очереди, записано, отброшено, транзакций, ошибок
+        """
+        return WriterStats(self._queue.qsize(), self.written, self.dropped, self.batches, self.errors)
+
+    def _run(self) -> None:
+        stopping: bool = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline: float = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining: float = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        cur = self._conn.cursor()
+        started: float = time.perf_counter()
+        failed: bool = True
+        try:
+            self.write_batch(cur, batch)
+            self._conn.commit()
+            failed = False
+            self.written += len(batch)
+            self.batches += 1
+            self.after_commit(batch)
+        except MemoryError as me:
+            self.errors += 1
+            self._conn.rollback()
+            print(f"Ошибка: Недостаточно памяти для загрузки всех данных. {me}")
+        except IntegrityError as e: # пакет отменяется целиком
+            self.errors += 1
+            self._conn.rollback()
+            print(f"Нарушение ограничения целостности, пакет из {len(batch)} записей не сохранён: {e}")
+        except OperationalError as e:
+            self.errors += 1
+            self._conn.rollback()
+            print(f"База данных, по всей видимости, заблокирована, или ресурс недоступен: {e}")
+        except Error as e:
+            self.errors += 1
+            self._conn.rollback()
+            print(f"Произошла ошибка: {e}")
+        except Exception as e: # ошибка в write_batch() или after_commit() не должна останавливать поток записи
+            self.errors += 1
+            self._conn.rollback()
+            print(f"Ошибка при записи пакета в базу данных {self.db_filename}: {e}")
+            traceback.print_exc()
+        finally:
+            cur.close()
+            get_metrics().observe("sqlite_write_seconds", time.perf_counter() - started, failed, db=self.db_filename)
@@ -8,7 +8,7 @@
 * @author Ефремов А. В., 14.10.2025
 """
 
-import requests
+from httpclient import get_client
 
 class Downgrade:
 
@@ -25,13 +25,7 @@ class Downgrade:
         joke_url: str = URL if "".__eq__(p_lang) else f"{URL}?lang={p_lang.lower()}"
         result: str = ""
         try:
-            request_kwargs = {"timeout": 5}
-            if proxy_url:
-                proxies = {}
-                proxies.setdefault("http", proxy_url)
-                proxies.setdefault("https", proxy_url)
-                request_kwargs["proxies"] = proxies
-            r = requests.get(joke_url, **request_kwargs)
+            r = get_client().fetch(joke_url, proxy_url, proxy_url, timeout=5) # шутки не кэшируются, но соединение переиспользуется
             r.raise_for_status()
             m: str = (r.text[len("document.write('"):] if r.text.startswith("document.write('") else r.text)
             m = m[:-3] if m.endswith("');") else m
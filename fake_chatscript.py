@@ -0,0 +1,105 @@
+"""
+* Локальный имитатор сервера ChatScript
+* *************************
+* Сервер принимает сообщения по протоколу ChatScript (имя пользователя,
+* имя бота и текст, разделённые нулевыми байтами), отвечает на них
+* и закрывает соединение. Используется для проверки клиентов
+* ChatScript и для нагрузочного тестирования бота без настоящего сервера.
+* Пример запуска:
+* $ python3 fake_chatscript.py --port 1024 --delay 0.05
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+from chatscript import CODEPAGE, NULL_BYTE, DEFAULT_PORT
+
+class FakeChatScriptServer(socketserver.ThreadingTCPServer):
+    """
+    * Имитатор сервера ChatScript
+    * (ответ по умолчанию - текст сообщения с префиксом "echo: ")
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, reply_size: int = 0):
+        socketserver.ThreadingTCPServer.__init__(self, (host, port), _FakeChatScriptHandler)
+        self.delay = delay # искусственная задержка ответа (в секундах)
+        self.reply_size = reply_size # если больше 0, то ответ дополняется до указанного размера
+        self.requests_count: int = 0
+        self._thread: threading.Thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def reply(self, username: str, bot_name: str, message_text: str) -> str:
+        """
+        * Формирование ответа на сообщение (можно переопределить)
+        *
+        * @param username Имя пользователя
+        * @param bot_name Имя бота
+        * @param message_text Текст сообщения
+        * @return Текст ответа
+        """
+        if message_text.startswith(":"):
+            return f"Command {message_text} accepted."
+        answer: str = f"echo: {message_text}"
+        if self.reply_size > len(answer):
+            answer = answer + "." * (self.reply_size - len(answer))
+        return answer
+
+    def start(self) -> "FakeChatScriptServer":
+        """
+        * Запуск сервера в фоновом потоке
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="FakeChatScriptServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        * Остановка сервера
+        """
+        self.shutdown()
+        self.server_close()
+
+class _FakeChatScriptHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        data = bytearray()
+        while data.count(NULL_BYTE) < 3:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            data.extend(chunk)
+        username, bot_name, message_text = (part.decode(CODEPAGE, errors="replace") for part in bytes(data).split(NULL_BYTE)[:3])
+        self.server.requests_count += 1
+        if self.server.delay > 0:
+            time.sleep(self.server.delay)
+        self.request.sendall(self.server.reply(username, bot_name, message_text).encode(CODEPAGE))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Имитатор сервера ChatScript")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Адрес для подключения")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт сервера")
+    parser.add_argument("--delay", type=float, default=0.0, help="Задержка ответа (в секундах)")
+    parser.add_argument("--reply_size", type=int, default=0, help="Минимальный размер ответа (в байтах)")
+    args = parser.parse_args()
+    server = FakeChatScriptServer(args.host, args.port, args.delay, args.reply_size)
+    print(f"Имитатор сервера ChatScript запущен на {args.host}:{server.port}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# Точка запуска программы
+if __name__ == "__main__":
+    main()
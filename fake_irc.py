@@ -0,0 +1,192 @@
+"""
+* Локальный имитатор сервера IRC
+* *************************
+* Минимальный сервер IRC (RFC 1459): приветствие (001) после NICK
+* и USER, вход в канал (JOIN), ответ на PING. Сообщения, отправленные
+* в канал одним клиентом, пересылаются остальным участникам канала.
+* Кроме того, сервер может сам писать сообщения в каналы с заданной
+* частотой, чтобы у IRC-бота был чатлог для команды /irc.
+* Пример запуска:
+* $ python3 fake_irc.py --port 6667 --chatter 5
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import itertools
+import socketserver
+import threading
+
+SERVER_NAME: str = "fake.irc"
+CODEPAGE: str = "utf-8"
+CHATTER_NICK: str = "chatter" # от чьего имени сервер пишет в каналы
+
+class FakeIRCServer(socketserver.ThreadingTCPServer):
+    """
+    * Имитатор сервера IRC
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, chatter: float = 0.0):
+        """
+        * @param chatter Сколько сообщений в секунду сервер сам пишет в каждый канал (0 - не писать)
+        """
+        socketserver.ThreadingTCPServer.__init__(self, (host, port), _FakeIRCHandler)
+        self.chatter = chatter
+        self.clients_count: int = 0
+        self.messages_count: int = 0 # сообщений, полученных от клиентов
+        self.welcomed = threading.Event() # хотя бы один клиент получил приветствие
+        self._channels = {} # канал -> множество обработчиков подключений
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread = None
+        self._chatter_thread: threading.Thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def join(self, channel: str, handler: "_FakeIRCHandler") -> None:
+        with self._lock:
+            self._channels.setdefault(channel.lower(), set()).add(handler)
+
+    def leave(self, handler: "_FakeIRCHandler") -> None:
+        with self._lock:
+            for members in self._channels.values():
+                members.discard(handler)
+
+    def broadcast(self, channel: str, line: str, sender: "_FakeIRCHandler" = None) -> None:
+        """
+        * Отправка строки всем участникам канала (кроме отправителя)
+        """
+        with self._lock:
+            members = list(self._channels.get(channel.lower(), ()))
+        for member in members:
+            if member is not sender:
+                member.send_line(line)
+
+    def _run_chatter(self) -> None:
+        for number in itertools.count(1):
+            if self._stopping.wait(1.0 / self.chatter):
+                return
+            with self._lock:
+                channels = [channel for channel, members in self._channels.items() if members]
+            for channel in channels:
+                self.broadcast(channel, f":{CHATTER_NICK}!{CHATTER_NICK}@{SERVER_NAME} PRIVMSG {channel} :Сообщение номер {number}")
+
+    def start(self) -> "FakeIRCServer":
+        """
+        * Запуск сервера в фоновом потоке
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="FakeIRCServer", daemon=True)
+        self._thread.start()
+        if self.chatter > 0:
+            self._chatter_thread = threading.Thread(target=self._run_chatter, name="FakeIRCChatter", daemon=True)
+            self._chatter_thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        * Остановка сервера
+        """
+        self._stopping.set()
+        self.shutdown()
+        self.server_close()
+
+class _FakeIRCHandler(socketserver.StreamRequestHandler):
+
+    def setup(self):
+        socketserver.StreamRequestHandler.setup(self)
+        self.nickname: str = "*"
+        self.username: str = ""
+        self._write_lock = threading.Lock()
+
+    def send_line(self, line: str) -> None:
+        try:
+            with self._write_lock:
+                self.wfile.write(f"{line}\r\n".encode(CODEPAGE))
+        except OSError:
+            pass
+
+    def handle(self):
+        server: FakeIRCServer = self.server
+        with server._lock:
+            server.clients_count += 1
+        try:
+            for raw_line in self.rfile:
+                line: str = raw_line.decode(CODEPAGE, errors="replace").rstrip("\r\n")
+                if line and not self._command(line):
+                    return
+        except OSError:
+            pass
+        finally:
+            server.leave(self)
+
+    def _command(self, line: str) -> bool:
+        """
+        * Обработка одной команды клиента
+        *
+        * @return False, если соединение нужно закрыть
+        """
+        server: FakeIRCServer = self.server
+        if line.startswith(":"): # префикс клиента игнорируется
+            line = line.split(" ", 1)[1] if " " in line else ""
+        head, _, trailing = line.partition(" :")
+        params = head.split()
+        if not params:
+            return True
+        command: str = params[0].upper()
+        prefix: str = f":{self.nickname}!{self.username or self.nickname}@{SERVER_NAME}"
+        if command == "NICK" and len(params) > 1:
+            welcome: bool = self.nickname == "*" and self.username != ""
+            self.nickname = params[1]
+            if welcome:
+                self._welcome()
+        elif command == "USER" and len(params) > 1:
+            self.username = params[1]
+            if self.nickname != "*":
+                self._welcome()
+        elif command == "PING":
+            self.send_line(f":{SERVER_NAME} PONG {SERVER_NAME} :{trailing or (params[1] if len(params) > 1 else '')}")
+        elif command == "JOIN" and len(params) > 1:
+            for channel in params[1].split(","):
+                server.join(channel, self)
+                self.send_line(f"{prefix} JOIN {channel}")
+                self.send_line(f":{SERVER_NAME} 353 {self.nickname} = {channel} :{self.nickname}")
+                self.send_line(f":{SERVER_NAME} 366 {self.nickname} {channel} :End of /NAMES list.")
+        elif command in ("PRIVMSG", "NOTICE") and len(params) > 1:
+            with server._lock:
+                server.messages_count += 1
+            if params[1].startswith("#"):
+                server.broadcast(params[1], f"{prefix} {command} {params[1]} :{trailing}", self)
+        elif command == "QUIT":
+            self.send_line(f"ERROR :Closing link: {self.nickname} (Quit: {trailing})")
+            return False
+        return True
+
+    def _welcome(self) -> None:
+        self.send_line(f":{SERVER_NAME} 001 {self.nickname} :Welcome to the fake IRC network {self.nickname}")
+        self.send_line(f":{SERVER_NAME} 376 {self.nickname} :End of /MOTD command.")
+        self.server.welcomed.set()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Имитатор сервера IRC")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Адрес для подключения")
+    parser.add_argument("--port", type=int, default=6667, help="Порт сервера")
+    parser.add_argument("--chatter", type=float, default=0.0, help="Сообщений в секунду от сервера в каждый канал")
+    args = parser.parse_args()
+    server = FakeIRCServer(args.host, args.port, args.chatter)
+    print(f"Имитатор сервера IRC запущен на порту {server.port}.")
+    try:
+        server.start()
+        server._thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+# Точка запуска программы
+if __name__ == "__main__":
+    main()
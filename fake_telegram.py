@@ -0,0 +1,192 @@
+"""
+* Локальный имитатор Telegram Bot API
+* *************************
+* Сервер отвечает на методы, которые использует бот (getMe, getUpdates,
+* sendMessage, editMessageText, sendDocument, deleteWebhook и т.д.).
+* Обновления (входящие сообщения) ставятся в очередь методом
+* inject() и выдаются боту через getUpdates (long polling), а ответы
+* бота записываются вместе со временем их получения. Бот подключается
+* к имитатору через параметр api_url в секции [telegram] файла настроек
+* (значение apihelper.API_URL библиотеки telebot).
+* Пример запуска:
+* $ python3 fake_telegram.py --port 8081
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import namedtuple, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+SentMessage = namedtuple("SentMessage", ["chat_id", "text", "method", "received_at"])
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "your_friendly_bot", "username": "your_friendly_bot"}
+MAX_UPDATES: int = 100 # максимальное количество обновлений в одном ответе getUpdates
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, on_sent=None):
+        """
+        * @param on_sent Функция, вызываемая для каждого ответа бота: on_sent(SentMessage)
+        """
+        ThreadingHTTPServer.__init__(self, (host, port), _FakeTelegramHandler)
+        self.on_sent = on_sent
+        self.sent = deque(maxlen=10000) # последние ответы бота
+        self.sent_count: int = 0
+        self.polls: int = 0 # количество вызовов getUpdates
+        self._updates = deque()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread: threading.Thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def api_url(self) -> str:
+        """
+        * Значение для apihelper.API_URL (параметр api_url в settings.ini)
+        """
+        return f"http://{self.server_address[0]}:{self.port}/bot{{0}}/{{1}}"
+
+    def inject(self, chat_id: int, text: str, user_id: int = None, first_name: str = "bench") -> int:
+        """
+        * Постановка входящего сообщения в очередь обновлений
+        *
+        * @param chat_id Идентификатор чата
+        * @param text Текст сообщения
+        * @param user_id Идентификатор пользователя (по умолчанию равен chat_id)
+        * @return Номер обновления
+        """
+        with self._cond:
+            update_id: int = next(self._update_ids)
+            self._updates.append({
+                "update_id": update_id,
+                "message": {
+                    "message_id": next(self._message_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"},
+                    "from": {"id": user_id if user_id is not None else abs(chat_id), "is_bot": False, "first_name": first_name},
+                    "text": text
+                }
+            })
+            self._cond.notify_all()
+        return update_id
+
+    def get_updates(self, offset: int, timeout: float) -> list:
+        deadline: float = time.monotonic() + timeout
+        with self._cond:
+            self.polls += 1
+            while self._updates and self._updates[0]["update_id"] < offset: # подтверждённые ботом обновления
+                self._updates.popleft()
+            while not self._updates and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+            return list(itertools.islice(self._updates, MAX_UPDATES))
+
+    def record(self, chat_id: int, text: str, method: str) -> dict:
+        sent: SentMessage = SentMessage(chat_id, text, method, time.perf_counter())
+        with self._cond:
+            self.sent.append(sent)
+            self.sent_count += 1
+            message_id: int = next(self._message_ids)
+        if self.on_sent is not None:
+            self.on_sent(sent)
+        return {"message_id": message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"}, "from": BOT_USER, "text": text}
+
+    def start(self) -> "FakeTelegramServer":
+        """
+        * Запуск сервера в фоновом потоке
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="FakeTelegramServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        * Остановка сервера
+        """
+        self.shutdown()
+        self.server_close()
+
+class _FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, как у настоящего API
+
+    def _params(self) -> dict:
+        params = {key: values[-1] for key, values in parse_qs(urlsplit(self.path).query).items()}
+        length: int = int(self.headers.get("Content-Length", "0") or 0)
+        if length > 0:
+            body: bytes = self.rfile.read(length)
+            content_type: str = self.headers.get("Content-Type", "")
+            if content_type.startswith("application/json"):
+                params.update(json.loads(body.decode("utf-8")))
+            elif content_type.startswith("multipart/form-data"):
+                params["_multipart"] = body
+            else:
+                params.update({key: values[-1] for key, values in parse_qs(body.decode("utf-8")).items()})
+        return params
+
+    def _method(self) -> str:
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        return parts[-1] if len(parts) >= 2 else ""
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        server: FakeTelegramServer = self.server
+        method: str = self._method()
+        params: dict = self._params()
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "getUpdates":
+            result = server.get_updates(int(params.get("offset", 0) or 0), float(params.get("timeout", 0) or 0))
+        elif method in ("sendMessage", "editMessageText"):
+            result = server.record(int(params.get("chat_id", 0)), str(params.get("text", "")), method)
+        elif method == "sendDocument":
+            result = server.record(int(params.get("chat_id", 0) or 0), "", method)
+        elif method in ("deleteWebhook", "setWebhook", "close", "logOut", "setMyCommands"):
+            result = True
+        else:
+            self._reply(404, {"ok": False, "error_code": 404, "description": f"Not Found: method {method} is not supported"})
+            return
+        self._reply(200, {"ok": True, "result": result})
+
+    def _reply(self, code: int, data: dict) -> None:
+        body: bytes = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Имитатор Telegram Bot API")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Адрес для подключения")
+    parser.add_argument("--port", type=int, default=8081, help="Порт сервера")
+    args = parser.parse_args()
+    server = FakeTelegramServer(args.host, args.port, on_sent=lambda sent: print(f"-> {sent.chat_id}: {sent.text}"))
+    print(f"Имитатор Telegram Bot API запущен. Параметр api_url: {server.api_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# Точка запуска программы
+if __name__ == "__main__":
+    main()
@@ -12,4 +12,9 @@ echo '************'
 echo 'ПО "Твой дружелюбный бот"'
 echo '************'
 
-sqlite3 ./telegram.db < ./report_messages.sql
+# отчёт по сводным таблицам (по умолчанию - пользователи Telegram);
+# пример: ./get_report.sh daily --days 30 --format csv --output daily.csv
+if [ $# -eq 0 ]; then
+  set -- users
+fi
+python3 ./report.py "$@"
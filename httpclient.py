@@ -0,0 +1,204 @@
+"""
+* Класс "Общий HTTP-клиент"
+* *************************
+* Для каждой конфигурации proxy-серверов создаётся своя сессия requests
+* с пулом постоянных (keep-alive) соединений, поэтому повторные запросы
+* не тратят время на установку TCP/TLS-соединения. Поверх сессий работает
+* кэш ответов с ограниченным временем жизни (TTL): устаревший ответ
+* какое-то время ещё выдаётся, пока в фоне загружается новый
+* (stale-while-revalidate), а одновременные запросы одного и того же
+* адреса объединяются в одно обращение к серверу.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import get_metrics
+
+CacheEntry = namedtuple("CacheEntry", ["text", "fetched_at", "ttl", "stale_ttl"])
+DEFAULT_TIMEOUT: float = 10 # время ожидания ответа сервера (в секундах)
+DEFAULT_POOL_SIZE: int = 10 # максимальное количество соединений с одним хостом
+DEFAULT_TTL: float = 300 # время, в течение которого ответ считается свежим (в секундах)
+DEFAULT_MAX_ENTRIES: int = 256 # максимальное количество адресов в кэше
+
+class HttpClient:
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, pool_size: int = DEFAULT_POOL_SIZE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_entries = max_entries
+        self.hits: int = 0 # ответы из кэша
+        self.stale_hits: int = 0 # устаревшие ответы из кэша (с обновлением в фоне)
+        self.misses: int = 0 # обращения к серверу
+        self.coalesced: int = 0 # запросы, дождавшиеся чужого обращения к серверу
+        self._sessions = {}
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def proxies(http_proxy: str = "", https_proxy: str = "") -> dict:
+        """
+        * Словарь proxy-серверов для requests
+        *
+        * @param http_proxy URL proxy-сервера для HTTP (пустая строка - без proxy)
+        * @param https_proxy URL proxy-сервера для HTTPS (пустая строка - без proxy)
+        * @return Словарь proxy-серверов
+        """
+        proxies = {}
+        if http_proxy:
+            proxies["http"] = http_proxy
+        if https_proxy:
+            proxies["https"] = https_proxy
+        return proxies
+
+    def session(self, http_proxy: str = "", https_proxy: str = "") -> requests.Session:
+        """
+        * Сессия с пулом соединений для заданной конфигурации proxy-серверов
+        *
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        * @return Сессия requests
+        """
+        key = (http_proxy or "", https_proxy or "")
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.proxies.update(self.proxies(*key))
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def fetch(self, url: str, http_proxy: str = "", https_proxy: str = "", timeout: float = None, headers: dict = None) -> requests.Response:
+        """
+        * Запрос GET без кэширования (но через пул соединений)
+        *
+        * @param url Адрес ресурса
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        * @param timeout Время ожидания ответа (в секундах)
+        * @param headers Дополнительные заголовки запроса
+        * @return Ответ сервера
+        """
+        with get_metrics().timer("http_request_seconds", host=urlsplit(url).hostname or ""):
+            return self.session(http_proxy, https_proxy).get(url, timeout=timeout or self.timeout, headers=headers)
+
+    def get_text(self, url: str, http_proxy: str = "", https_proxy: str = "", ttl: float = DEFAULT_TTL, stale_ttl: float = None) -> str:
+        """
+        * Текст ресурса с кэшированием
+        * (при ошибке загрузки возбуждается исключение requests)
+        *
+        * @param url Адрес ресурса
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        * @param ttl Время, в течение которого ответ считается свежим (в секундах)
+        * @param stale_ttl Сколько ещё секунд выдавать устаревший ответ, обновляя его в фоне (по умолчанию равно ttl)
+        * @return Текст ответа сервера
+        """
+        key = (url, http_proxy or "", https_proxy or "")
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        now: float = time.monotonic()
+        with self._lock:
+            entry: CacheEntry = self._cache.get(key)
+            if entry is not None:
+                age: float = now - entry.fetched_at
+                if age < entry.ttl:
+                    self.hits += 1
+                    self._cache.move_to_end(key)
+                    return entry.text
+                if age < entry.ttl + entry.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._in_flight: # обновление в фоне (регистрируется сразу - один поток на ключ)
+                        future: Future = Future()
+                        self._in_flight[key] = future
+                        self.misses += 1
+                        threading.Thread(target=self._refresh, args=(key, future, ttl, stale_ttl), daemon=True).start()
+                    return entry.text
+        return self._load(key, ttl, stale_ttl)
+
+    def get_lines(self, url: str, http_proxy: str = "", https_proxy: str = "", ttl: float = DEFAULT_TTL) -> list:
+        """
+        * Строки ресурса с кэшированием (при ошибке - пустой список)
+        *
+        * @param url Адрес ресурса
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        * @param ttl Время, в течение которого ответ считается свежим (в секундах)
+        * @return Список строк
+        """
+        try:
+            lines = self.get_text(url, http_proxy, https_proxy, ttl).splitlines()
+        except Exception as e:
+            print(f"Не удалось получить данные по адресу {url}: {e}")
+            return []
+        while lines and "".__eq__(lines[-1].strip()):
+            lines.pop()
+        return lines
+
+    def _refresh(self, key: tuple, future: Future, ttl: float, stale_ttl: float) -> None:
+        try:
+            self._fetch(key, future, ttl, stale_ttl)
+        except Exception as e:
+            print(f"Не удалось обновить данные по адресу {key[0]}: {e}")
+
+    def _load(self, key: tuple, ttl: float, stale_ttl: float) -> str:
+        with self._lock:
+            future: Future = self._in_flight.get(key)
+            owner: bool = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner: # ждём результата запроса, который уже выполняется
+            return future.result()
+        return self._fetch(key, future, ttl, stale_ttl)
+
+    def _fetch(self, key: tuple, future: Future, ttl: float, stale_ttl: float) -> str:
+        """
+        * Загрузка ресурса по запросу, уже зарегистрированному в _in_flight
+        """
+        try:
+            response = self.fetch(*key)
+            response.raise_for_status()
+            text: str = response.text
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._cache[key] = CacheEntry(text, time.monotonic(), ttl, stale_ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(text)
+        return text
+
+_shared_client: HttpClient = None
+_shared_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """
+    * Общий для всей программы HTTP-клиент
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
@@ -14,19 +14,31 @@
 * @author Ефремов А. В., 21.08.2025
 """
 
+import asyncio
+import threading
+import time
+
 from irc.bot import SingleServerIRCBot
+from irc.client import ServerConnectionError
+from irc.client_aio import AioReactor
 import irc.strings
-import sqlite3
-from sqlite3 import IntegrityError, OperationalError, Error
+
+from dbwriter import DEFAULT_FLUSH_INTERVAL
+from irclog import IRCLogStore
+from metrics import get_metrics
 
 class IRCBot(SingleServerIRCBot):
     DB_FILENAME: str = "irc.db" # база данных для хранения чатлогов IRC
     is_connected: bool = False # признак подключения к серверу IRC (по умолчанию не подключён)
 
-    def __init__(self, channel: str, nickname: str, server: str, port: int = 6667, encoding: str = "utf-8"):
+    def __init__(self, channel: str, nickname: str, server: str, port: int = 6667, encoding: str = "utf-8", flush_interval: float = DEFAULT_FLUSH_INTERVAL):
         SingleServerIRCBot.__init__(self, [(server, port)], nickname, nickname)
         self.channel = channel
         self.encoding = encoding
+        self.log_store = IRCLogStore(self.DB_FILENAME, flush_interval=flush_interval) # фоновая запись чатлога
+        self.log_store.start()
+        self.ready = threading.Event() # установлено после приветствия сервера (событие welcome)
+        self.disconnected = threading.Event() # установлено после отключения от сервера
 
     def irc_log(self, msg: str) -> None:
         """
@@ -35,33 +47,25 @@ class IRCBot(SingleServerIRCBot):
         * @param msg Текст сообщения
         """
         if not "".__eq__(msg):
-            with sqlite3.connect(self.DB_FILENAME) as conn:
-                cur = conn.cursor()
-                try:
-                    cur.execute('''
-                        create table if not exists irc_log (
-                          message text,
-                          date_create text not null default current_timestamp
-                        )
-                    ''')
-                    cur.execute("insert into irc_log (message) values (?)", (msg,))
-                    conn.commit()
-                except MemoryError as me:
-                    print(f"Ошибка: Недостаточно памяти для загрузки всех данных. {me}")
-                except IntegrityError as e: # если запись в таблице уже есть, то просто выходим
-                    pass
-                except OperationalError as e:
-                    print(f"База данных, по всей видимости, заблокирована, или ресурс недоступен: {e}")
-                except Error as e:
-                    print(f"Произошла ошибка: {e}")
-                finally:
-                    cur.close()
+            started: float = time.perf_counter()
+            accepted: bool = self.log_store.add(msg) # запись в БД выполняется в отдельном потоке
             print(msg)
+            get_metrics().observe("irc_log_seconds", time.perf_counter() - started, not accepted)
+
+    def close_log(self, timeout: float = 5.0) -> None:
+        """
+        * Запись накопленных сообщений в базу данных и закрытие журнала
+        *
+        * @param timeout Максимальное время ожидания (в секундах)
+        """
+        self.log_store.close(timeout)
 
     def get_irc_log(self, p_limit: int = 15):
         """
-        * Получение последних записей из лога (база данных)
+        * Получение последних записей из лога
+        * (из кольцевого буфера в памяти, при необходимости - из базы данных)
         *
+        * @param p_limit Количество записей (от 1 до 1000)
         * @return Список последних записей в виде массива строк
         """
         l_limit: int = p_limit
@@ -69,31 +73,7 @@ class IRCBot(SingleServerIRCBot):
             l_limit = 1
         if l_limit > 1000:
             l_limit = 1000
-        QUERY: str = f"select r2.msg from (select r.msg, r.rn from (select l.message as msg, row_number() over () as rn from irc_log l) r order by r.rn desc limit {l_limit}) r2 order by r2.rn asc"
-        data_array = [] # Инициализируем пустой массив
-        result = []
-        with sqlite3.connect(self.DB_FILENAME) as conn:
-            cur = conn.cursor()
-            try:
-                cur.execute(QUERY)
-                rows = cur.fetchall() # получаем результаты
-                for row in rows:
-                    data_array.append(row)
-            except MemoryError as me:
-                print(f"Ошибка: Недостаточно памяти для загрузки всех данных. {me}")
-            except IntegrityError as e:
-                print(f"Возникла ошибка целостности: {e}")
-            except OperationalError as e:
-                print(f"База данных, по всей видимости, заблокирована, или ресурс недоступен: {e}")
-            except Error as e:
-                print(f"Произошла ошибка: {e}")
-            finally:
-                cur.close()
-        if len(data_array) > 0:
-            for item in data_array:
-                for element in item:
-                    result.append(element)
-        return result
+        return self.log_store.tail(l_limit)
 
     def do_command(self, event, cmd: str):
         """
@@ -130,6 +110,8 @@ class IRCBot(SingleServerIRCBot):
         * @param event Экземпляр объекта "Событие"
         """
         self.is_connected = True
+        self.disconnected.clear()
+        self.ready.set()
         try: # попробуем задать encoding у объекта connection, если он поддерживает
             if hasattr(connection, "encoding"):
                 connection.encoding = self.encoding
@@ -199,4 +181,40 @@ class IRCBot(SingleServerIRCBot):
         * @param event Экземпляр объекта "Событие"
         """
         self.is_connected = False
+        self.ready.clear()
+        self.disconnected.set()
         self.irc_log("Disconnected.")
+
+class AsyncIRCBot(IRCBot):
+    """
+    * IRC-бот для работы в цикле событий asyncio (irc.client_aio)
+    * (создаётся внутри работающего цикла событий)
+    """
+    reactor_class = AioReactor
+    RECONNECT_INTERVAL: float = 60 # пауза перед повторным подключением (в секундах)
+
+    def __init__(self, channel: str, nickname: str, server: str, port: int = 6667, encoding: str = "utf-8", flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        IRCBot.__init__(self, channel, nickname, server, port, encoding, flush_interval)
+        self.server_host = server
+        self.server_port = port
+
+    async def connect_async(self) -> bool:
+        """
+        * Подключение к серверу IRC
+        *
+        * @return True, если соединение установлено
+        """
+        try:
+            await self.connection.connect(self.server_host, self.server_port, self._nickname, ircname=self._realname)
+            return True
+        except (ServerConnectionError, OSError) as e:
+            self.irc_log(f"Не удалось подключиться к серверу IRC {self.server_host}:{self.server_port}: {e}")
+            self.reactor.loop.call_later(self.RECONNECT_INTERVAL, self._connect)
+            return False
+
+    def _connect(self):
+        asyncio.ensure_future(self.connect_async(), loop=self.reactor.loop)
+
+    def _on_disconnect(self, connection, event):
+        self.channels.clear()
+        self.reactor.loop.call_later(self.RECONNECT_INTERVAL, self._connect)
@@ -0,0 +1,177 @@
+"""
+* Класс для журналирования сообщений канала IRC в базу данных
+* *************************
+* Строки чата ставятся в очередь в памяти и сохраняются в базу данных
+* "irc.db" отдельным потоком-писателем (см. класс DBWriter), поэтому
+* цикл обработки событий IRC не ждёт записи на диск.
+* Последние строки чата дополнительно хранятся в кольцевом буфере
+* в памяти, откуда они и выдаются по команде /irc. В той же транзакции,
+* что и строки чата, обновляются сводные таблицы (количество сообщений
+* по часам, первое и последнее сообщение каждого участника).
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import re
+import sqlite3
+from sqlite3 import OperationalError, Error
+import threading
+import time
+from contextlib import closing
+from collections import namedtuple, deque, Counter
+
+from dbwriter import DBWriter, DEFAULT_QUEUE_SIZE, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+from search import FtsBackfill, IRC_LOG_FTS, create_fts_index
+
+IRCLogRecord = namedtuple("IRCLogRecord", ["message", "date_create"])
+RING_SIZE: int = 1000 # максимальное количество последних строк, хранимых в памяти
+NICK_PATTERN = re.compile(r"^<([^>]+)>") # строки чата имеют вид "<ник> сообщение"
+TAIL_QUERY: str = "select r.message from (select l.rowid, l.message from irc_log l order by l.rowid desc limit ?) r order by r.rowid asc"
+
+class IRCLogStore(DBWriter):
+    DB_FILENAME: str = "irc.db" # база данных для хранения чатлогов IRC
+
+    def __init__(self, db_filename: str = DB_FILENAME, queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        DBWriter.__init__(self, db_filename, queue_size, batch_size, flush_interval)
+        self.recent = deque(maxlen=RING_SIZE) # кольцевой буфер последних строк чата
+        self._recent_lock = threading.Lock()
+        self._warmed: bool = False # буфер заполнен из БД при запуске
+        self.backfill: FtsBackfill = None # индексация для /search строк, записанных до появления индекса
+
+    def migrate(self, cur: sqlite3.Cursor) -> None:
+        cur.execute('''
+            create table if not exists irc_log (
+              message text,
+              date_create text not null default current_timestamp
+            )
+        ''')
+        cur.execute("create index if not exists idx_irc_log_date_create on irc_log (date_create)")
+        cur.execute("select 1 from sqlite_master where type = 'table' and name = 'irc_hourly_counts'")
+        build_rollups: bool = cur.fetchone() is None
+        cur.execute('''
+            create table if not exists irc_hourly_counts (
+              hour text primary key not null,
+              messages integer not null
+            ) without rowid
+        ''')
+        cur.execute('''
+            create table if not exists irc_nick_activity (
+              nick text primary key not null,
+              first_seen text not null,
+              last_seen text not null,
+              messages integer not null
+            ) without rowid
+        ''')
+        if build_rollups: # сводные таблицы появились только что - заполняем их по уже записанному чатлогу (однократно)
+            cur.execute("insert into irc_hourly_counts (hour, messages) select substr(date_create, 1, 13), count(*) from irc_log group by 1")
+            cur.execute('''
+                insert into irc_nick_activity (nick, first_seen, last_seen, messages)
+                  select substr(message, 2, instr(message, '>') - 2), min(date_create), max(date_create), count(*)
+                    from irc_log
+                    where message like '<%>%'
+                    group by 1
+            ''')
+        cur.execute(TAIL_QUERY, (RING_SIZE,)) # прогрев буфера последними строками из БД
+        rows = cur.fetchall()
+        with self._recent_lock:
+            pending = list(self.recent)
+            self.recent.clear()
+            self.recent.extend(row[0] for row in rows)
+            self.recent.extend(pending)
+            self._warmed = True
+        if create_fts_index(cur, IRC_LOG_FTS): # индекс для /search обновляется триггерами
+            self.backfill = FtsBackfill(self.db_filename, IRC_LOG_FTS)
+
+    def start(self) -> bool:
+        if not DBWriter.start(self):
+            return False
+        if self.backfill is not None:
+            self.backfill.start()
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self.backfill is not None:
+            self.backfill.close(timeout)
+        DBWriter.close(self, timeout)
+
+    def add(self, msg: str) -> bool:
+        """
+        * Постановка строки чата в очередь на запись
+        *
+        * @param msg Текст сообщения
+        * @return True, если сообщение принято в очередь
+        """
+        with self._recent_lock:
+            self.recent.append(msg)
+        return self.put(IRCLogRecord(msg, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())))
+
+    def tail(self, limit: int) -> list:
+        """
+        * Получение последних строк чата
+        * (из буфера в памяти, а если он не прогрет - из БД по rowid)
+        *
+        * @param limit Количество строк (не больше RING_SIZE)
+        * @return Список строк в хронологическом порядке
+        """
+        with self._recent_lock:
+            if self._warmed:
+                count: int = min(limit, len(self.recent))
+                return [self.recent[i] for i in range(len(self.recent) - count, len(self.recent))]
+        return self.query_tail(limit)
+
+    def query_tail(self, limit: int) -> list:
+        """
+        * Получение последних строк чата из БД (без полного просмотра таблицы)
+        *
+        * @param limit Количество строк
+        * @return Список строк в хронологическом порядке
+        """
+        result = []
+        try:
+            with closing(sqlite3.connect(self.db_filename, timeout=5)) as conn:
+                cur = conn.cursor()
+                try:
+                    cur.execute(TAIL_QUERY, (limit,))
+                    result = [row[0] for row in cur.fetchall()]
+                finally:
+                    cur.close()
+        except MemoryError as me:
+            print(f"Ошибка: Недостаточно памяти для загрузки всех данных. {me}")
+        except OperationalError as e:
+            print(f"База данных, по всей видимости, заблокирована, или ресурс недоступен: {e}")
+        except Error as e:
+            print(f"Произошла ошибка: {e}")
+        return result
+
+    def write_batch(self, cur: sqlite3.Cursor, items: list) -> None:
+        cur.executemany("insert into irc_log (message, date_create) values (?, ?)", items)
+        self.write_rollups(cur, items)
+
+    def write_rollups(self, cur: sqlite3.Cursor, items: list) -> None:
+        """
+        * Обновление сводных таблиц (одна запись на час и участника в пределах пакета)
+        """
+        hourly = Counter(item.date_create[:13] for item in items)
+        cur.executemany(
+            "insert into irc_hourly_counts (hour, messages) values (?, ?) "
+            "on conflict (hour) do update set messages = messages + excluded.messages",
+            hourly.items()
+        )
+        activity = {} # ник -> [первое сообщение, последнее сообщение, количество]
+        for item in items:
+            match = NICK_PATTERN.match(item.message)
+            if match is None: # служебные строки (например, "Disconnected.")
+                continue
+            seen = activity.get(match.group(1))
+            if seen is None:
+                activity[match.group(1)] = [item.date_create, item.date_create, 1]
+            else:
+                seen[1] = max(seen[1], item.date_create)
+                seen[2] += 1
+        cur.executemany(
+            "insert into irc_nick_activity (nick, first_seen, last_seen, messages) values (?, ?, ?, ?) "
+            "on conflict (nick) do update set last_seen = max(last_seen, excluded.last_seen), messages = messages + excluded.messages",
+            ((nick, *seen) for nick, seen in activity.items())
+        )
@@ -0,0 +1,214 @@
+"""
+* Класс "Пул шуток"
+* *************************
+* Шутки с https://downgrade.hoho.ws загружаются заранее в фоновом
+* потоке и хранятся в памяти отдельно для каждого языка. Когда шуток
+* становится меньше нижней границы, пул пополняется до полного размера.
+* Повторяющиеся шутки отбрасываются. Содержимое пула сохраняется в файл
+* и загружается при следующем запуске, поэтому /phrase не ждёт сервер.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import json
+import os
+import threading
+from collections import namedtuple, deque, OrderedDict
+
+from downgrade import Downgrade
+
+JokeStats = namedtuple("JokeStats", ["available", "fetched", "duplicates", "failures", "served", "empty"])
+DEFAULT_POOL_SIZE: int = 50 # сколько шуток держать в пуле для каждого языка
+DEFAULT_LOW_WATERMARK: int = 10 # при каком остатке начинать пополнение пула
+DEFAULT_RETRY_INTERVAL: float = 60 # пауза после неудачной загрузки (в секундах)
+DEFAULT_POOL_FILE: str = "jokes.json" # файл для сохранения пула между запусками
+SEEN_LIMIT: int = 1000 # сколько последних шуток помнить для отбрасывания повторов
+MAX_ATTEMPTS_FACTOR: int = 3 # во сколько раз попыток загрузки больше, чем недостающих шуток
+
+class JokePool:
+
+    def __init__(self, languages: list, pool_size: int = DEFAULT_POOL_SIZE, low_watermark: int = DEFAULT_LOW_WATERMARK, filename: str = DEFAULT_POOL_FILE, proxy_url: str = "", retry_interval: float = DEFAULT_RETRY_INTERVAL):
+        """
+        * @param languages Двухбуквенные коды языков (например, "ru")
+        * @param pool_size Сколько шуток держать в пуле для каждого языка
+        * @param low_watermark При каком остатке начинать пополнение пула
+        * @param filename Файл для сохранения пула (пустая строка - не сохранять)
+        * @param proxy_url URL proxy-сервера
+        * @param retry_interval Пауза после неудачной загрузки (в секундах)
+        """
+        self.pool_size = pool_size if pool_size > 0 else DEFAULT_POOL_SIZE
+        self.low_watermark = min(low_watermark if low_watermark >= 0 else DEFAULT_LOW_WATERMARK, self.pool_size - 1)
+        self.filename = filename
+        self.proxy_url = proxy_url
+        self.retry_interval = retry_interval if retry_interval > 0 else DEFAULT_RETRY_INTERVAL
+        self.fetched: int = 0 # загружено новых шуток
+        self.duplicates: int = 0 # отброшено повторов
+        self.failures: int = 0 # неудачных загрузок
+        self.served: int = 0 # выдано шуток
+        self.empty: int = 0 # сколько раз пул оказался пуст
+        self._pools = OrderedDict((lang.lower(), deque()) for lang in languages)
+        self._seen = {lang: OrderedDict() for lang in self._pools} # последние шутки (для отбрасывания повторов)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def load(self) -> int:
+        """
+        * Загрузка пула из файла
+        *
+        * @return Количество загруженных шуток
+        """
+        if "".__eq__(self.filename) or not os.path.isfile(self.filename):
+            return 0
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                data: dict = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Не удалось прочитать файл пула шуток {self.filename}: {e}")
+            return 0
+        loaded: int = 0
+        with self._lock:
+            for lang, jokes in data.items():
+                if lang in self._pools and isinstance(jokes, list):
+                    for joke in jokes[:self.pool_size]:
+                        if isinstance(joke, str) and self._remember(lang, joke):
+                            self._pools[lang].append(joke)
+                            loaded += 1
+        return loaded
+
+    def save(self) -> bool:
+        """
+        * Сохранение пула в файл (через временный файл, чтобы не испортить старый)
+        *
+        * @return True, если пул сохранён
+        """
+        if "".__eq__(self.filename):
+            return False
+        with self._lock:
+            data = {lang: list(pool) for lang, pool in self._pools.items()}
+        temp_filename: str = f"{self.filename}.tmp"
+        try:
+            with open(temp_filename, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_filename, self.filename)
+            return True
+        except OSError as e:
+            print(f"Не удалось сохранить пул шуток в файл {self.filename}: {e}")
+            return False
+
+    def start(self) -> None:
+        """
+        * Загрузка сохранённого пула и запуск фонового пополнения
+        """
+        if self._thread is not None or not self._pools:
+            return
+        self.load()
+        self._thread = threading.Thread(target=self._run, name="JokePool", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка фонового пополнения и сохранение пула
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.save()
+
+    def language(self, code: str) -> str:
+        """
+        * Язык пула для кода языка пользователя
+        *
+        * @param code Код языка из Telegram (например, "ru" или "en-US")
+        * @return Код языка, если для него есть пул, иначе первый язык из настроек
+        """
+        lang: str = (code or "").split("-", 1)[0].strip().lower()
+        if lang in self._pools:
+            return lang
+        return next(iter(self._pools), "")
+
+    def pop(self, lang: str) -> str:
+        """
+        * Шутка из пула (без обращения к сети)
+        *
+        * @param lang Двухбуквенный код языка
+        * @return Текст шутки (пустая строка, если пул пуст)
+        """
+        with self._lock:
+            pool: deque = self._pools.get(lang.lower())
+            if not pool:
+                self.empty += 1
+                self._wakeup.set()
+                return ""
+            joke: str = pool.popleft()
+            self.served += 1
+            if len(pool) <= self.low_watermark:
+                self._wakeup.set()
+            return joke
+
+    def stats(self) -> JokeStats:
+        with self._lock:
+            return JokeStats(sum(len(pool) for pool in self._pools.values()), self.fetched, self.duplicates, self.failures, self.served, self.empty)
+
+    def _remember(self, lang: str, joke: str) -> bool:
+        """
+        * Запоминание шутки (вызывается под блокировкой)
+        *
+        * @return False, если такая шутка уже встречалась
+        """
+        seen: OrderedDict = self._seen[lang]
+        if joke in seen:
+            seen.move_to_end(joke)
+            return False
+        seen[joke] = None
+        while len(seen) > SEEN_LIMIT:
+            seen.popitem(last=False)
+        return True
+
+    def _fill(self, lang: str) -> bool:
+        """
+        * Пополнение пула одного языка до полного размера
+        *
+        * @return False, если сервер не отвечает
+        """
+        with self._lock:
+            missing: int = self.pool_size - len(self._pools[lang])
+        added: int = 0
+        for _ in range(missing * MAX_ATTEMPTS_FACTOR):
+            if added >= missing or self._stop.is_set():
+                break
+            joke: str = Downgrade.jokes_script(lang, self.proxy_url).strip()
+            with self._lock:
+                if "".__eq__(joke):
+                    self.failures += 1
+                    return False
+                if self._remember(lang, joke):
+                    self._pools[lang].append(joke)
+                    self.fetched += 1
+                    added += 1
+                else:
+                    self.duplicates += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            available: bool = True
+            changed: bool = False
+            for lang in self._pools:
+                with self._lock:
+                    needed: bool = len(self._pools[lang]) <= self.low_watermark
+                if needed:
+                    available = self._fill(lang) and available
+                    changed = True
+            if changed:
+                self.save()
+            if available:
+                self._wakeup.wait()
+            else: # сервер не отвечает - повторим позже
+                self._stop.wait(self.retry_interval)
@@ -0,0 +1,158 @@
+"""
+* Класс "Неблокирующий журнал"
+* *************************
+* Записи журнала ставятся в ограниченную очередь (QueueHandler),
+* а в файл их пишет отдельный поток (QueueListener). Поэтому
+* медленный диск не задерживает потоки Telegram и IRC: если очередь
+* переполнена, запись отбрасывается и учитывается счётчиком потерь.
+* Файл журнала ротируется по размеру или по времени, старые файлы
+* можно сжимать (gzip), а записи - писать в формате JSON Lines.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from collections import namedtuple
+
+from metrics import get_metrics
+
+LogStats = namedtuple("LogStats", ["queued", "written", "dropped"])
+ROTATE_SIZE: str = "size" # ротация при достижении размера файла
+ROTATE_TIME: str = "time" # ротация по времени (например, в полночь)
+DEFAULT_QUEUE_SIZE: int = 10000 # сколько записей может ждать записи в файл
+DEFAULT_MAX_BYTES: int = 10485760 # размер файла журнала для ротации (в байтах)
+DEFAULT_WHEN: str = "midnight" # момент ротации по времени (см. TimedRotatingFileHandler)
+DEFAULT_BACKUP_COUNT: int = 5 # сколько старых файлов журнала хранить
+TEXT_FORMAT: str = "%(asctime)s - %(levelname)s - %(message)s"
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    * Постановка записей в очередь без ожидания (при переполнении запись отбрасывается)
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        logging.handlers.QueueHandler.__init__(self, log_queue)
+        self.dropped: int = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    * Запись журнала в виде одной строки JSON
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """
+    * Поток записи в файл, который при остановке дописывает всю очередь
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel) # ждём места в очереди (put_nowait при переполнении бросил бы queue.Full)
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class LogPipeline:
+
+    def __init__(self, filename: str, rotation: str = ROTATE_SIZE, max_bytes: int = DEFAULT_MAX_BYTES, when: str = DEFAULT_WHEN, backup_count: int = DEFAULT_BACKUP_COUNT, json_lines: bool = False, compress: bool = False, queue_size: int = DEFAULT_QUEUE_SIZE, level: int = logging.INFO):
+        """
+        * @param filename Файл журнала
+        * @param rotation Вид ротации: ROTATE_SIZE или ROTATE_TIME
+        * @param max_bytes Размер файла для ротации по размеру (в байтах)
+        * @param when Момент ротации по времени ("midnight", "H", "D" и т.д.)
+        * @param backup_count Сколько старых файлов журнала хранить
+        * @param json_lines Писать записи в формате JSON Lines
+        * @param compress Сжимать старые файлы журнала (gzip)
+        * @param queue_size Размер очереди записей
+        * @param level Минимальный уровень записей
+        """
+        self.filename = filename
+        self.rotation = rotation if rotation in (ROTATE_SIZE, ROTATE_TIME) else ROTATE_SIZE
+        self.max_bytes = max_bytes if max_bytes > 0 else DEFAULT_MAX_BYTES
+        self.when = when
+        self.backup_count = backup_count if backup_count >= 0 else DEFAULT_BACKUP_COUNT
+        self.json_lines = json_lines
+        self.compress = compress
+        self.level = level
+        self.written: int = 0 # записано в файл
+        self._queue = queue.Queue(queue_size if queue_size > 0 else DEFAULT_QUEUE_SIZE)
+        self._queue_handler = DroppingQueueHandler(self._queue)
+        self._file_handler: logging.Handler = None
+        self._listener: _DrainingQueueListener = None
+
+    def _create_file_handler(self) -> logging.Handler:
+        if self.rotation == ROTATE_TIME:
+            handler = logging.handlers.TimedRotatingFileHandler(self.filename, when=self.when, backupCount=self.backup_count, encoding="utf-8")
+        else:
+            handler = logging.handlers.RotatingFileHandler(self.filename, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8")
+        if self.compress:
+            handler.namer = _gzip_namer
+            handler.rotator = _gzip_rotator
+        handler.setFormatter(JsonLinesFormatter() if self.json_lines else logging.Formatter(TEXT_FORMAT))
+        handler.addFilter(self._count)
+        return handler
+
+    def _count(self, record: logging.LogRecord) -> bool:
+        self.written += 1 # вызывается только из потока QueueListener
+        return True
+
+    def start(self, logger: logging.Logger = None) -> None:
+        """
+        * Запуск потока записи и подключение очереди к журналу
+        *
+        * @param logger Журнал (по умолчанию - корневой)
+        """
+        if self._listener is not None:
+            return
+        logger = logger if logger is not None else logging.getLogger()
+        self._file_handler = self._create_file_handler()
+        self._listener = _DrainingQueueListener(self._queue, self._file_handler)
+        self._listener.start()
+        logger.addHandler(self._queue_handler)
+        logger.setLevel(self.level)
+        get_metrics().gauge("log_queue_depth", self._queue.qsize)
+        get_metrics().gauge("log_dropped_total", lambda: self._queue_handler.dropped)
+
+    def stop(self, logger: logging.Logger = None) -> None:
+        """
+        * Запись оставшихся в очереди записей и закрытие файла журнала
+        """
+        if self._listener is None:
+            return
+        (logger if logger is not None else logging.getLogger()).removeHandler(self._queue_handler)
+        self._listener.stop() # поток завершается после записи всей очереди
+        self._listener = None
+        self._file_handler.close()
+        self._file_handler = None
+
+    def stats(self) -> LogStats:
+        return LogStats(self._queue.qsize(), self.written, self._queue_handler.dropped)
@@ -15,14 +15,15 @@
 
 import logging, sys
 import os
-import configparser
 import argparse
 import time, threading
+from concurrent.futures import Future
 import shlex
+import html
+import io
 import random
-
-import sqlite3
-from sqlite3 import IntegrityError, OperationalError, Error
+import secrets
+from typing import TYPE_CHECKING
 
 from requests.exceptions import ProxyError
 from telebot.apihelper import ApiTelegramException
@@ -33,23 +34,79 @@ from telebot import apihelper
 from telebot.types import Message
 
 from miscellaneous import Miscellaneous
-from downgrade import Downgrade
 from models import Constant
-from ircbot import IRCBot
-from irc.client import ServerNotConnectedError
-from chatscript import ChatScript
+from reply import ReplyBuilder, PARSE_MODE_HTML
+from commands import CommandRegistry, EXEC_IO, EXEC_SUBPROCESS
+from httpclient import get_client
+from rssfeed import RssPoller, DEFAULT_POLL_INTERVAL, DEFAULT_MAX_ITEMS
+from phrasestore import PhraseStore, DEFAULT_HISTORY
+from webhook import WebhookServer, DEFAULT_LISTEN as DEFAULT_WEBHOOK_LISTEN, DEFAULT_PORT as DEFAULT_WEBHOOK_PORT, DEFAULT_PATH as DEFAULT_WEBHOOK_PATH, DEFAULT_WORKERS as DEFAULT_WEBHOOK_WORKERS
+from metrics import get_metrics, MetricsServer, DEFAULT_LISTEN as DEFAULT_METRICS_LISTEN, DEFAULT_PORT as DEFAULT_METRICS_PORT
+from timers import TimerScheduler, Timer, DEFAULT_TIMER_QUEUE_SIZE
+from jokepool import JokePool, DEFAULT_POOL_SIZE, DEFAULT_LOW_WATERMARK, DEFAULT_POOL_FILE, DEFAULT_RETRY_INTERVAL
+from sendqueue import SendScheduler, DEFAULT_GLOBAL_RATE, DEFAULT_CHAT_RATE, DEFAULT_GROUP_RATE, DEFAULT_CHAT_BURST, DEFAULT_WORKERS
+from chatscript import ChatScript, AsyncChatScript, ChatScriptGuard, DEFAULT_MAX_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from breaker import DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL, STATE_CLOSED
+from settings import Settings, SettingsSnapshot
+from dbwriter import DEFAULT_QUEUE_SIZE, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+from msgstore import MessageStore
+from irclog import IRCLogStore
+from report import REPORTS, DEFAULT_DAYS as DEFAULT_REPORT_DAYS, build_report, format_table
+from search import ChatSearch, USER_MESSAGES_FTS, IRC_LOG_FTS, DEFAULT_PAGE_SIZE
+from maintenance import Maintenance, RetentionPolicy, COMPRESSION_AUTO, DEFAULT_ARCHIVE_DIR, DEFAULT_INTERVAL as DEFAULT_MAINTENANCE_INTERVAL, DEFAULT_BATCH_SIZE as DEFAULT_PURGE_BATCH_SIZE, DEFAULT_VACUUM_PAGES
+from cmdrunner import CommandRunner, DEFAULT_MAX_CONCURRENT as DEFAULT_CMD_MAX_CONCURRENT, DEFAULT_TIMEOUT as DEFAULT_CMD_TIMEOUT, DEFAULT_TAIL_BYTES, DEFAULT_FILE_BYTES, DEFAULT_PROGRESS_INTERVAL
+from procsampler import ProcessSampler, SORT_CPU, SORT_MEM, DEFAULT_MAX_AGE as DEFAULT_PS_MAX_AGE
+from logqueue import LogPipeline, ROTATE_SIZE, ROTATE_TIME, DEFAULT_QUEUE_SIZE as DEFAULT_LOG_QUEUE_SIZE, DEFAULT_MAX_BYTES, DEFAULT_WHEN, DEFAULT_BACKUP_COUNT
+if TYPE_CHECKING: # модуль ircbot импортируется только при запуске IRC-бота
+    from ircbot import IRCBot, AsyncIRCBot
 
 MSG_NUMBER_LIMIT: int = 15 # лимит на количество одновременных сообщений от бота к пользователю
+WEATHER_TTL: float = 600 # время кэширования прогноза погоды (в секундах)
+OUTER_IP_TTL: float = 60 # время кэширования внешнего IP-адреса (в секундах)
+RSS_FEED_URL: str = "https://habr.com/ru/rss/hub/webdev/all/?fl=ru" # RSS-лента по умолчанию (если в настройках ленты не заданы)
+RSS_WAIT_TIME: float = 10 # сколько секунд /rss ждёт первой загрузки лент
+PHRASE_FILE: str = "phrase.txt" # файл фраз по умолчанию (если в настройках файлы не заданы)
+LINE_NUMBER_LIMIT: int = 200 # лимит на количество строк в одном ответе (строки упаковываются в сообщения)
 LOG_FILE: str = f"{__name__}.log" # имя файла для ведения лога
-cnt: int = 0
+RUNTIME_THREADS: str = "threads" # режим работы: Telegram и IRC в отдельных потоках (по умолчанию)
+RUNTIME_ASYNC: str = "async" # режим работы: всё в одном цикле событий asyncio
+IRC_WELCOME_TIMEOUT: float = 30 # через сколько секунд без приветствия сервера IRC выводить предупреждение
+SHUTDOWN_TIMEOUT: float = 10 # за сколько секунд должны завершиться все очереди при остановке
 
 debugged: bool = False # режим отладки (по умолчанию отключён)
 
 is_irc_bot_running = False # признак работы IRC-бота
-irc_bot: IRCBot = None
+irc_bot = None # IRCBot или AsyncIRCBot (модуль ircbot импортируется, только если IRC настроен)
+async_runtime = None # AsyncRuntime в режиме asyncio (модуль asyncbot требует aiohttp)
 
 is_chatscript_bot_running = False # признак работы ChatScript-бота
 oChatScript: ChatScript = None
+oChatScriptAsync: AsyncChatScript = None # асинхронный клиент ChatScript (для обработки сообщений)
+oChatScriptGuard: ChatScriptGuard = None # клиент ChatScript с автоматическим выключателем
+
+send_scheduler: SendScheduler = None # очередь исходящих сообщений Telegram
+message_store: MessageStore = None # фоновая запись сообщений в telegram.db (в режиме отладки)
+rss_poller: RssPoller = None # фоновый опрос RSS-лент
+phrase_store: PhraseStore = None # индексированные файлы фраз для /phrase
+joke_pool: JokePool = None # заранее загруженные шутки для /phrase
+JOKE_LANG: str = "ru" # язык шуток для /phrase
+metrics_server: MetricsServer = None # HTTP-сервер метрик Prometheus
+timer_scheduler: TimerScheduler = None # таймеры /timer (один поток, хранятся в timers.db)
+TIMER_EXPIRED_MSG: str = "Время истекло!"
+log_pipeline: LogPipeline = None # запись лога в файл отдельным потоком (в режиме отладки)
+startup_started: float = 0.0 # момент начала запуска (time.monotonic)
+first_message_received: bool = False # получено ли первое сообщение после запуска
+chat_search: ChatSearch = None # полнотекстовый поиск для /search
+maintenance: Maintenance = None # срок хранения, архивирование и сжатие telegram.db и irc.db
+SEARCH_PAGE_MARK: str = "#" # номер страницы в /search и /ps указывается последним словом: #2
+process_sampler: ProcessSampler = None # общий для всех запросов /ps снимок процессов
+PS_DEFAULT_COUNT: int = 15 # сколько процессов выводит /ps по умолчанию
+command_runner: CommandRunner = None # выполнение команд /cmd (ограничение количества и времени)
+CMD_SEND_TIMEOUT: float = 10 # сколько секунд /cmd ждёт отправки сообщения о ходе выполнения
+CMD_OUTPUT_FILE: str = "output.txt" # имя вложения с полным выводом /cmd
+CMD_MESSAGE_BUDGET: int = 3500 # длина сообщения /cmd после экранирования HTML (лимит Telegram - 4096)
+
+settings: Settings = Settings(Constant.SETTINGS_FILE.value, Constant.GLOBAL_CODEPAGE.value) # кэш файла настроек
 
 class LoggerWriter:
     """
@@ -77,62 +134,102 @@ class LoggerWriter:
         """
         self.original_stream.flush()  # очищаем и исходный поток
 
+def init_debug() -> None:
+    """
+    * Включение режима отладки и перенаправление вывода в лог
+    * (выполняется один раз при запуске программы)
+    """
+    global LOG_FILE
+    global debugged, log_pipeline
+    GLOBAL_SECTION: str = "global"
+    DEBUG: str = "debug"
+    if debugged == True: # включали и настраивали уже отладку?
+        return
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+        return
+    debugged = snapshot.getbool(GLOBAL_SECTION, DEBUG)
+    if ( # проверка, что файл лога доступен для записи
+        (debugged == True)
+        and (os.path.exists(LOG_FILE))
+        and (os.path.isfile(LOG_FILE))
+        and (not os.access(LOG_FILE, os.W_OK))
+    ):
+        debugged = False
+    if debugged == True:
+        Miscellaneous.print_message("Отладка включена.")
+        log_pipeline = LogPipeline(LOG_FILE, *get_log_config()) # запись в файл не задерживает потоки Telegram и IRC
+        log_pipeline.start()
+        logger = logging.getLogger(__name__)
+        # Перенаправление stdout и stderr
+        sys.stdout = LoggerWriter(logger, logging.INFO, sys.stdout)  # перехватываем print
+        sys.stderr = LoggerWriter(logger, logging.ERROR, sys.stderr)  # перехватываем ошибки
+    else:
+        Miscellaneous.print_message("Отладка выключена.")
+
+def get_log_config():
+    """
+    * Получение параметров записи лога
+    *
+    * @return Вид ротации, размер файла для ротации (в байтах), момент ротации по времени,
+    *         количество старых файлов, формат JSON Lines, сжатие старых файлов, размер очереди
+    """
+    LOG_SECTION: str = "log"
+    LOG_ROTATION: str = "rotation"
+    LOG_MAX_BYTES: str = "max_bytes"
+    LOG_WHEN: str = "when"
+    LOG_BACKUP_COUNT: str = "backup_count"
+    LOG_JSON: str = "json"
+    LOG_COMPRESS: str = "compress"
+    LOG_QUEUE_SIZE: str = "queue_size"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_rotation: str = snapshot.get(LOG_SECTION, LOG_ROTATION, ROTATE_SIZE).lower()
+        if l_rotation not in (ROTATE_SIZE, ROTATE_TIME):
+            raise ValueError(f"Неизвестный вид ротации лога: {l_rotation}")
+        return (
+            l_rotation,
+            snapshot.getint(LOG_SECTION, LOG_MAX_BYTES, DEFAULT_MAX_BYTES),
+            snapshot.get(LOG_SECTION, LOG_WHEN, DEFAULT_WHEN),
+            snapshot.getint(LOG_SECTION, LOG_BACKUP_COUNT, DEFAULT_BACKUP_COUNT),
+            snapshot.getbool(LOG_SECTION, LOG_JSON),
+            snapshot.getbool(LOG_SECTION, LOG_COMPRESS),
+            snapshot.getint(LOG_SECTION, LOG_QUEUE_SIZE, DEFAULT_LOG_QUEUE_SIZE)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return ROTATE_SIZE, DEFAULT_MAX_BYTES, DEFAULT_WHEN, DEFAULT_BACKUP_COUNT, False, False, DEFAULT_LOG_QUEUE_SIZE
+
 def get_bot_config():
     """
     * Получение конфигурации для бота
+    * (значения берутся из кэшированного снимка настроек)
     *
     * @return token, http_proxy, https_proxy
     """
-    global LOG_FILE
-    global debugged
     GLOBAL_SECTION: str = "global"
     PROXY_SECTION: str = "proxy"
     NO_PROXY: str = "DIRECT"
     TOKEN: str = "api_token"
     HTTP_PROXY: str = "http"
     HTTPS_PROXY: str = "https"
-    DEBUG: str = "debug"
-    config = configparser.ConfigParser()
     try:
-        with open(Constant.SETTINGS_FILE.value, 'r', encoding=Constant.GLOBAL_CODEPAGE.value) as f:
-            config.read_file(f)
-            if debugged == False: # включали и настраивали уже отладку?
-                if GLOBAL_SECTION in config and DEBUG in config[GLOBAL_SECTION]:
-                    debugged = (config[GLOBAL_SECTION][DEBUG].upper().strip() == "Y")
-                if ( # проверка, что файл лога доступен для записи
-                    (debugged == True)
-                    and (os.path.exists(LOG_FILE))
-                    and (os.path.isfile(LOG_FILE))
-                    and (not os.access(LOG_FILE, os.W_OK))
-                ):
-                    debugged = False
-                if debugged == True:
-                    Miscellaneous.print_message("Отладка включена.")
-                    logging.basicConfig(
-                        format='%(asctime)s - %(levelname)s - %(message)s',
-                        filename=LOG_FILE, # логирование в файл
-                        level=logging.INFO
-                    )
-                    logger = logging.getLogger(__name__)
-                    # Перенаправление stdout и stderr
-                    sys.stdout = LoggerWriter(logger, logging.INFO, sys.stdout)  # перехватываем print
-                    sys.stderr = LoggerWriter(logger, logging.ERROR, sys.stderr)  # перехватываем ошибки
-                else:
-                    Miscellaneous.print_message("Отладка выключена.")
-            if GLOBAL_SECTION in config and TOKEN in config[GLOBAL_SECTION]:
-                v_token: str = config[GLOBAL_SECTION][TOKEN].strip()
-            if PROXY_SECTION in config and HTTP_PROXY in config[PROXY_SECTION]:
-                v_http_proxy: str = config[PROXY_SECTION][HTTP_PROXY].strip()
-                if v_http_proxy.upper() == NO_PROXY:
-                    v_http_proxy = ""
-            if PROXY_SECTION in config and HTTPS_PROXY in config[PROXY_SECTION]:
-                v_https_proxy: str = config[PROXY_SECTION][HTTPS_PROXY].strip()
-                if v_https_proxy.upper() == NO_PROXY:
-                    v_https_proxy = ""
-            if "".__eq__(v_token):
-                return None, None, None
-            else:
-                return v_token, v_http_proxy, v_https_proxy
+        snapshot: SettingsSnapshot = settings.get()
+        v_token: str = snapshot.get(GLOBAL_SECTION, TOKEN)
+        v_http_proxy: str = snapshot.get(PROXY_SECTION, HTTP_PROXY)
+        if v_http_proxy.upper() == NO_PROXY:
+            v_http_proxy = ""
+        v_https_proxy: str = snapshot.get(PROXY_SECTION, HTTPS_PROXY)
+        if v_https_proxy.upper() == NO_PROXY:
+            v_https_proxy = ""
+        if "".__eq__(v_token):
+            return None, None, None
+        else:
+            return v_token, v_http_proxy, v_https_proxy
     except FileNotFoundError:
         Miscellaneous.print_message(f"Ошибка: Файл настроек не найден: {Constant.SETTINGS_FILE.value}")
         return None, None, None
@@ -140,20 +237,86 @@ def get_bot_config():
         Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
         return None, None, None
 
-def send_message(bot: telebot, chat_id: int, msg: str) -> None:
+def log_sent_message(chat_id: int, reply_msg: Message) -> None:
+    """
+    * Вывод в консоль результата отправки сообщения
+    *
+    * @param chat_id Уникальный идентификатор пользователя в Telegram
+    * @param reply_msg Отправленное сообщение
+    """
+    if reply_msg is not None and not "".__eq__(reply_msg.text):
+        Miscellaneous.print_message(f"Ответ пользователю {chat_id}: {chr(34)}{reply_msg.text}{chr(34)}.")
+    else:
+        Miscellaneous.print_message(f"Пользователю {chat_id} не удалось отправить сообщение.")
+
+def log_sent_future(chat_id: int, future: Future) -> None:
+    """
+    * Обработчик завершения отправки сообщения из очереди
+    *
+    * @param chat_id Уникальный идентификатор пользователя в Telegram
+    * @param future Результат отправки
+    """
+    error = future.exception()
+    if error is None:
+        log_sent_message(chat_id, future.result())
+    else:
+        print_error(f"Пользователю {chat_id} не удалось отправить сообщение.", f"{error}")
+
+def send_message(bot: telebot, chat_id: int, msg: str, parse_mode: str = None) -> Future:
     """
     * Отправка сообщения для пользователя в Telegram
+    * (через очередь исходящих сообщений, если она запущена)
     *
     * @param bot Экземпляр бота
     * @param chat_id Уникальный идентификатор пользователя в Telegram
     * @param msg Текст сообщения
+    * @param parse_mode Режим разметки текста (None - без разметки)
+    * @return Future с отправленным сообщением (None, если текст пустой)
     """
-    if not "".__eq__(msg):
-        reply_msg: Message = bot.send_message(chat_id, msg)
-        if reply_msg is not None and not "".__eq__(reply_msg.text):
-            Miscellaneous.print_message(f"Ответ пользователю {chat_id}: {chr(34)}{reply_msg.text}{chr(34)}.")
-        else:
-            Miscellaneous.print_message(f"Пользователю {chat_id} не удалось отправить сообщение.")
+    if "".__eq__(msg):
+        return None
+    if send_scheduler is None:
+        future: Future = Future()
+        with get_metrics().timer("telegram_send_seconds"):
+            future.set_result(bot.send_message(chat_id, msg, parse_mode=parse_mode))
+        log_sent_message(chat_id, future.result())
+        return future
+    future: Future = send_scheduler.submit(chat_id, bot.send_message, chat_id, msg, parse_mode=parse_mode)
+    future.add_done_callback(lambda f: log_sent_future(chat_id, f))
+    return future
+
+def send_request(chat_id: int, func, *args, **kwargs) -> Future:
+    """
+    * Выполнение запроса к Telegram (редактирование сообщения, отправка файла и т.д.)
+    * (через очередь исходящих сообщений, если она запущена)
+    *
+    * @param chat_id Уникальный идентификатор пользователя в Telegram
+    * @param func Метод бота
+    * @return Future с результатом запроса
+    """
+    if send_scheduler is not None:
+        return send_scheduler.submit(chat_id, func, *args, **kwargs)
+    future: Future = Future()
+    try:
+        with get_metrics().timer("telegram_send_seconds"):
+            future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def send_lines(bot: telebot, chat_id: int, lines, monospace: bool = False, header: str = "") -> None:
+    """
+    * Отправка многострочного ответа минимальным количеством сообщений
+    *
+    * @param bot Экземпляр бота
+    * @param chat_id Уникальный идентификатор пользователя в Telegram
+    * @param lines Строки ответа
+    * @param monospace Выводить строки моноширинным шрифтом
+    * @param header Заголовок (обычным шрифтом) в начале ответа
+    """
+    builder: ReplyBuilder = ReplyBuilder(monospace, header, max_messages=MSG_NUMBER_LIMIT).extend(lines)
+    for msg in builder.messages():
+        send_message(bot, chat_id, msg, builder.parse_mode)
 
 def print_error(err_msg: str, err_code: str) -> None:
     """
@@ -165,6 +328,431 @@ def print_error(err_msg: str, err_code: str) -> None:
     Miscellaneous.print_message(err_msg)
     Miscellaneous.print_message(f"Код ошибки: {err_code}")
 
+"""
+* *************************
+* КОМАНДЫ TELEGRAM-БОТА
+* (регистрируются в реестре; порядок регистрации - порядок в /help)
+* *************************
+"""
+registry: CommandRegistry = CommandRegistry() # реестр команд Telegram-бота
+
+@registry.command("hello", hidden=True)
+def cmd_hello(bot: telebot, message: Message, args: str) -> None:
+    send_message(bot, message.chat.id, "И тебе hello!")
+
+@registry.command("/ip")
+def cmd_ip(bot: telebot, message: Message, args: str) -> None:
+    local_ips = Miscellaneous.get_local_ip_addresses()
+    if local_ips:
+        send_lines(bot, message.chat.id, local_ips, header="Локальные IP-адреса:")
+    else:
+        send_message(bot, message.chat.id, "Не удалось получить локальные IP-адреса.")
+
+@registry.command("/username")
+def cmd_username(bot: telebot, message: Message, args: str) -> None:
+    send_message(bot, message.chat.id, Miscellaneous.get_username())
+
+@registry.command("/ps", "/process", "/processes", execution=EXEC_IO, takes_args=True)
+def cmd_ps(bot: telebot, message: Message, args: str) -> None: # /ps [cpu|mem|name <подстрока>] [количество] [#страница]
+    PS_ERR_MSG: str = f"Пример вызова: /ps cpu 10, /ps mem, /ps name python {SEARCH_PAGE_MARK}2"
+    words = args.split()
+    page: int = 1
+    count: int = PS_DEFAULT_COUNT
+    sort: str = SORT_CPU
+    pattern: str = ""
+    if words and words[-1].startswith(SEARCH_PAGE_MARK) and words[-1][len(SEARCH_PAGE_MARK):].isdigit():
+        page = max(int(words.pop()[len(SEARCH_PAGE_MARK):]), 1)
+    if words and "name".__eq__(words[0].lower()): # /ps name 1234 - поиск по "1234", количество - только после подстроки
+        if len(words) > 2 and words[-1].isdigit():
+            count = min(max(int(words.pop()), 1), LINE_NUMBER_LIMIT)
+        pattern = " ".join(words[1:])
+        words = [] if not "".__eq__(pattern) else words
+    else:
+        if words and words[-1].isdigit():
+            count = min(max(int(words.pop()), 1), LINE_NUMBER_LIMIT)
+        if words and words[0].lower() in (SORT_CPU, SORT_MEM):
+            sort = words.pop(0).lower()
+    if words:
+        send_message(bot, message.chat.id, PS_ERR_MSG)
+        return
+    processes, total, age = get_process_sampler().top(sort, count, (page - 1) * count, pattern)
+    if not processes:
+        send_message(bot, message.chat.id, "Процессы не найдены." if page == 1 else f"Страницы {page} нет.")
+        return
+    lines = [f"{'PID':>7} {'CPU%':>6} {'RSS, МБ':>9}  Имя"]
+    lines.extend(f"{process.pid:>7} {process.cpu_percent:>6.1f} {process.rss / 1048576:>9.1f}  {process.name}" for process in processes)
+    header: str = f"Процессы по {'памяти' if sort == SORT_MEM else 'загрузке CPU'}{f' ({chr(34)}{pattern}{chr(34)})' if pattern else ''}, снимок {age:.0f} с назад:"
+    send_lines(bot, message.chat.id, lines, monospace=True, header=header)
+    footer: str = f"Общее количество процессов: {total}."
+    if page * count < total:
+        footer += f" Следующая страница: /ps {f'name {pattern}' if pattern else sort} {count} {SEARCH_PAGE_MARK}{page + 1}"
+    send_message(bot, message.chat.id, footer)
+
+@registry.command("/date", "/time")
+def cmd_date(bot: telebot, message: Message, args: str) -> None:
+    send_message(bot, message.chat.id, f"Текущая дата: {Miscellaneous.get_current_time()}.")
+
+@registry.command("/help", "/?")
+def cmd_help(bot: telebot, message: Message, args: str) -> None:
+    send_message(bot, message.chat.id, f"Команды, допустимые для использования: {registry.help_text()}")
+
+@registry.command("/quit", "/stop", "/exit", ignore_case=True)
+def cmd_quit(bot: telebot, message: Message, args: str) -> None: # команда завершения работы бота
+    send_message(bot, message.chat.id, "Goodbye, cruel world! Никогда больше к вам не вернусь.")
+    bot.stop_polling()
+    quit_app()
+
+@registry.async_handler("/quit")
+async def cmd_quit_async(bot: telebot, message: Message, args: str) -> None: # то же самое в режиме asyncio
+    send_message(bot, message.chat.id, "Goodbye, cruel world! Никогда больше к вам не вернусь.")
+    if async_runtime is not None: # цикл событий отключается от IRC и останавливается, quit_app() выполнит главный поток
+        async_runtime.stop()
+
+@registry.command("/stats", hidden=True)
+def cmd_stats(bot: telebot, message: Message, args: str) -> None: # метрики работы бота (только для администраторов)
+    if message.from_user.id not in get_admin_ids():
+        send_message(bot, message.chat.id, "Команда доступна только администраторам бота.")
+        return
+    stats_lines = []
+    for item in get_metrics().summary():
+        labels: str = ",".join(f"{value}" for name, value in item.labels)
+        stats_lines.append(f"{item.name}{'[' + labels + ']' if labels else ''}: n={item.count} err={item.errors} avg={item.avg * 1000:.1f} p50={item.p50 * 1000:.1f} p99={item.p99 * 1000:.1f} max={item.max * 1000:.1f} мс")
+    for name, labels, value in get_metrics().gauges():
+        labels_text: str = ",".join(f"{label_value}" for label_name, label_value in labels)
+        stats_lines.append(f"{name}{'[' + labels_text + ']' if labels_text else ''}: {value:g}")
+    if stats_lines:
+        send_lines(bot, message.chat.id, stats_lines, monospace=True, header="Метрики работы бота:")
+    else:
+        send_message(bot, message.chat.id, "Метрик пока нет.")
+
+@registry.command("/report", hidden=True, execution=EXEC_IO, takes_args=True)
+def cmd_report(bot: telebot, message: Message, args: str) -> None: # отчёты об активности по сводным таблицам (только для администраторов)
+    REPORT_ERR_MSG: str = f"Команду {chr(34)}report{chr(34)} можно вызывать с именем отчёта ({', '.join(REPORTS)}) и количеством дней. Пример вызова: /report daily 30"
+    if message.from_user.id not in get_admin_ids():
+        send_message(bot, message.chat.id, "Команда доступна только администраторам бота.")
+        return
+    params = args.split()
+    report_name: str = params[0].lower() if params else "users"
+    if report_name not in REPORTS:
+        send_message(bot, message.chat.id, REPORT_ERR_MSG)
+        return
+    try:
+        days: int = int(params[1]) if len(params) > 1 else DEFAULT_REPORT_DAYS
+    except ValueError:
+        send_message(bot, message.chat.id, REPORT_ERR_MSG)
+        return
+    report = build_report(report_name, days, LINE_NUMBER_LIMIT, MessageStore.DB_FILENAME, IRCLogStore.DB_FILENAME)
+    if report.rows:
+        send_lines(bot, message.chat.id, format_table(report).split("\n"), monospace=True, header=f"{report.title}:")
+    else:
+        send_message(bot, message.chat.id, "Данных для отчёта пока нет.")
+
+@registry.command("/ver", "/sys", execution=EXEC_IO)
+def cmd_ver(bot: telebot, message: Message, args: str) -> None:
+    sys_prop = Miscellaneous.get_system_properties()
+    send_message(bot, message.chat.id, f"ОС: {sys_prop[0]}, версия {sys_prop[1]}, релиз {sys_prop[2]}. ОЗУ: всего: {sys_prop[3]}; используется: {sys_prop[4]}; свободно: {sys_prop[5]}; процент использования: {sys_prop[6]}.")
+
+@registry.command("/printenv")
+def cmd_printenv(bot: telebot, message: Message, args: str) -> None:
+    environment_variables = os.environ
+    send_lines(bot, message.chat.id, [f"{key}: {value}" for key, value in list(environment_variables.items())[:LINE_NUMBER_LIMIT]])
+
+@registry.command("/phrase", execution=EXEC_IO)
+def cmd_phrase(bot: telebot, message: Message, args: str) -> None:
+    ph_choice: str = random.choice(["aphorism", "joke"])
+    phrase: str = ""
+    if ph_choice == "joke" and joke_pool is not None:
+        lang: str = joke_pool.language(message.from_user.language_code if message.from_user is not None else "")
+        phrase = joke_pool.pop(lang) # без обращения к сети; пул пополняется в фоне
+    if "".__eq__(phrase): # афоризм (или пул шуток пуст)
+        phrase = get_phrase_store().get_phrase(message.chat.id)
+    if not "".__eq__(phrase):
+        send_message(bot, message.chat.id, phrase)
+    else:
+        send_message(bot, message.chat.id, "Увы, фразы не заготовил.")
+
+@registry.command("/send", execution=EXEC_IO, takes_args=True)
+def cmd_send(bot: telebot, message: Message, args: str) -> None:
+    if "".__eq__(args):
+        send_message(bot, message.chat.id, f"Команду {chr(34)}send{chr(34)} нужно вызывать с передачей ей идентификатора получателя и текстом сообщения. Пример вызова: /send --user_id 03007 --msg Привет!_Как_у_тебя_дела?")
+        send_message(bot, message.chat.id, "Строка должна быть неразрывной, вместо пробелов следует использовать символ подчёркивания.")
+    else:
+        v_send: str = args
+        print(v_send)
+        send_parser = argparse.ArgumentParser(description="Отправка сообщения")
+        send_parser.add_argument("--user_id", type=int, help="Идентификатор получателя", required=True, dest="user_id")
+        send_parser.add_argument("--msg", type=str, help="Текст сообщения для получателя", required=True, dest="message")
+        try:
+            send_args = send_parser.parse_args(v_send.split())
+            send_message(bot, message.chat.id, "Отправка сообщения пользователю...")
+            sent: Future = send_message(bot, send_args.user_id, send_args.message)
+            if sent is not None:
+                sent.result() # ждём отправки, чтобы узнать об ошибке доступа
+            send_message(bot, message.chat.id, "Сообщение отправлено пользователю.")
+        except ApiTelegramException as err_api:
+            print_error("Вероятно, нет прав для отправки сообщения указанному адресату.", f"{err_api}")
+        except SystemExit:
+            send_message(bot, message.chat.id, f"Ошибка в команде {chr(34)}send{chr(34)}.")
+            send_message(bot, message.chat.id, f"Введите {chr(34)}/send{chr(34)}, чтобы узнать, как правильно использовать команду.")
+
+@registry.command("/weather", execution=EXEC_IO)
+def cmd_weather(bot: telebot, message: Message, args: str) -> None:
+    api_token, http_proxy, https_proxy = get_bot_config()
+    weather_lines = get_client().get_lines("https://wttr.in/?0T", http_proxy, https_proxy, WEATHER_TTL)
+    if weather_lines:
+        send_lines(bot, message.chat.id, weather_lines, monospace=True, header="Получен прогноз погоды. Данные представлены ниже.")
+    else:
+        send_message(bot, message.chat.id, "Прогноз погоды недоступен в данный момент времени.")
+
+@registry.command("/outer_ip", execution=EXEC_IO)
+def cmd_outer_ip(bot: telebot, message: Message, args: str) -> None:
+    api_token, http_proxy, https_proxy = get_bot_config()
+    outer_ip_lines = get_client().get_lines("https://icanhazip.com", http_proxy, https_proxy, OUTER_IP_TTL)
+    if outer_ip_lines:
+        send_lines(bot, message.chat.id, outer_ip_lines, header="Получены данные по внешнему IP-адресу. Они представлены ниже.")
+    else:
+        send_message(bot, message.chat.id, f"Невозможно определить {chr(34)}белый{chr(34)} IP-адрес.")
+
+@registry.command("/timer", takes_args=True)
+def cmd_timer(bot: telebot, message: Message, args: str) -> None:
+    TIMER_ERR_MSG: str = f"Команду {chr(34)}timer{chr(34)} нужно вызывать с передачей ей количества секунд (натуральное число). Пример вызова: /timer 15. Список таймеров: /timer list, отмена: /timer cancel <номер> или /timer cancel all"
+    if "".__eq__(args):
+        send_message(bot, message.chat.id, TIMER_ERR_MSG)
+    elif timer_scheduler is None:
+        send_message(bot, message.chat.id, "Таймеры недоступны в данный момент.")
+    else:
+        try:
+            timer_args = args.split()
+            if timer_args[0].lower() == "list":
+                chat_timers = timer_scheduler.list(message.chat.id)
+                if chat_timers:
+                    send_lines(bot, message.chat.id, [f"{timer.timer_id}: через {max(0, int(timer.due_at - time.time()))} с" for timer in chat_timers], header="Установленные таймеры:")
+                else:
+                    send_message(bot, message.chat.id, "Установленных таймеров нет.")
+            elif timer_args[0].lower() == "cancel":
+                if timer_args[1].lower() == "all":
+                    send_message(bot, message.chat.id, f"Отменено таймеров: {timer_scheduler.cancel_all(message.chat.id)}.")
+                elif timer_scheduler.cancel(message.chat.id, int(timer_args[1])):
+                    send_message(bot, message.chat.id, f"Таймер {timer_args[1]} отменён.")
+                else:
+                    send_message(bot, message.chat.id, f"Таймер {timer_args[1]} не найден.")
+            else:
+                timer_seconds: int = int(timer_args[0])
+                if timer_seconds <= 0:
+                    send_message(bot, message.chat.id, TIMER_ERR_MSG)
+                else:
+                    timer: Timer = timer_scheduler.add(message.chat.id, timer_seconds, TIMER_EXPIRED_MSG)
+                    send_message(bot, message.chat.id, f"Таймер {timer.timer_id} установлен на {timer_seconds} секунд.")
+        except (IndexError, ValueError):
+            send_message(bot, message.chat.id, TIMER_ERR_MSG)
+
+@registry.command("/calc", takes_args=True)
+def cmd_calc(bot: telebot, message: Message, args: str) -> None:
+    CALC_ERR_MSG: str = f"Команду {chr(34)}calc{chr(34)} нужно вызывать с передачей ей количества секунд (любое целое число). Пример вызова: /calc -30135"
+    if "".__eq__(args):
+        send_message(bot, message.chat.id, CALC_ERR_MSG)
+    else:
+        try:
+            calc_seconds: int = int(args.split()[0])
+            delta_time: str = Miscellaneous.get_delta_time(calc_seconds)
+            send_message(bot, message.chat.id, f"Для заданного количества секунд ({calc_seconds}) относительно текущего времени {Miscellaneous.get_current_time()} получается следующее время: {delta_time}.")
+        except (IndexError, ValueError):
+            send_message(bot, message.chat.id, CALC_ERR_MSG)
+
+@registry.command("/cmd", execution=EXEC_SUBPROCESS, takes_args=True)
+def cmd_cmd(bot: telebot, message: Message, args: str) -> None:
+    if "".__eq__(args):
+        send_message(bot, message.chat.id, f"В строке команды {chr(34)}cmd{chr(34)} задаётся вызов программы (и возможные параметры), которую требуется выполнить под операционной системой.")
+    else:
+        cmd_parts = shlex.split(args)
+        cmd_os: str = " ".join(cmd_parts)
+        if not Miscellaneous.is_dangerous_command(cmd_os):
+            run_command(bot, message.chat.id, cmd_parts)
+        else:
+            send_message(bot, message.chat.id, "Эта команда недопустима, поскольку является опасной.")
+
+def run_command(bot: telebot, chat_id: int, cmd_parts: list) -> None:
+    """
+    * Выполнение команды ОС с показом хода выполнения в одном сообщении
+    * (сообщение обновляется не чаще progress_interval; полный вывод, не поместившийся в сообщение, отправляется файлом)
+    *
+    * @param bot Экземпляр бота
+    * @param chat_id Уникальный идентификатор пользователя в Telegram
+    * @param cmd_parts Программа и её параметры
+    """
+    runner: CommandRunner = get_command_runner()
+    cmd_os: str = " ".join(cmd_parts)
+    progress_message = None
+    try:
+        progress_message = send_message(bot, chat_id, f"Выполняется: {cmd_os}").result(CMD_SEND_TIMEOUT)
+    except Exception as e: # ход выполнения не показывается, результат придёт отдельным сообщением
+        print_error(f"Пользователю {chat_id} не удалось отправить сообщение о ходе выполнения команды.", f"{e}")
+    last_edit: Future = None
+    def format_output(header: str, tail: str, footer: str = ""):
+        """
+        * Сообщение с концом вывода, укороченным так, чтобы после экранирования поместиться в CMD_MESSAGE_BUDGET
+        *
+        * @return Текст сообщения в разметке HTML, был ли вывод укорочен
+        """
+        header = html.escape(header)
+        budget: int = CMD_MESSAGE_BUDGET - ReplyBuilder.length(f"{header}\n<pre></pre>\n{footer}")
+        parts = []
+        for char in reversed(tail): # экранируем с конца по символу, чтобы не разрезать &lt; и т.п.
+            escaped: str = html.escape(char)
+            budget -= ReplyBuilder.length(escaped)
+            if budget < 0:
+                break
+            parts.append(escaped)
+        text: str = "".join(reversed(parts))
+        return f"{header}\n<pre>{text if text else ' '}</pre>{chr(10) + footer if footer else ''}", len(parts) < len(tail)
+    def show(text: str) -> Future:
+        if progress_message is None:
+            return send_message(bot, chat_id, text, PARSE_MODE_HTML)
+        return send_request(chat_id, bot.edit_message_text, text, chat_id, progress_message.message_id, parse_mode=PARSE_MODE_HTML)
+    def on_progress(tail: str, elapsed: float) -> None:
+        nonlocal last_edit
+        if progress_message is None or (last_edit is not None and not last_edit.done()): # предыдущее обновление ещё в очереди
+            return
+        last_edit = show(format_output(f"Выполняется ({elapsed:.0f} с): {cmd_os}", tail)[0])
+    try:
+        result = runner.run(cmd_parts, on_progress)
+    except OSError as e:
+        show(f"Не удалось запустить программу {html.escape(cmd_os)}: {html.escape(str(e))}")
+        return
+    if result is None:
+        show(f"Уже выполняется команд: {runner.max_concurrent}. Повторите позже.")
+        return
+    with result.output:
+        status: str = f"Код возврата: {result.return_code}, время выполнения: {result.elapsed:.1f} с."
+        if result.timed_out:
+            status = f"Команда выполнялась дольше {runner.timeout:g} с и была остановлена. {status}"
+        attach: bool = result.truncated or format_output(cmd_os, result.tail, status)[1]
+        if attach:
+            status += f" Показан конец вывода ({result.total_bytes} байт), полный вывод - в файле {CMD_OUTPUT_FILE}"
+            status += f" (первые {runner.file_bytes} байт)." if result.total_bytes > runner.file_bytes else "."
+        show(format_output(cmd_os, result.tail, status)[0])
+        if attach:
+            send_request(chat_id, bot.send_document, chat_id, io.BytesIO(result.output.read()), visible_file_name=CMD_OUTPUT_FILE)
+
+@registry.command("/rss", "/news", execution=EXEC_IO, takes_args=True)
+def cmd_rss(bot: telebot, message: Message, args: str) -> None:
+    RSS_ERR_MSG: str = f"Команду {chr(34)}rss{chr(34)} можно вызывать с номером ленты (натуральное число). Пример вызова: /rss 2"
+    if rss_poller is None:
+        send_message(bot, message.chat.id, "RSS-ленты не настроены.")
+        return
+    feed_indexes = range(len(rss_poller.feeds))
+    if not "".__eq__(args):
+        try:
+            feed_number: int = int(args.split()[0])
+        except ValueError:
+            send_message(bot, message.chat.id, RSS_ERR_MSG)
+            return
+        if not (1 <= feed_number <= len(rss_poller.feeds)):
+            send_message(bot, message.chat.id, f"Настроено лент: {len(rss_poller.feeds)}. {RSS_ERR_MSG}")
+            return
+        feed_indexes = [feed_number - 1]
+    rss_poller.wait_ready(RSS_WAIT_TIME) # только сразу после запуска; далее ленты уже в памяти
+    rss_lines = []
+    for feed_index in feed_indexes:
+        if len(feed_indexes) > 1:
+            rss_lines.append(f"[{feed_index + 1}] {rss_poller.feeds[feed_index].url}")
+        rss_lines.extend(f"{rss_item.title}: {rss_item.link}" for rss_item in rss_poller.items(feed_index, LINE_NUMBER_LIMIT))
+    send_lines(bot, message.chat.id, rss_lines[:LINE_NUMBER_LIMIT])
+
+@registry.command("/search", "/find", execution=EXEC_IO, takes_args=True)
+def cmd_search(bot: telebot, message: Message, args: str) -> None: # поиск по истории сообщений (свои сообщения в Telegram и чатлог IRC)
+    SEARCH_ERR_MSG: str = f"Команду {chr(34)}search{chr(34)} нужно вызывать со словами для поиска. Пример вызова: /search погода завтра (или /search погод* {SEARCH_PAGE_MARK}2 - вторая страница)"
+    terms = args.split()
+    page: int = 1
+    if terms and terms[-1].startswith(SEARCH_PAGE_MARK) and terms[-1][len(SEARCH_PAGE_MARK):].isdigit():
+        page = max(int(terms.pop()[len(SEARCH_PAGE_MARK):]), 1)
+    if not terms:
+        send_message(bot, message.chat.id, SEARCH_ERR_MSG)
+        return
+    is_admin: bool = message.from_user.id in get_admin_ids()
+    hits, has_next = get_chat_search().search(" ".join(terms), page, None if is_admin else message.from_user.id)
+    if not hits:
+        send_message(bot, message.chat.id, "Ничего не найдено." if page == 1 else f"Страницы {page} нет.")
+        return
+    lines = [
+        f"{hit.date_create} [{hit.source}{f' {hit.user_id}' if is_admin and hit.user_id is not None else ''}] {hit.snippet}"
+        for hit in hits
+    ]
+    if has_next:
+        lines.append(f"Следующая страница: /search {' '.join(terms)} {SEARCH_PAGE_MARK}{page + 1}")
+    send_lines(bot, message.chat.id, lines)
+
+@registry.command("/irc")
+def cmd_irc(bot: telebot, message: Message, args: str) -> None:
+    if is_irc_bot_running:
+        send_lines(bot, message.chat.id, irc_bot.get_irc_log(LINE_NUMBER_LIMIT))
+    else:
+        send_message(bot, message.chat.id, "IRC-бот не работает в данный момент.")
+
+@registry.default(execution=EXEC_IO)
+def cmd_chatscript(bot: telebot, message: Message, args: str) -> None: # если ничего не совпало, то передаём управление серверу ChatScript
+    if is_chatscript_bot_running == True and oChatScriptGuard is not None:
+        chatscript_bot_response: str = oChatScriptGuard.send_user_message_sync(message.text)
+        if not "".__eq__(chatscript_bot_response):
+            send_message(bot, message.chat.id, chatscript_bot_response)
+
+@registry.async_handler("*")
+async def cmd_chatscript_async(bot: telebot, message: Message, args: str) -> None: # то же самое в режиме asyncio (без выделения потока)
+    if is_chatscript_bot_running == True and oChatScriptGuard is not None:
+        chatscript_bot_response: str = await oChatScriptGuard.send_user_message(message.text)
+        if not "".__eq__(chatscript_bot_response):
+            send_message(bot, message.chat.id, chatscript_bot_response)
+
+def apply_proxy(http_proxy: str, https_proxy: str) -> None:
+    """
+    * Настройка proxy-серверов для обращений к Telegram API
+    """
+    apihelper.proxy = {}  # создаём пустой словарь
+    if not "".__eq__(http_proxy):
+        apihelper.proxy['http'] = http_proxy
+    if not "".__eq__(https_proxy):
+        apihelper.proxy['https'] = https_proxy
+
+def get_api_url() -> str:
+    """
+    * Получение адреса Telegram Bot API
+    * (например, локальный Bot API server или имитатор для нагрузочного тестирования)
+    *
+    * @return Шаблон адреса вида http://host:port/bot{0}/{1} (пустая строка - api.telegram.org)
+    """
+    TELEGRAM_SECTION: str = "telegram"
+    TELEGRAM_API_URL: str = "api_url"
+    try:
+        return settings.get().get(TELEGRAM_SECTION, TELEGRAM_API_URL, "").strip()
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return ""
+
+def log_startup_phase(phase: str, started: float) -> None:
+    """
+    * Вывод длительности этапа запуска (и учёт в метрике startup_phase_seconds)
+    *
+    * @param phase Название этапа
+    * @param started Момент начала этапа (time.monotonic)
+    """
+    now: float = time.monotonic()
+    get_metrics().observe("startup_phase_seconds", now - started, phase=phase)
+    Miscellaneous.print_message(f"Этап запуска {chr(34)}{phase}{chr(34)}: {now - started:.3f} с (с начала запуска: {now - startup_started:.3f} с).")
+
+def log_user_message(message: Message) -> None:
+    """
+    * Вывод в консоль входящего сообщения и его запись в БД (в режиме отладки)
+    *
+    * @param message Сообщение пользователя
+    """
+    global first_message_received
+    if not first_message_received: # время от запуска до первого сообщения
+        first_message_received = True
+        log_startup_phase("первое сообщение", startup_started)
+    Miscellaneous.print_message(f"Пользователь {message.from_user.id} (имя: {message.from_user.first_name}) оставил сообщение в Telegram: {chr(34)}{message.text}{chr(34)}.")
+    if debugged == True and message_store is not None: # если отладка включена, то пишем в БД (в фоне)
+        message_store.add(message.from_user.id, message.from_user.first_name, message.from_user.last_name, message.text)
+
 def run_bot(api_token: str, http_proxy: str, https_proxy: str) -> None:
     """
     * Запуск Telegram-бота
@@ -176,11 +764,10 @@ def run_bot(api_token: str, http_proxy: str, https_proxy: str) -> None:
     except ValueError as err_token:
         print_error("Значение токена задано неверно.", f"{err_token}")
     if bot is not None:
-        apihelper.proxy = {}  # создаём пустой словарь
-        if not "".__eq__(http_proxy):
-            apihelper.proxy['http'] = http_proxy
-        if not "".__eq__(https_proxy):
-            apihelper.proxy['https'] = https_proxy
+        apply_proxy(http_proxy, https_proxy)
+        api_url: str = get_api_url()
+        if not "".__eq__(api_url):
+            apihelper.API_URL = api_url
         """
         * *************************
         * ОБРАБОТКА ЗАПРОСОВ ОТ ПОЛЬЗОВАТЕЛЯ
@@ -189,243 +776,24 @@ def run_bot(api_token: str, http_proxy: str, https_proxy: str) -> None:
         """
         @bot.message_handler(content_types=["text"])
         def text(message): # вся ботовская "кухня" запрятана здесь
-            global cnt
-            global MSG_NUMBER_LIMIT
-            global debugged
-            global is_irc_bot_running, irc_bot # глобальные переменные для IRC-бота
-            global is_chatscript_bot_running, oChatScript # глобальные переменные для ChatScript-бота
-            api_token: str = ""
-            http_proxy: str = ""
-            https_proxy: str = ""
-            api_token, http_proxy, https_proxy = get_bot_config()
-            Miscellaneous.print_message(f"Пользователь {message.from_user.id} (имя: {message.from_user.first_name}) оставил сообщение в Telegram: {chr(34)}{message.text}{chr(34)}.")
-            if debugged == True: # если отладка включена, то начинаем писать в БД
-                with sqlite3.connect("telegram.db") as conn:
-                    cur = conn.cursor()
-                    try:
-                        cur.execute('''
-                            create table if not exists telegram_users (
-                              user_id integer primary key not null,
-                              first_name text,
-                              last_name text,
-                              date_create text not null default current_date
-                            )
-                        ''')
-                        cur.execute('''
-                            create table if not exists user_messages (
-                              user_id integer not null,
-                              msg text,
-                              date_create text not null default current_date,
-                              foreign key (user_id) references telegram_users(user_id)
-                            )
-                        ''')
-                        cur.execute("create index if not exists idx_user_messages_user_id_date_create on user_messages (user_id asc, date_create desc)")
-                        cur.execute("insert or ignore into telegram_users (user_id, first_name, last_name) values (?, ?, ?)", (message.from_user.id, message.from_user.first_name, message.from_user.last_name))
-                        cur.execute("insert into user_messages (user_id, msg) values (?, ?)", (message.from_user.id, message.text))
-                        conn.commit()
-                    except MemoryError as me:
-                        Miscellaneous.print_message(f"Ошибка: Недостаточно памяти для загрузки всех данных. {me}")
-                    except IntegrityError as e: # если запись в таблице уже есть, то просто выходим
-                        pass
-                    except OperationalError as e:
-                        Miscellaneous.print_message(f"База данных, по всей видимости, заблокирована, или ресурс недоступен: {e}")
-                    except Error as e:
-                        Miscellaneous.print_message(f"Произошла ошибка: {e}")
-                    finally:
-                        cur.close()
-            if message.text == "hello":
-                send_message(bot, message.chat.id, "И тебе hello!")
-            elif message.text == "/ip":
-                local_ips = Miscellaneous.get_local_ip_addresses()
-                if local_ips:
-                    send_message(bot, message.chat.id, "Локальные IP-адреса:")
-                    for ip in local_ips:
-                        send_message(bot, message.chat.id, ip)
-                else:
-                    send_message(bot, message.chat.id, "Не удалось получить локальные IP-адреса.")
-            elif message.text == "/irc":
-                if is_irc_bot_running:
-                    for irc_msg in irc_bot.get_irc_log(MSG_NUMBER_LIMIT):
-                        send_message(bot, message.chat.id, irc_msg)
-                else:
-                    send_message(bot, message.chat.id, "IRC-бот не работает в данный момент.")
-            elif message.text == "/username":
-                send_message(bot, message.chat.id, Miscellaneous.get_username())
-            elif message.text in ["/ps", "/process", "/processes"]:
-                cnt = 0
-                processes = Miscellaneous.get_running_processes()
-                for process_name in processes:
-                    if cnt >= MSG_NUMBER_LIMIT:
-                        break
-                    send_message(bot, message.chat.id, process_name)
-                    cnt += 1
-                send_message(bot, message.chat.id, f"Общее количество процессов: {len(processes)}.")
-            elif message.text in ["/date", "/time"]:
-                send_message(bot, message.chat.id, f"Текущая дата: {Miscellaneous.get_current_time()}.")
-            elif message.text in ["/help", "/?"]:
-                send_message(bot, message.chat.id, "Команды, допустимые для использования: /ip, /username, /ps, /process, /processes, /date, /time, /help, /?, /quit, /stop, /exit, /ver, /sys, /printenv, /phrase, /send, /weather, /outer_ip, /timer, /calc, /cmd, /rss, /news, /irc")
-            elif message.text in ["/ver", "/sys"]:
-                sys_prop = Miscellaneous.get_system_properties()
-                send_message(bot, message.chat.id, f"ОС: {sys_prop[0]}, версия {sys_prop[1]}, релиз {sys_prop[2]}. ОЗУ: всего: {sys_prop[3]}; используется: {sys_prop[4]}; свободно: {sys_prop[5]}; процент использования: {sys_prop[6]}.")
-            elif message.text in ["/rss", "/news"]:
-                rss_titles = []
-                rss_links = []
-                RSS_FEED_URL: str = "https://habr.com/ru/rss/hub/webdev/all/?fl=ru"
-                rss_protocol: str = (RSS_FEED_URL.split(":")[0].lower() if ":" in RSS_FEED_URL else "")
-                if not "".__eq__(http_proxy) or not "".__eq__(https_proxy):
-                    if rss_protocol == "http" and not "".__eq__(http_proxy):
-                        rss_titles, rss_links = Miscellaneous.read_rss_feed(RSS_FEED_URL, MSG_NUMBER_LIMIT, rss_protocol, http_proxy)
-                    if rss_protocol == "https" and not "".__eq__(https_proxy):
-                        rss_titles, rss_links = Miscellaneous.read_rss_feed(RSS_FEED_URL, MSG_NUMBER_LIMIT, rss_protocol, https_proxy)
-                else:
-                    rss_titles, rss_links = Miscellaneous.read_rss_feed(RSS_FEED_URL, MSG_NUMBER_LIMIT)
-                for rss_title, rss_link in zip(rss_titles, rss_links):
-                    send_message(bot, message.chat.id, f"{rss_title}: {rss_link}")
-            elif message.text == "/printenv":
-                environment_variables = os.environ
-                cnt = 0
-                for key, value in environment_variables.items():
-                    if cnt >= MSG_NUMBER_LIMIT:
-                        break
-                    send_message(bot, message.chat.id, f"{key}: {value}")
-                    cnt += 1
-            elif message.text == "/phrase":
-                ph_choice: str = random.choice(["aphorism", "joke"])
-                phrase: str = ""
-                if ph_choice == "aphorism":
-                    phrase = Miscellaneous.get_phrase_outta_file("phrase.txt", Constant.GLOBAL_CODEPAGE.value)
-                elif ph_choice == "joke":
-                    ph_proxy: str = ""
-                    if not "".__eq__(http_proxy):
-                        ph_proxy = http_proxy
-                    elif not "".__eq__(https_proxy):
-                        ph_proxy = https_proxy
-                    phrase = Downgrade.jokes_script("ru", ph_proxy)
-                if not "".__eq__(phrase):
-                    send_message(bot, message.chat.id, phrase)
-                else:
-                    send_message(bot, message.chat.id, "Увы, фразы не заготовил.")
-            elif (
-                (message.text == "/timer")
-                or (message.text.strip().startswith("/timer "))
-            ):
-                TIMER_ERR_MSG: str = f"Команду {chr(34)}timer{chr(34)} нужно вызывать с передачей ей количества секунд (натуральное число). Пример вызова: /timer 15"
-                v_timer: str = message.text
-                if v_timer == "/timer":
-                    send_message(bot, message.chat.id, TIMER_ERR_MSG)
-                else:
-                    try:
-                        timer_seconds: int = int(v_timer.split()[1])
-                        if timer_seconds <= 0:
-                            send_message(bot, message.chat.id, TIMER_ERR_MSG)
-                        else:
-                            # выделение в системе отдельного потока для таймера
-                            thread: threading.Thread = threading.Thread(
-                                target=lambda: ( # код обработчика таймера
-                                    time.sleep(timer_seconds),
-                                    send_message(bot, message.chat.id, "Время истекло!")
-                                )
-                            )
-                            thread.start()
-                            send_message(bot, message.chat.id, f"Таймер установлен на {timer_seconds} секунд.")
-                    except (IndexError, ValueError):
-                        send_message(bot, message.chat.id, TIMER_ERR_MSG)
-            elif (
-                (message.text == "/calc")
-                or (message.text.strip().startswith("/calc "))
-            ):
-                CALC_ERR_MSG: str = f"Команду {chr(34)}calc{chr(34)} нужно вызывать с передачей ей количества секунд (любое целое число). Пример вызова: /calc -30135"
-                v_calc: str = message.text
-                if v_calc == "/calc":
-                    send_message(bot, message.chat.id, CALC_ERR_MSG)
-                else:
-                    try:
-                        calc_seconds: int = int(v_calc.split()[1])
-                        delta_time: str = Miscellaneous.get_delta_time(calc_seconds)
-                        send_message(bot, message.chat.id, f"Для заданного количества секунд ({calc_seconds}) относительно текущего времени {Miscellaneous.get_current_time()} получается следующее время: {delta_time}.")
-                    except (IndexError, ValueError):
-                        send_message(bot, message.chat.id, CALC_ERR_MSG)
-            elif (
-                (message.text == "/cmd")
-                or (message.text.strip().startswith("/cmd "))
-            ):
-                v_cmd: str = message.text
-                if v_cmd == "/cmd":
-                    send_message(bot, message.chat.id, f"В строке команды {chr(34)}cmd{chr(34)} задаётся вызов программы (и возможные параметры), которую требуется выполнить под операционной системой.")
-                else:
-                    cmd_parts = shlex.split(v_cmd)
-                    cmd_os: str = " ".join(cmd_parts[1:])
-                    if not Miscellaneous.is_dangerous_command(cmd_os):
-                        cmd_output_lines, cmd_return_code = Miscellaneous.run_command_from_string(cmd_os)
-                        if cmd_output_lines: # Проверяем, что список не пустой
-                            cnt = 0
-                            for cmd_line in cmd_output_lines:
-                                if cnt >= MSG_NUMBER_LIMIT:
-                                    break
-                                send_message(bot, message.chat.id, cmd_line)
-                                cnt += 1
-                            send_message(bot, message.chat.id, f"Код возврата: {cmd_return_code}")
-                    else:
-                        send_message(bot, message.chat.id, "Эта команда недопустима, поскольку является опасной.")
-            elif (
-                (message.text == "/send")
-                or (message.text.strip().startswith("/send "))
-            ):
-                v_send: str = message.text
-                if v_send == "/send":
-                    send_message(bot, message.chat.id, f"Команду {chr(34)}send{chr(34)} нужно вызывать с передачей ей идентификатора получателя и текстом сообщения. Пример вызова: /send --user_id 03007 --msg Привет!_Как_у_тебя_дела?")
-                    send_message(bot, message.chat.id, "Строка должна быть неразрывной, вместо пробелов следует использовать символ подчёркивания.")
-                else:
-                    v_send = v_send[len("/send "):].strip()
-                    print(v_send)
-                    send_parser = argparse.ArgumentParser(description="Отправка сообщения")
-                    send_parser.add_argument("--user_id", type=int, help="Идентификатор получателя", required=True, dest="user_id")
-                    send_parser.add_argument("--msg", type=str, help="Текст сообщения для получателя", required=True, dest="message")
-                    try:
-                        send_args = send_parser.parse_args(v_send.split())
-                        send_message(bot, message.chat.id, "Отправка сообщения пользователю...")
-                        send_message(bot, send_args.user_id, send_args.message)
-                        send_message(bot, message.chat.id, "Сообщение отправлено пользователю.")
-                    except ApiTelegramException as err_api:
-                        print_error("Вероятно, нет прав для отправки сообщения указанному адресату.", f"{err_api}")
-                    except SystemExit:
-                        send_message(bot, message.chat.id, f"Ошибка в команде {chr(34)}send{chr(34)}.")
-                        send_message(bot, message.chat.id, f"Введите {chr(34)}/send{chr(34)}, чтобы узнать, как правильно использовать команду.")
-            elif message.text == "/weather":
-                weather_lines = Miscellaneous.get_url("https://wttr.in/?0T", http_proxy, https_proxy)
-                if weather_lines:
-                    send_message(bot, message.chat.id, "Получен прогноз погоды. Данные представлены ниже.")
-                    for weather_line in weather_lines:
-                        send_message(bot, message.chat.id, weather_line)
-                else:
-                    send_message(bot, message.chat.id, "Прогноз погоды недоступен в данный момент времени.")
-            elif message.text == "/outer_ip":
-                outer_ip_lines = Miscellaneous.get_url("https://icanhazip.com", http_proxy, https_proxy)
-                if outer_ip_lines:
-                    send_message(bot, message.chat.id, "Получены данные по внешнему IP-адресу. Они представлены ниже.")
-                    for outer_ip_line in outer_ip_lines:
-                        send_message(bot, message.chat.id, outer_ip_line)
-                else:
-                    send_message(bot, message.chat.id, f"Невозможно определить {chr(34)}белый{chr(34)} IP-адрес.")
-            elif message.text.lower() in ["/quit", "/stop", "/exit"]: # команда завершения работы бота
-                send_message(bot, message.chat.id, "Goodbye, cruel world! Никогда больше к вам не вернусь.")
-                bot.stop_poll
-                quit_app()
-            else: # если ничего выше не совпало, то передаём управление серверу ChatScript
-                if is_chatscript_bot_running == True and oChatScript is not None:
-                    chatscript_bot_response: str = oChatScript.send_user_message(message.text)
-                    if not "".__eq__(chatscript_bot_response):
-                        send_message(bot, message.chat.id, chatscript_bot_response)
+            log_user_message(message)
+            registry.dispatch(bot, message) # поиск и выполнение команды
         """
         * *************************
         * ОБРАБОТКА ЗАПРОСОВ ОТ ПОЛЬЗОВАТЕЛЯ
         * (КОНЕЦ)
         * *************************
         """
+        start_timer_scheduler(bot)
+        webhook_server: WebhookServer = start_webhook(bot)
         Miscellaneous.print_message("Telegram-бот запущен и ожидает команд пользователя в мессенджере.")
         Miscellaneous.print_message("Для остановки программы нажмите Ctrl+C в текущем сеансе или введите /quit в Telegram.")
+        log_startup_phase("Telegram", startup_started)
         try:
-            bot.polling(none_stop=False, interval=0)
+            if webhook_server is not None:
+                webhook_server.serve_forever()
+            else:
+                bot.polling(none_stop=False, interval=0)
         except KeyboardInterrupt: # перехват Ctrl+C
             pass
         except ProxyError as err_proxy:
@@ -438,11 +806,108 @@ def run_bot(api_token: str, http_proxy: str, https_proxy: str) -> None:
             print_error("Значение токена задано неверно.", f"{err_token}")
     return
 
-def run_irc_bot() -> IRCBot:
+def get_webhook_config():
+    """
+    * Получение параметров приёма обновлений через webhook
+    *
+    * @return Включён ли webhook, публичный адрес, секретный токен, адрес и порт для приёма запросов,
+    *         путь, количество потоков, файл сертификата, файл закрытого ключа
+    """
+    WEBHOOK_SECTION: str = "webhook"
+    WEBHOOK_ENABLED: str = "enabled"
+    WEBHOOK_URL: str = "url"
+    WEBHOOK_SECRET_TOKEN: str = "secret_token"
+    WEBHOOK_LISTEN: str = "listen"
+    WEBHOOK_PORT: str = "port"
+    WEBHOOK_PATH: str = "path"
+    WEBHOOK_WORKERS: str = "workers"
+    WEBHOOK_CERTFILE: str = "certfile"
+    WEBHOOK_KEYFILE: str = "keyfile"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_port: int = snapshot.getint(WEBHOOK_SECTION, WEBHOOK_PORT, DEFAULT_WEBHOOK_PORT)
+        if not (0 <= l_port <= 65534):
+            raise ValueError("Значение порта вне допустимого диапазона (0 - 65534)")
+        return (
+            snapshot.getbool(WEBHOOK_SECTION, WEBHOOK_ENABLED),
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_URL),
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_SECRET_TOKEN),
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_LISTEN, DEFAULT_WEBHOOK_LISTEN),
+            l_port,
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_PATH, DEFAULT_WEBHOOK_PATH),
+            snapshot.getint(WEBHOOK_SECTION, WEBHOOK_WORKERS, DEFAULT_WEBHOOK_WORKERS),
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_CERTFILE),
+            snapshot.get(WEBHOOK_SECTION, WEBHOOK_KEYFILE)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return False, "", "", DEFAULT_WEBHOOK_LISTEN, DEFAULT_WEBHOOK_PORT, DEFAULT_WEBHOOK_PATH, DEFAULT_WEBHOOK_WORKERS, "", ""
+
+def start_webhook(bot: telebot) -> WebhookServer:
+    """
+    * Запуск приёма обновлений через webhook
+    * (если webhook выключен или его не удалось запустить, используется опрос)
+    *
+    * @param bot Экземпляр бота
+    * @return Сервер webhook (None - нужно использовать опрос)
+    """
+    enabled, url, secret_token, listen, port, path, workers, certfile, keyfile = get_webhook_config()
+    if not enabled:
+        return None
+    if "".__eq__(secret_token) and not "".__eq__(url):
+        secret_token = secrets.token_urlsafe(32) # без токена запросы к webhook мог бы подделать кто угодно
+    server: WebhookServer = WebhookServer(bot, secret_token, listen, port, path, workers, certfile, keyfile)
+    try:
+        server.start()
+    except (OSError, ValueError) as e:
+        print_error("Не удалось запустить приём обновлений через webhook. Будет использован опрос.", f"{e}")
+        return None
+    if not "".__eq__(url): # без публичного адреса webhook регистрируется извне (например, при тестировании)
+        try:
+            certificate = open(certfile, "rb") if not "".__eq__(certfile) else None # для самоподписанного сертификата
+            try:
+                bot.set_webhook(url=url, secret_token=secret_token, certificate=certificate, max_connections=server.workers)
+            finally:
+                if certificate is not None:
+                    certificate.close()
+        except Exception as e:
+            print_error("Не удалось зарегистрировать webhook в Telegram. Будет использован опрос.", f"{e}")
+            server.close() # serve_forever() ещё не запущен
+            try:
+                bot.remove_webhook()
+            except Exception:
+                pass
+            return None
+    Miscellaneous.print_message(f"Обновления принимаются через webhook: {listen}:{server.port}{server.path}.")
+    return server
+
+def start_timer_scheduler(bot: telebot) -> None:
     """
-    * Запуск бота IRC (в отдельном потоке)
+    * Запуск планировщика таймеров
+    * (сохранённые таймеры загружаются из БД, просроченные срабатывают сразу)
     *
-    * @return Список последних записей в виде массива строк
+    * @param bot Экземпляр бота
+    """
+    global timer_scheduler
+    if timer_scheduler is not None:
+        return
+    queue_size, batch_size, flush_interval = get_database_config()
+    scheduler: TimerScheduler = TimerScheduler(
+        lambda timer: send_message(bot, timer.chat_id, timer.text),
+        TimerScheduler.DB_FILENAME, max(queue_size, DEFAULT_TIMER_QUEUE_SIZE), batch_size, flush_interval
+    )
+    if scheduler.start():
+        timer_scheduler = scheduler
+        Miscellaneous.print_message(f"Загружено таймеров: {scheduler.timer_stats().pending}.")
+
+def get_irc_config():
+    """
+    * Получение конфигурации IRC-бота
+    *
+    * @return Канал, имя пользователя, хост сервера, порт сервера, кодировка, интервал записи чатлога
+    *         (None, если секция [irc] не задана)
     """
     IRC_SECTION: str = "irc"
     IRC_CHANNEL: str = "channel"
@@ -450,59 +915,156 @@ def run_irc_bot() -> IRCBot:
     IRC_SERVER: str = "server"
     IRC_PORT: str = "port"
     IRC_CODEPAGE: str = "codepage"
-    bot: IRCBot = None
-    config = configparser.ConfigParser()
+    IRC_FLUSH_INTERVAL: str = "flush_interval"
     try:
-        with open(Constant.SETTINGS_FILE.value, 'r', encoding=Constant.GLOBAL_CODEPAGE.value) as f:
-            config.read_file(f)
-            if IRC_SECTION in config:
-                if IRC_CHANNEL in config[IRC_SECTION]:
-                    l_channel: str = config[IRC_SECTION][IRC_CHANNEL].strip()
-                    if "".__eq__(l_channel):
-                        raise ValueError("Канал IRC не задан")
-                if IRC_NICKNAME in config[IRC_SECTION]:
-                    l_nickname: str = config[IRC_SECTION][IRC_NICKNAME].strip()
-                    if "".__eq__(l_nickname):
-                        raise ValueError("Имя пользователя в IRC не задано")
-                if IRC_SERVER in config[IRC_SECTION]:
-                    l_server: str = config[IRC_SECTION][IRC_SERVER].strip()
-                    if "".__eq__(l_server):
-                        raise ValueError("Не указан хост сервера IRC")
-                if IRC_PORT in config[IRC_SECTION]:
-                    l_port: int = config.getint(IRC_SECTION, IRC_PORT)
-                    if not (1 <= l_port <= 65534):
-                        raise ValueError("Значение порта вне допустимого диапазона (1 - 65534)")
-                l_codepage: str = ""
-                if IRC_CODEPAGE in config[IRC_SECTION]:
-                    l_codepage = config[IRC_SECTION][IRC_CODEPAGE].strip()
-                l_codepage = "utf-8" if "".__eq__(l_codepage) else l_codepage
-            """
-            * Переопределяем буфер декодирования входящего потока для всех подключений библиотеки irc.
-            * LenientDecodingLineBuffer сначала пробует UTF-8, затем откатывается к latin-1 - это
-            * предотвращает ошибку декодирования при подключении к серверам с нестандартной кодировкой
-            * (например, CP1251) и позволяет корректно обрабатывать входящие строки.
-            """
-            from jaraco.stream import buffer
-            import irc.client
-            irc.client.ServerConnection.buffer_class = buffer.LenientDecodingLineBuffer
-            bot = IRCBot(l_channel, l_nickname, l_server, l_port, l_codepage)
-            Miscellaneous.print_message("Запуск IRC-бота...")
-            thread: threading.Thread = threading.Thread(
-                target=lambda: (
-                    bot.start()
-                ),
-                daemon = True # если основной поток завершится, демон-поток будет автоматически остановлен
-            )
-            thread.start()
-            time.sleep(10)
+        snapshot: SettingsSnapshot = settings.get()
+        if IRC_SECTION in snapshot:
+            if snapshot.has(IRC_SECTION, IRC_CHANNEL):
+                l_channel: str = snapshot.get(IRC_SECTION, IRC_CHANNEL)
+                if "".__eq__(l_channel):
+                    raise ValueError("Канал IRC не задан")
+            if snapshot.has(IRC_SECTION, IRC_NICKNAME):
+                l_nickname: str = snapshot.get(IRC_SECTION, IRC_NICKNAME)
+                if "".__eq__(l_nickname):
+                    raise ValueError("Имя пользователя в IRC не задано")
+            if snapshot.has(IRC_SECTION, IRC_SERVER):
+                l_server: str = snapshot.get(IRC_SECTION, IRC_SERVER)
+                if "".__eq__(l_server):
+                    raise ValueError("Не указан хост сервера IRC")
+            if snapshot.has(IRC_SECTION, IRC_PORT):
+                l_port: int = snapshot.getint(IRC_SECTION, IRC_PORT)
+                if not (1 <= l_port <= 65534):
+                    raise ValueError("Значение порта вне допустимого диапазона (1 - 65534)")
+            l_codepage: str = snapshot.get(IRC_SECTION, IRC_CODEPAGE)
+            l_codepage = "utf-8" if "".__eq__(l_codepage) else l_codepage
+            l_flush_interval: float = snapshot.getfloat(IRC_SECTION, IRC_FLUSH_INTERVAL, get_database_config()[2])
+            return l_channel, l_nickname, l_server, l_port, l_codepage, l_flush_interval
     except FileNotFoundError:
         Miscellaneous.print_message(f"Ошибка: Файл настроек не найден: {Constant.SETTINGS_FILE.value}")
     except ValueError:
         Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
     except Exception as e:
         Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return None
+
+def set_irc_buffer_class() -> None:
+    """
+    * Переопределяем буфер декодирования входящего потока для всех подключений библиотеки irc.
+    * LenientDecodingLineBuffer сначала пробует UTF-8, затем откатывается к latin-1 - это
+    * предотвращает ошибку декодирования при подключении к серверам с нестандартной кодировкой
+    * (например, CP1251) и позволяет корректно обрабатывать входящие строки.
+    """
+    from jaraco.stream import buffer
+    import irc.client
+    import irc.client_aio
+    irc.client.ServerConnection.buffer_class = buffer.LenientDecodingLineBuffer
+    irc.client_aio.AioConnection.buffer_class = buffer.LenientDecodingLineBuffer
+
+def wait_irc_ready(bot: "IRCBot", started: float) -> None:
+    """
+    * Ожидание приветствия сервера IRC (выполняется в отдельном потоке)
+    """
+    global is_irc_bot_running
+    if not bot.ready.wait(IRC_WELCOME_TIMEOUT):
+        Miscellaneous.print_message(f"Сервер IRC не ответил за {IRC_WELCOME_TIMEOUT:.0f} с. Подключение продолжается в фоне.")
+        bot.ready.wait()
+    is_irc_bot_running = True
+    log_startup_phase("IRC", started)
+
+def run_irc_bot() -> "IRCBot":
+    """
+    * Запуск бота IRC (в отдельном потоке, без ожидания подключения к серверу)
+    *
+    * @return Экземпляр IRC-бота (None, если IRC не настроен)
+    """
+    bot = None
+    irc_config = get_irc_config()
+    if irc_config is None:
+        return None
+    started: float = time.monotonic()
+    try:
+        from ircbot import IRCBot # библиотека irc нужна, только если IRC настроен
+        set_irc_buffer_class()
+        bot = IRCBot(*irc_config)
+        Miscellaneous.print_message("Запуск IRC-бота...")
+        thread: threading.Thread = threading.Thread(
+            target=lambda: (
+                bot.start()
+            ),
+            daemon = True # если основной поток завершится, демон-поток будет автоматически остановлен
+        )
+        thread.start()
+        threading.Thread(target=wait_irc_ready, args=(bot, started), name="IRCReady", daemon=True).start() # is_irc_bot_running станет True после события welcome
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при запуске IRC-бота: {e}")
     return bot
 
+def create_async_irc_bot() -> "AsyncIRCBot":
+    """
+    * Создание IRC-бота для асинхронного режима
+    * (вызывается внутри работающего цикла событий)
+    *
+    * @return Экземпляр IRC-бота (None, если IRC не настроен)
+    """
+    global irc_bot, is_irc_bot_running
+    irc_config = get_irc_config()
+    if irc_config is None:
+        return None
+    from ircbot import AsyncIRCBot # библиотека irc нужна, только если IRC настроен
+    set_irc_buffer_class()
+    irc_bot = AsyncIRCBot(*irc_config)
+    is_irc_bot_running = True # состояние подключения отражает irc_bot.is_connected
+    Miscellaneous.print_message("Запуск IRC-бота...")
+    return irc_bot
+
+def run_async_bot(api_token: str, http_proxy: str, https_proxy: str) -> None:
+    """
+    * Запуск Telegram-бота, IRC-бота и клиента ChatScript в одном цикле событий asyncio
+    """
+    global is_irc_bot_running, async_runtime
+    from asyncbot import AsyncRuntime # требуется aiohttp, поэтому импорт только в этом режиме
+    Miscellaneous.print_message("Токен успешно определён.")
+    bot: telebot = None
+    try:
+        bot = telebot.TeleBot(api_token) # только для отправки ответов (через очередь исходящих сообщений)
+    except ValueError as err_token:
+        print_error("Значение токена задано неверно.", f"{err_token}")
+        return
+    apply_proxy(http_proxy, https_proxy)
+    api_url: str = get_api_url()
+    if not "".__eq__(api_url):
+        apihelper.API_URL = api_url
+    start_timer_scheduler(bot)
+    Miscellaneous.print_message("Telegram-бот запущен в асинхронном режиме и ожидает команд пользователя в мессенджере.")
+    Miscellaneous.print_message("Для остановки программы нажмите Ctrl+C в текущем сеансе или введите /quit в Telegram.")
+    log_startup_phase("Telegram", startup_started)
+    async_runtime = AsyncRuntime(api_token, http_proxy, https_proxy, registry, bot, log_user_message, create_async_irc_bot, api_url=api_url)
+    async_runtime.start()
+    is_irc_bot_running = False # IRC-бот уже отключён при остановке цикла событий
+
+def get_database_config():
+    """
+    * Получение параметров фоновой записи в базы данных
+    *
+    * @return Размер очереди, размер пакета, интервал записи (в секундах)
+    """
+    DATABASE_SECTION: str = "database"
+    DATABASE_QUEUE_SIZE: str = "queue_size"
+    DATABASE_BATCH_SIZE: str = "batch_size"
+    DATABASE_FLUSH_INTERVAL: str = "flush_interval"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        return (
+            snapshot.getint(DATABASE_SECTION, DATABASE_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+            snapshot.getint(DATABASE_SECTION, DATABASE_BATCH_SIZE, DEFAULT_BATCH_SIZE),
+            snapshot.getfloat(DATABASE_SECTION, DATABASE_FLUSH_INTERVAL, DEFAULT_FLUSH_INTERVAL)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return DEFAULT_QUEUE_SIZE, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+
 def get_chatscript_config():
     """
     * Получение конфигурации для работы клиента ChatScript
@@ -512,22 +1074,21 @@ def get_chatscript_config():
     CHATSCRIPT_SECTION: str = "chatscript"
     CHATSCRIPT_SERVER: str = "server"
     CHATSCRIPT_PORT: str = "port"
-    config = configparser.ConfigParser()
     try:
-        with open(Constant.SETTINGS_FILE.value, 'r', encoding=Constant.GLOBAL_CODEPAGE.value) as f:
-            config.read_file(f)
-            if CHATSCRIPT_SECTION in config:
-                l_server: str = ""
-                l_port: int = 0
-                if CHATSCRIPT_SERVER in config[CHATSCRIPT_SECTION]:
-                    l_server = config[CHATSCRIPT_SECTION][CHATSCRIPT_SERVER].strip()
-                    if "".__eq__(l_server):
-                        raise ValueError("Не указан хост сервера IRC")
-                if CHATSCRIPT_PORT in config[CHATSCRIPT_SECTION]:
-                    l_port = config.getint(CHATSCRIPT_SECTION, CHATSCRIPT_PORT)
-                    if not (1 <= l_port <= 65534):
-                        raise ValueError("Значение порта вне допустимого диапазона (1 - 65534)")
-                return l_server, l_port
+        snapshot: SettingsSnapshot = settings.get()
+        if CHATSCRIPT_SECTION in snapshot:
+            l_server: str = ""
+            l_port: int = 0
+            if snapshot.has(CHATSCRIPT_SECTION, CHATSCRIPT_SERVER):
+                l_server = snapshot.get(CHATSCRIPT_SECTION, CHATSCRIPT_SERVER)
+                if "".__eq__(l_server):
+                    raise ValueError("Не указан хост сервера IRC")
+            if snapshot.has(CHATSCRIPT_SECTION, CHATSCRIPT_PORT):
+                l_port = snapshot.getint(CHATSCRIPT_SECTION, CHATSCRIPT_PORT)
+                if not (1 <= l_port <= 65534):
+                    raise ValueError("Значение порта вне допустимого диапазона (1 - 65534)")
+            return l_server, l_port
+        return None, None
     except FileNotFoundError: # Ошибка: Файл настроек не найден
         print(f"Ошибка: Файл настроек не найден: {Constant.SETTINGS_FILE.value}")
         return None, None
@@ -538,51 +1099,450 @@ def get_chatscript_config():
         print(f"Ошибка при чтении файла настроек: {e}")
         return None, None
 
+def get_send_config():
+    """
+    * Получение параметров очереди исходящих сообщений Telegram
+    *
+    * @return Сообщений в секунду (всего), сообщений в секунду (личный чат),
+    *         сообщений в минуту (группа), сообщений подряд в чат, количество потоков отправки
+    """
+    TELEGRAM_SECTION: str = "telegram"
+    TELEGRAM_GLOBAL_RATE: str = "global_rate"
+    TELEGRAM_CHAT_RATE: str = "chat_rate"
+    TELEGRAM_GROUP_RATE: str = "group_rate"
+    TELEGRAM_CHAT_BURST: str = "chat_burst"
+    TELEGRAM_SEND_WORKERS: str = "send_workers"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        return (
+            snapshot.getfloat(TELEGRAM_SECTION, TELEGRAM_GLOBAL_RATE, DEFAULT_GLOBAL_RATE),
+            snapshot.getfloat(TELEGRAM_SECTION, TELEGRAM_CHAT_RATE, DEFAULT_CHAT_RATE),
+            snapshot.getfloat(TELEGRAM_SECTION, TELEGRAM_GROUP_RATE, DEFAULT_GROUP_RATE),
+            snapshot.getint(TELEGRAM_SECTION, TELEGRAM_CHAT_BURST, DEFAULT_CHAT_BURST),
+            snapshot.getint(TELEGRAM_SECTION, TELEGRAM_SEND_WORKERS, DEFAULT_WORKERS)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return DEFAULT_GLOBAL_RATE, DEFAULT_CHAT_RATE, DEFAULT_GROUP_RATE, DEFAULT_CHAT_BURST, DEFAULT_WORKERS
+
+def get_chatscript_client_config():
+    """
+    * Получение параметров асинхронного клиента ChatScript
+    *
+    * @return Количество одновременных запросов, время ожидания подключения, время ожидания ответа,
+    *         количество ошибок до размыкания выключателя, интервал фоновой проверки сервера
+    """
+    CHATSCRIPT_SECTION: str = "chatscript"
+    CHATSCRIPT_MAX_CONCURRENCY: str = "max_concurrency"
+    CHATSCRIPT_CONNECT_TIMEOUT: str = "connect_timeout"
+    CHATSCRIPT_READ_TIMEOUT: str = "read_timeout"
+    CHATSCRIPT_FAILURE_THRESHOLD: str = "failure_threshold"
+    CHATSCRIPT_PROBE_INTERVAL: str = "probe_interval"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        return (
+            snapshot.getint(CHATSCRIPT_SECTION, CHATSCRIPT_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            snapshot.getfloat(CHATSCRIPT_SECTION, CHATSCRIPT_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            snapshot.getfloat(CHATSCRIPT_SECTION, CHATSCRIPT_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+            snapshot.getint(CHATSCRIPT_SECTION, CHATSCRIPT_FAILURE_THRESHOLD, DEFAULT_FAILURE_THRESHOLD),
+            snapshot.getfloat(CHATSCRIPT_SECTION, CHATSCRIPT_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return DEFAULT_MAX_CONCURRENCY, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_FAILURE_THRESHOLD, DEFAULT_PROBE_INTERVAL
+
+def get_phrase_store() -> PhraseStore:
+    """
+    * Хранилище фраз для /phrase (создаётся при первом обращении)
+    *
+    * @return Хранилище фраз
+    """
+    global phrase_store
+    PHRASE_SECTION: str = "phrase"
+    PHRASE_FILES: str = "files"
+    PHRASE_HISTORY: str = "history"
+    if phrase_store is not None:
+        return phrase_store
+    l_files = [PHRASE_FILE]
+    l_history: int = DEFAULT_HISTORY
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_files = [filename.strip() for filename in snapshot.get(PHRASE_SECTION, PHRASE_FILES, PHRASE_FILE).split(",") if not "".__eq__(filename.strip())]
+        l_history = snapshot.getint(PHRASE_SECTION, PHRASE_HISTORY, DEFAULT_HISTORY)
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    phrase_store = PhraseStore(l_files, Constant.GLOBAL_CODEPAGE.value, l_history)
+    return phrase_store
+
+def get_chat_search() -> ChatSearch:
+    """
+    * Поиск по истории сообщений для /search (создаётся при первом обращении)
+    *
+    * @return Экземпляр ChatSearch
+    """
+    global chat_search
+    SEARCH_SECTION: str = "search"
+    SEARCH_PAGE_SIZE: str = "page_size"
+    if chat_search is not None:
+        return chat_search
+    l_page_size: int = DEFAULT_PAGE_SIZE
+    try:
+        l_page_size = settings.get().getint(SEARCH_SECTION, SEARCH_PAGE_SIZE, DEFAULT_PAGE_SIZE)
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    chat_search = ChatSearch([(MessageStore.DB_FILENAME, USER_MESSAGES_FTS), (IRCLogStore.DB_FILENAME, IRC_LOG_FTS)], l_page_size)
+    return chat_search
+
+def get_retention_config():
+    """
+    * Получение параметров обслуживания баз данных
+    *
+    * @return Список RetentionPolicy, каталог архива, интервал обслуживания (в секундах),
+    *         строк в одной транзакции удаления, страниц в одном шаге incremental_vacuum, сжатие архива
+    """
+    RETENTION_SECTION: str = "retention"
+    RETENTION_USER_MESSAGES_DAYS: str = "user_messages_days"
+    RETENTION_IRC_LOG_DAYS: str = "irc_log_days"
+    RETENTION_ARCHIVE_DIR: str = "archive_dir"
+    RETENTION_INTERVAL: str = "interval"
+    RETENTION_BATCH_SIZE: str = "batch_size"
+    RETENTION_VACUUM_PAGES: str = "vacuum_pages"
+    RETENTION_COMPRESSION: str = "compression"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        return (
+            [
+                RetentionPolicy(MessageStore.DB_FILENAME, "user_messages", "date_create", snapshot.getint(RETENTION_SECTION, RETENTION_USER_MESSAGES_DAYS, 0)),
+                RetentionPolicy(IRCLogStore.DB_FILENAME, "irc_log", "date_create", snapshot.getint(RETENTION_SECTION, RETENTION_IRC_LOG_DAYS, 0))
+            ],
+            snapshot.get(RETENTION_SECTION, RETENTION_ARCHIVE_DIR, DEFAULT_ARCHIVE_DIR),
+            snapshot.getfloat(RETENTION_SECTION, RETENTION_INTERVAL, DEFAULT_MAINTENANCE_INTERVAL),
+            snapshot.getint(RETENTION_SECTION, RETENTION_BATCH_SIZE, DEFAULT_PURGE_BATCH_SIZE),
+            snapshot.getint(RETENTION_SECTION, RETENTION_VACUUM_PAGES, DEFAULT_VACUUM_PAGES),
+            snapshot.get(RETENTION_SECTION, RETENTION_COMPRESSION, COMPRESSION_AUTO)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return [], DEFAULT_ARCHIVE_DIR, DEFAULT_MAINTENANCE_INTERVAL, DEFAULT_PURGE_BATCH_SIZE, DEFAULT_VACUUM_PAGES, COMPRESSION_AUTO
+
+def get_process_sampler() -> ProcessSampler:
+    """
+    * Снимок процессов для /ps (создаётся при первом обращении)
+    *
+    * @return Экземпляр ProcessSampler
+    """
+    global process_sampler
+    PS_SECTION: str = "processes"
+    PS_MAX_AGE: str = "max_age"
+    if process_sampler is not None:
+        return process_sampler
+    l_max_age: float = DEFAULT_PS_MAX_AGE
+    try:
+        l_max_age = settings.get().getfloat(PS_SECTION, PS_MAX_AGE, DEFAULT_PS_MAX_AGE)
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    process_sampler = ProcessSampler(l_max_age)
+    return process_sampler
+
+def get_command_runner() -> CommandRunner:
+    """
+    * Выполнение команд ОС для /cmd (создаётся при первом обращении)
+    *
+    * @return Экземпляр CommandRunner
+    """
+    global command_runner
+    CMD_SECTION: str = "cmd"
+    CMD_MAX_CONCURRENT: str = "max_concurrent"
+    CMD_TIMEOUT: str = "timeout"
+    CMD_TAIL_BYTES: str = "tail_bytes"
+    CMD_FILE_BYTES: str = "file_bytes"
+    CMD_PROGRESS_INTERVAL: str = "progress_interval"
+    if command_runner is not None:
+        return command_runner
+    l_config = (DEFAULT_CMD_MAX_CONCURRENT, DEFAULT_CMD_TIMEOUT, DEFAULT_TAIL_BYTES, DEFAULT_FILE_BYTES, DEFAULT_PROGRESS_INTERVAL)
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_config = (
+            snapshot.getint(CMD_SECTION, CMD_MAX_CONCURRENT, DEFAULT_CMD_MAX_CONCURRENT),
+            snapshot.getfloat(CMD_SECTION, CMD_TIMEOUT, DEFAULT_CMD_TIMEOUT),
+            snapshot.getint(CMD_SECTION, CMD_TAIL_BYTES, DEFAULT_TAIL_BYTES),
+            snapshot.getint(CMD_SECTION, CMD_FILE_BYTES, DEFAULT_FILE_BYTES),
+            snapshot.getfloat(CMD_SECTION, CMD_PROGRESS_INTERVAL, DEFAULT_PROGRESS_INTERVAL)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    command_runner = CommandRunner(*l_config)
+    return command_runner
+
+def get_joke_config():
+    """
+    * Получение параметров пула шуток
+    *
+    * @return Список языков, размер пула, нижняя граница пула, файл пула, пауза после неудачной загрузки (в секундах)
+    """
+    JOKES_SECTION: str = "jokes"
+    JOKES_LANGUAGES: str = "languages"
+    JOKES_POOL_SIZE: str = "pool_size"
+    JOKES_LOW_WATERMARK: str = "low_watermark"
+    JOKES_FILE: str = "file"
+    JOKES_RETRY_INTERVAL: str = "retry_interval"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_languages = [lang.strip().lower() for lang in snapshot.get(JOKES_SECTION, JOKES_LANGUAGES, JOKE_LANG).split(",") if not "".__eq__(lang.strip())]
+        return (
+            l_languages,
+            snapshot.getint(JOKES_SECTION, JOKES_POOL_SIZE, DEFAULT_POOL_SIZE),
+            snapshot.getint(JOKES_SECTION, JOKES_LOW_WATERMARK, DEFAULT_LOW_WATERMARK),
+            snapshot.get(JOKES_SECTION, JOKES_FILE, DEFAULT_POOL_FILE),
+            snapshot.getfloat(JOKES_SECTION, JOKES_RETRY_INTERVAL, DEFAULT_RETRY_INTERVAL)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return [JOKE_LANG], DEFAULT_POOL_SIZE, DEFAULT_LOW_WATERMARK, DEFAULT_POOL_FILE, DEFAULT_RETRY_INTERVAL
+
+def get_rss_config():
+    """
+    * Получение параметров опроса RSS-лент
+    *
+    * @return Список адресов лент, интервал опроса (в секундах), количество хранимых элементов ленты
+    """
+    RSS_SECTION: str = "rss"
+    RSS_FEEDS: str = "feeds"
+    RSS_INTERVAL: str = "interval"
+    RSS_MAX_ITEMS: str = "max_items"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        l_feeds = [url.strip() for url in snapshot.get(RSS_SECTION, RSS_FEEDS, RSS_FEED_URL).split(",") if not "".__eq__(url.strip())]
+        return (
+            l_feeds,
+            snapshot.getfloat(RSS_SECTION, RSS_INTERVAL, DEFAULT_POLL_INTERVAL),
+            snapshot.getint(RSS_SECTION, RSS_MAX_ITEMS, DEFAULT_MAX_ITEMS)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return [RSS_FEED_URL], DEFAULT_POLL_INTERVAL, DEFAULT_MAX_ITEMS
+
+def get_admin_ids() -> set:
+    """
+    * Идентификаторы администраторов бота (для служебных команд)
+    *
+    * @return Множество идентификаторов пользователей Telegram
+    """
+    ADMIN_SECTION: str = "admin"
+    ADMIN_IDS: str = "ids"
+    try:
+        return {int(user_id) for user_id in settings.get().get(ADMIN_SECTION, ADMIN_IDS).split(",") if not "".__eq__(user_id.strip())}
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return set()
+
+def get_metrics_config():
+    """
+    * Получение параметров HTTP-сервера метрик Prometheus
+    *
+    * @return Включён ли сервер, адрес, порт
+    """
+    METRICS_SECTION: str = "metrics"
+    METRICS_ENABLED: str = "enabled"
+    METRICS_LISTEN: str = "listen"
+    METRICS_PORT: str = "port"
+    try:
+        snapshot: SettingsSnapshot = settings.get()
+        return (
+            snapshot.getbool(METRICS_SECTION, METRICS_ENABLED),
+            snapshot.get(METRICS_SECTION, METRICS_LISTEN, DEFAULT_METRICS_LISTEN),
+            snapshot.getint(METRICS_SECTION, METRICS_PORT, DEFAULT_METRICS_PORT)
+        )
+    except ValueError:
+        Miscellaneous.print_message("Значение параметра не соответствует типу данных в конфигурационном файле.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return False, DEFAULT_METRICS_LISTEN, DEFAULT_METRICS_PORT
+
+def start_metrics() -> None:
+    """
+    * Регистрация текущих значений и запуск HTTP-сервера метрик (если включён)
+    """
+    global metrics_server
+    metrics = get_metrics()
+    metrics.gauge("chatscript_in_flight", lambda: oChatScriptAsync.in_flight if oChatScriptAsync is not None else 0)
+    metrics.gauge("chatscript_breaker_open", lambda: 0 if oChatScriptGuard is None or oChatScriptGuard.breaker.stats().state == STATE_CLOSED else 1)
+    metrics.gauge("chatscript_breaker_trips_total", lambda: oChatScriptGuard.breaker.stats().trip_count if oChatScriptGuard is not None else 0)
+    metrics.gauge("chatscript_breaker_rejected_total", lambda: oChatScriptGuard.breaker.stats().rejected if oChatScriptGuard is not None else 0)
+    metrics.gauge("settings_reload_total", lambda: settings.stats().reload_count)
+    metrics.gauge("settings_last_reload_timestamp", lambda: settings.stats().last_reload)
+    metrics.gauge("timers_pending", lambda: timer_scheduler.timer_stats().pending if timer_scheduler is not None else 0)
+    metrics.gauge("joke_pool_available", lambda: joke_pool.stats().available if joke_pool is not None else 0)
+    enabled, listen, port = get_metrics_config()
+    if enabled:
+        try:
+            metrics_server = MetricsServer(metrics, listen, port)
+            Miscellaneous.print_message(f"Метрики доступны по адресу http://{listen}:{metrics_server.start()}/metrics.")
+        except OSError as e:
+            print_error("Не удалось запустить HTTP-сервер метрик.", f"{e}")
+            metrics_server = None
+
+def get_runtime_config() -> str:
+    """
+    * Получение режима работы бота
+    *
+    * @return RUNTIME_THREADS или RUNTIME_ASYNC
+    """
+    GLOBAL_SECTION: str = "global"
+    RUNTIME: str = "runtime"
+    try:
+        l_runtime: str = settings.get().get(GLOBAL_SECTION, RUNTIME, RUNTIME_THREADS).lower()
+        if l_runtime in (RUNTIME_THREADS, RUNTIME_ASYNC):
+            return l_runtime
+        Miscellaneous.print_message(f"Неизвестный режим работы {chr(34)}{l_runtime}{chr(34)}, используется {chr(34)}{RUNTIME_THREADS}{chr(34)}.")
+    except Exception as e:
+        Miscellaneous.print_message(f"Ошибка при чтении файла настроек: {e}")
+    return RUNTIME_THREADS
+
 def quit_app() -> None:
     """
     * Завершение работы программы
     """
-    global is_irc_bot_running, irc_bot # глобальные переменные для IRC-бота
+    global is_irc_bot_running # глобальные переменные для IRC-бота
+    global message_store, send_scheduler, rss_poller, joke_pool, timer_scheduler, maintenance
     Miscellaneous.print_message("Выполняется завершение работы программы...")
-    if is_irc_bot_running: # корректное завершение работы IRC-бота
+    deadline: float = time.monotonic() + SHUTDOWN_TIMEOUT
+    remaining = lambda: max(0.0, deadline - time.monotonic()) # сколько секунд осталось до общего срока
+    irc_quitting: bool = False
+    if is_irc_bot_running: # QUIT отправляется сразу, отключение ждём после остановки очередей
+        from irc.client import ServerNotConnectedError
         try:
             irc_bot.connection.quit()
+            irc_quitting = True
         except ServerNotConnectedError:
             pass
-        time.sleep(3)
+    if maintenance is not None: # обслуживание прерывается между транзакциями
+        maintenance.close(remaining())
+        maintenance = None
+    if timer_scheduler is not None: # невыполненные таймеры останутся в БД до следующего запуска
+        timer_scheduler.close(remaining())
+        timer_scheduler = None
+    if joke_pool is not None: # сохранение пула шуток до следующего запуска
+        joke_pool.close(remaining())
+        joke_pool = None
+    if rss_poller is not None:
+        rss_poller.close(remaining())
+        rss_poller = None
+    if send_scheduler is not None: # отправка сообщений, оставшихся в очереди
+        send_scheduler.close(remaining())
+        send_stats = send_scheduler.stats()
+        Miscellaneous.print_message(f"Отправлено сообщений: {send_stats.sent}, ошибок: {send_stats.failed}, ответов 429: {send_stats.throttled}, среднее время в очереди: {send_stats.avg_latency:.3f} с.")
+        send_scheduler = None
+    if message_store is not None: # запись накопленных сообщений в БД
+        message_store.close(remaining())
+        message_store = None
+    if is_irc_bot_running: # корректное завершение работы IRC-бота
+        if irc_quitting:
+            irc_bot.disconnected.wait(remaining())
         is_irc_bot_running = False
         Miscellaneous.print_message("IRC-бот остановлен.")
+    if irc_bot is not None:
+        irc_bot.close_log(remaining()) # запись остатка чатлога в БД
+    Miscellaneous.print_message(f"Остановка заняла {SHUTDOWN_TIMEOUT - remaining():.3f} с.")
     Miscellaneous.print_message("Завершение работы Telegram-бота.")
+    if log_pipeline is not None: # запись в файл остатка очереди лога
+        log_stats = log_pipeline.stats()
+        if log_stats.dropped > 0:
+            Miscellaneous.print_message(f"Записей лога отброшено из-за переполнения очереди: {log_stats.dropped}.")
+        log_pipeline.stop()
     os._exit(0)
 
+def init_chatscript(started: float) -> None:
+    """
+    * Инициализация бота ChatScript (выполняется в отдельном потоке, не задерживая запуск Telegram-бота)
+    """
+    chatscript_init: str = ""
+    if oChatScript.is_server_running():
+        chatscript_init = oChatScript.server_reset() # инициализация бота ChatScript
+    if not "".__eq__(chatscript_init):
+        Miscellaneous.print_message(f"Проинициализирован бот ChatScript. Получен ответ от сервера: {chr(34)}{chatscript_init}{chr(34)}.")
+    else:
+        Miscellaneous.print_message("Сервер ChatScript недоступен. Подключение будет выполнено после его запуска.")
+        oChatScriptGuard.mark_down()
+    log_startup_phase("ChatScript", started)
+
 def main() -> None:
-    global is_irc_bot_running, irc_bot # глобальные переменные для IRC-бота
-    global is_chatscript_bot_running, oChatScript # глобальные переменные для ChatScript-бота
+    global startup_started
+    global message_store, send_scheduler, rss_poller, joke_pool, maintenance
+    global irc_bot # глобальные переменные для IRC-бота
+    global is_chatscript_bot_running, oChatScript, oChatScriptAsync, oChatScriptGuard # глобальные переменные для ChatScript-бота
     chatscript_host: str = None
     chatscript_port: int = None
     api_token: str = ""
     http_proxy: str = ""
     https_proxy: str = ""
+    startup_started = time.monotonic()
     Miscellaneous.print_message("Запуск Telegram-бота...")
     if Miscellaneous.is_file_readable(Constant.SETTINGS_FILE.value):
         Miscellaneous.print_message(f"Файл настроек найден: {Constant.SETTINGS_FILE.value}")
+        init_debug()
+        settings.install_signal_handler() # по SIGHUP файл настроек будет перечитан
         api_token, http_proxy, https_proxy = get_bot_config()
+        log_startup_phase("настройки", startup_started)
     else:
         Miscellaneous.print_message(f"Ошибка: Файл настроек не найден: {Constant.SETTINGS_FILE.value}")
     if "".__eq__(api_token):
         Miscellaneous.print_message("Токен для Telegram-бота не найден.")
     else:
+        phase_started: float = time.monotonic()
+        if debugged == True: # в режиме отладки сообщения пользователей пишутся в БД
+            queue_size, batch_size, flush_interval = get_database_config()
+            message_store = MessageStore(MessageStore.DB_FILENAME, queue_size, batch_size, flush_interval)
+            if not message_store.start():
+                message_store = None
+        start_metrics()
+        send_scheduler = SendScheduler(*get_send_config())
+        send_scheduler.start()
+        rss_feeds, rss_interval, rss_max_items = get_rss_config()
+        if rss_feeds:
+            rss_poller = RssPoller(rss_feeds, rss_interval, rss_max_items, http_proxy, https_proxy)
+            rss_poller.start()
+        joke_languages, joke_pool_size, joke_low_watermark, joke_file, joke_retry_interval = get_joke_config()
+        if joke_languages:
+            joke_pool = JokePool(joke_languages, joke_pool_size, joke_low_watermark, joke_file, http_proxy if not "".__eq__(http_proxy) else https_proxy, joke_retry_interval)
+            joke_pool.start()
+        retention_policies, archive_dir, maintenance_interval, purge_batch_size, vacuum_pages, compression = get_retention_config()
+        maintenance = Maintenance(retention_policies, archive_dir, maintenance_interval, purge_batch_size, vacuum_pages, compression)
+        maintenance.start() # первое обслуживание - через минуту после запуска
+        log_startup_phase("фоновые службы", phase_started)
         chatscript_host, chatscript_port = get_chatscript_config()
         if chatscript_host is not None and chatscript_port is not None:
-            oChatScript = ChatScript(chatscript_host, chatscript_port)
-            if oChatScript.is_server_running():
-                chatscript_init: str = oChatScript.server_reset() # инициализация бота ChatScript
-                if not "".__eq__(chatscript_init):
-                    is_chatscript_bot_running = True
-                    Miscellaneous.print_message(f"Проинициализирован бот ChatScript. Получен ответ от сервера: {chr(34)}{chatscript_init}{chr(34)}.")
-        irc_bot = run_irc_bot()
-        is_irc_bot_running = True if irc_bot is not None and irc_bot.is_connected else False
-        run_bot(api_token, http_proxy, https_proxy)
+            max_concurrency, connect_timeout, read_timeout, failure_threshold, probe_interval = get_chatscript_client_config()
+            oChatScript = ChatScript(chatscript_host, chatscript_port, read_timeout) # при запуске не ждём ответа сервера дольше read_timeout
+            oChatScriptAsync = AsyncChatScript.from_client(oChatScript, max_concurrency=max_concurrency, connect_timeout=connect_timeout, read_timeout=read_timeout)
+            oChatScriptGuard = ChatScriptGuard(oChatScriptAsync, failure_threshold, probe_interval)
+            is_chatscript_bot_running = True # доступность сервера далее отслеживает выключатель
+            threading.Thread(target=init_chatscript, args=(time.monotonic(),), name="ChatScriptInit", daemon=True).start()
+        if get_runtime_config() == RUNTIME_ASYNC:
+            run_async_bot(api_token, http_proxy, https_proxy)
+        else:
+            irc_bot = run_irc_bot() # IRC-бот подключается параллельно с запуском Telegram-бота
+            run_bot(api_token, http_proxy, https_proxy)
     quit_app()
     return
 
@@ -0,0 +1,315 @@
+"""
+* Обслуживание баз данных: срок хранения, архивирование и сжатие
+* *************************
+* Строки таблиц user_messages (telegram.db) и irc_log (irc.db) старше
+* заданного количества дней сначала дописываются в архив - сжатые
+* файлы JSON Lines по месяцам (zstd, если установлена библиотека
+* zstandard, иначе gzip), - а затем удаляются небольшими пакетами,
+* чтобы блокировка записи не удерживалась долго. Освободившиеся
+* страницы возвращаются файловой системе шагами incremental_vacuum
+* (для баз данных с auto_vacuum = incremental). Сводные таблицы
+* отчётов не очищаются - статистика сохраняется и после удаления
+* сообщений.
+* Запуск вручную:
+* $ python3 maintenance.py run --irc_log_days 365
+* $ python3 maintenance.py convert irc.db
+* $ python3 maintenance.py restore archive/irc/irc_log/2025-01.jsonl.gz --output restored.db
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+from sqlite3 import OperationalError, Error
+import threading
+import time
+import traceback
+from collections import namedtuple
+from contextlib import closing
+
+try:
+    import zstandard # необязательная библиотека: pip3 install zstandard
+except ImportError:
+    zstandard = None
+
+RetentionPolicy = namedtuple("RetentionPolicy", ["db_filename", "table", "date_column", "days"])
+MaintenanceStats = namedtuple("MaintenanceStats", ["runs", "archived", "deleted", "vacuumed_pages", "errors"])
+COMPRESSION_AUTO: str = "auto"
+COMPRESSION_ZSTD: str = "zstd"
+COMPRESSION_GZIP: str = "gzip"
+EXTENSIONS = {COMPRESSION_ZSTD: ".jsonl.zst", COMPRESSION_GZIP: ".jsonl.gz"}
+DEFAULT_ARCHIVE_DIR: str = "archive"
+DEFAULT_INTERVAL: float = 3600 # интервал обслуживания (в секундах)
+DEFAULT_BATCH_SIZE: int = 1000 # строк, удаляемых в одной транзакции
+DEFAULT_VACUUM_PAGES: int = 256 # страниц, освобождаемых одним шагом incremental_vacuum
+FIRST_RUN_DELAY: float = 60 # первое обслуживание - через минуту после запуска бота
+STEP_PAUSE: float = 0.05 # пауза между транзакциями (чтобы успевали писать другие потоки)
+AUTO_VACUUM_INCREMENTAL: int = 2 # значение pragma auto_vacuum
+
+def resolve_compression(compression: str) -> str:
+    """
+    * Выбор способа сжатия архива ("auto" - zstd, если доступен, иначе gzip)
+    """
+    compression = compression.lower()
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        print("Библиотека zstandard не установлена, архив будет сжиматься gzip.")
+        return COMPRESSION_GZIP
+    if compression not in EXTENSIONS:
+        return COMPRESSION_ZSTD if zstandard is not None else COMPRESSION_GZIP
+    return compression
+
+def open_archive(filename: str, mode: str):
+    """
+    * Открытие файла архива (дописывание "ab" или чтение "rb")
+    * (и gzip, и zstd допускают дописывание в конец - файл состоит из нескольких сжатых блоков)
+    """
+    if filename.endswith(EXTENSIONS[COMPRESSION_ZSTD]):
+        if zstandard is None:
+            raise RuntimeError(f"Для чтения архива {filename} требуется библиотека zstandard")
+        raw = open(filename, mode)
+        if mode.startswith("a"):
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    return gzip.open(filename, mode)
+
+def archive_path(archive_dir: str, policy: RetentionPolicy, month: str, compression: str) -> str:
+    """
+    * Файл архива: <каталог>/<база данных>/<таблица>/<ГГГГ-ММ>.jsonl.gz
+    """
+    db_name: str = os.path.splitext(os.path.basename(policy.db_filename))[0]
+    return os.path.join(archive_dir, db_name, policy.table, f"{month}{EXTENSIONS[compression]}")
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """
+    * Включение auto_vacuum = incremental (для существующей базы требуется полный VACUUM)
+    * (VACUUM может изменить rowid, поэтому индексы FTS5 с внешним содержимым перестраиваются)
+    *
+    * @return True, если режим был изменён
+    """
+    if conn.execute("pragma auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+        return False
+    conn.execute(f"pragma auto_vacuum={AUTO_VACUUM_INCREMENTAL}")
+    conn.execute("vacuum")
+    fts_tables = [row[0] for row in conn.execute("select name from sqlite_master where type = 'table' and sql like 'create virtual table % using fts5(%content=%'")]
+    for fts_table in fts_tables:
+        conn.execute(f"insert into {fts_table} ({fts_table}) values ('rebuild')")
+    conn.commit()
+    return True
+
+class Maintenance:
+
+    def __init__(self, policies: list, archive_dir: str = DEFAULT_ARCHIVE_DIR, interval: float = DEFAULT_INTERVAL, batch_size: int = DEFAULT_BATCH_SIZE, vacuum_pages: int = DEFAULT_VACUUM_PAGES, compression: str = COMPRESSION_AUTO):
+        """
+        * @param policies Список RetentionPolicy (days = 0 - хранить без ограничения срока)
+        * @param archive_dir Каталог архива (пустая строка - удалять без архивирования)
+        * @param interval Интервал обслуживания (в секундах)
+        * @param batch_size Строк, удаляемых в одной транзакции
+        * @param vacuum_pages Страниц, освобождаемых одним шагом incremental_vacuum
+        * @param compression Сжатие архива: "auto", "zstd" или "gzip"
+        """
+        self.policies = policies
+        self.archive_dir = archive_dir
+        self.interval = interval if interval > 0 else DEFAULT_INTERVAL
+        self.batch_size = batch_size if batch_size > 0 else DEFAULT_BATCH_SIZE
+        self.vacuum_pages = vacuum_pages if vacuum_pages > 0 else DEFAULT_VACUUM_PAGES
+        self.compression = resolve_compression(compression)
+        self.runs: int = 0
+        self.archived: int = 0 # строк записано в архив
+        self.deleted: int = 0 # строк удалено
+        self.vacuumed_pages: int = 0 # страниц возвращено файловой системе
+        self.errors: int = 0
+        self._stopping = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Maintenance", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка обслуживания (прерывается между транзакциями)
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> MaintenanceStats:
+        return MaintenanceStats(self.runs, self.archived, self.deleted, self.vacuumed_pages, self.errors)
+
+    def _run(self) -> None:
+        if self._stopping.wait(FIRST_RUN_DELAY):
+            return
+        while not self._stopping.is_set():
+            self.run_once()
+            self._stopping.wait(self.interval)
+
+    def run_once(self) -> None:
+        """
+        * Одно обслуживание всех баз данных
+        """
+        self.runs += 1
+        for db_filename in dict.fromkeys(policy.db_filename for policy in self.policies):
+            if self._stopping.is_set() or not os.path.isfile(db_filename):
+                continue
+            try:
+                with closing(sqlite3.connect(db_filename, timeout=30)) as conn:
+                    for policy in self.policies:
+                        if policy.db_filename == db_filename and policy.days > 0:
+                            self.purge(conn, policy)
+                    self.vacuum(conn)
+            except Error as e:
+                self.errors += 1
+                print(f"Ошибка при обслуживании базы данных {db_filename}: {e}")
+            except OSError as e:
+                self.errors += 1
+                print(f"Ошибка при записи архива базы данных {db_filename}: {e}")
+                traceback.print_exc()
+
+    def purge(self, conn: sqlite3.Connection, policy: RetentionPolicy) -> int:
+        """
+        * Архивирование и удаление строк старше срока хранения
+        *
+        * @return Количество удалённых строк
+        """
+        cutoff: str = time.strftime("%Y-%m-%d", time.gmtime(time.time() - policy.days * 86400))
+        deleted: int = 0
+        try:
+            conn.execute(f"select 1 from {policy.table} limit 1")
+        except OperationalError: # таблицы ещё нет
+            return 0
+        while not self._stopping.is_set():
+            cur = conn.execute(f"select rowid, * from {policy.table} where {policy.date_column} < ? order by rowid limit ?", (cutoff, self.batch_size))
+            columns = ["rowid"] + [column[0] for column in cur.description[1:]]
+            rows = cur.fetchall()
+            conn.commit() # чтение не должно удерживать снимок базы между пакетами
+            if not rows:
+                break
+            if self.archive_dir:
+                self.archive(policy, columns, rows) # сначала архив, потом удаление (при сбое строки попадут в архив повторно)
+            conn.executemany(f"delete from {policy.table} where rowid = ?", ((row[0],) for row in rows))
+            conn.commit()
+            deleted += len(rows)
+            self.deleted += len(rows)
+            self._stopping.wait(STEP_PAUSE)
+        if deleted > 0:
+            print(f"Из таблицы {policy.table} ({policy.db_filename}) удалено строк старше {cutoff}: {deleted}.")
+        return deleted
+
+    def archive(self, policy: RetentionPolicy, columns: list, rows: list) -> None:
+        """
+        * Дописывание строк в архив (по файлу на месяц)
+        """
+        date_index: int = columns.index(policy.date_column)
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(str(row[date_index])[:7], []).append(row)
+        for month, month_rows in by_month.items():
+            filename: str = archive_path(self.archive_dir, policy, month, self.compression)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            data: bytes = "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in month_rows).encode("utf-8")
+            with open_archive(filename, "ab") as f:
+                f.write(data)
+            self.archived += len(month_rows)
+
+    def vacuum(self, conn: sqlite3.Connection) -> int:
+        """
+        * Возврат свободных страниц файловой системе небольшими шагами
+        *
+        * @return Количество освобождённых страниц
+        """
+        if conn.execute("pragma auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            return 0
+        freed: int = 0
+        while not self._stopping.is_set():
+            free_pages: int = conn.execute("pragma freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            conn.execute(f"pragma incremental_vacuum({min(free_pages, self.vacuum_pages)})").fetchall()
+            conn.commit()
+            freed += min(free_pages, self.vacuum_pages)
+            self._stopping.wait(STEP_PAUSE)
+        self.vacuumed_pages += freed
+        return freed
+
+def restore(filenames: list, db_filename: str, table: str = "") -> int:
+    """
+    * Загрузка архива в базу данных для изучения
+    * (строки с уже загруженным rowid пропускаются, поэтому повторная загрузка безопасна)
+    *
+    * @param filenames Файлы архива
+    * @param db_filename База данных, в которую загружаются строки
+    * @param table Таблица (по умолчанию - имя каталога, в котором лежит файл архива)
+    * @return Количество загруженных строк
+    """
+    loaded: int = 0
+    with closing(sqlite3.connect(db_filename)) as conn:
+        for filename in filenames:
+            l_table: str = table or os.path.basename(os.path.dirname(os.path.abspath(filename)))
+            with open_archive(filename, "rb") as raw:
+                records = (json.loads(line) for line in (raw if filename.endswith(EXTENSIONS[COMPRESSION_GZIP]) else _lines(raw)) if line.strip())
+                for record in records:
+                    columns = [column for column in record if column != "rowid"]
+                    conn.execute(f"create table if not exists {l_table} ({', '.join(columns)})")
+                    placeholders: str = ", ".join("?" for _ in range(len(columns) + 1))
+                    cur = conn.execute(f"insert or ignore into {l_table} (rowid, {', '.join(columns)}) values ({placeholders})", [record.get("rowid")] + [record[column] for column in columns])
+                    loaded += cur.rowcount
+        conn.commit()
+    return loaded
+
+def _lines(stream):
+    """
+    * Построчное чтение двоичного потока (у потока zstd нет итерации по строкам)
+    """
+    buffer: bytes = b""
+    while True:
+        chunk: bytes = stream.read(1048576)
+        if not chunk:
+            break
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        yield from lines
+    if buffer:
+        yield buffer
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Обслуживание баз данных бота")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    run_parser = subparsers.add_parser("run", help="архивировать и удалить старые строки, освободить место")
+    run_parser.add_argument("--user_messages_days", type=int, default=0, help="срок хранения сообщений Telegram (в днях, 0 - без ограничения)")
+    run_parser.add_argument("--irc_log_days", type=int, default=0, help="срок хранения чатлога IRC (в днях, 0 - без ограничения)")
+    run_parser.add_argument("--archive_dir", default=DEFAULT_ARCHIVE_DIR, help="каталог архива (пустая строка - без архивирования)")
+    run_parser.add_argument("--compression", default=COMPRESSION_AUTO, choices=(COMPRESSION_AUTO, COMPRESSION_ZSTD, COMPRESSION_GZIP), help="сжатие архива")
+    convert_parser = subparsers.add_parser("convert", help="включить auto_vacuum = incremental (полный VACUUM, бот должен быть остановлен)")
+    convert_parser.add_argument("databases", nargs="+", help="файлы баз данных")
+    restore_parser = subparsers.add_parser("restore", help="загрузить архив в базу данных")
+    restore_parser.add_argument("archives", nargs="+", help="файлы архива")
+    restore_parser.add_argument("--output", default="restored.db", help="база данных для загрузки")
+    restore_parser.add_argument("--table", default="", help="таблица (по умолчанию - по каталогу архива)")
+    args = parser.parse_args()
+    if args.action == "run":
+        maintenance = Maintenance([
+            RetentionPolicy("telegram.db", "user_messages", "date_create", args.user_messages_days),
+            RetentionPolicy("irc.db", "irc_log", "date_create", args.irc_log_days)
+        ], args.archive_dir, compression=args.compression)
+        maintenance.run_once()
+        print(f"Записано в архив строк: {maintenance.archived}, удалено строк: {maintenance.deleted}, освобождено страниц: {maintenance.vacuumed_pages}.")
+    elif args.action == "convert":
+        for db_filename in args.databases:
+            with closing(sqlite3.connect(db_filename)) as conn:
+                if enable_incremental_vacuum(conn):
+                    print(f"Для базы данных {db_filename} включён режим auto_vacuum = incremental.")
+                else:
+                    print(f"Для базы данных {db_filename} режим auto_vacuum = incremental уже включён.")
+    else:
+        print(f"Загружено строк: {restore(args.archives, args.output, args.table)} (база данных {args.output}).")
+
+# Точка запуска программы
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+* Класс "Метрики работы бота"
+* *************************
+* Гистограммы времени выполнения (команд, запросов к ChatScript,
+* записи в SQLite, отправки сообщений в Telegram, HTTP-запросов),
+* счётчики ошибок и текущие значения (длины очередей). Метрики
+* отдаются в текстовом формате Prometheus по HTTP (/metrics)
+* и выводятся командой /stats в Telegram.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import bisect
+import threading
+import time
+from collections import namedtuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+HistogramSummary = namedtuple("HistogramSummary", ["name", "labels", "count", "errors", "avg", "p50", "p99", "max"])
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0) # границы интервалов (в секундах)
+DEFAULT_LISTEN: str = "127.0.0.1"
+DEFAULT_PORT: int = 9108
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+def _labels_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for name, value in labels) + "}"
+
+class Histogram:
+    """
+    * Гистограмма времени выполнения для одного набора меток
+    """
+
+    __slots__ = ("buckets", "counts", "count", "total", "max", "errors")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # последний интервал - "+Inf"
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.errors: int = 0
+
+    def observe(self, seconds: float, failed: bool) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.errors += 1 if failed else 0
+
+    def quantile(self, q: float) -> float:
+        """
+        * Оценка квантиля по гистограмме (линейная интерполяция внутри интервала)
+        """
+        if self.count == 0:
+            return 0.0
+        rank: float = q * self.count
+        seen: int = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count > 0 and seen + bucket_count >= rank:
+                lower: float = self.buckets[i - 1] if i > 0 else 0.0
+                upper: float = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+class Metrics:
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {} # (имя, метки) -> Histogram
+        self._gauges = {} # (имя, метки) -> функция, возвращающая значение
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, failed: bool = False, **labels) -> None:
+        """
+        * Учёт времени выполнения операции
+        *
+        * @param name Имя гистограммы (например, "bot_command_seconds")
+        * @param seconds Время выполнения (в секундах)
+        * @param failed Завершилась ли операция ошибкой
+        * @param labels Метки (например, command="/date")
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram: Histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self._histograms[key] = histogram
+            histogram.observe(seconds, failed)
+
+    def gauge(self, name: str, func, **labels) -> None:
+        """
+        * Регистрация текущего значения (вычисляется при каждом чтении метрик)
+        *
+        * @param func Функция без параметров, возвращающая число
+        """
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = func
+
+    def timer(self, name: str, **labels) -> "MetricsTimer":
+        """
+        * Замер времени блока with (исключение считается ошибкой)
+        """
+        return MetricsTimer(self, name, labels)
+
+    def summary(self) -> list:
+        """
+        * Сводка по гистограммам (для /stats)
+        *
+        * @return Список HistogramSummary, отсортированный по имени и меткам
+        """
+        with self._lock:
+            return [
+                HistogramSummary(name, labels, h.count, h.errors, h.total / h.count if h.count > 0 else 0.0, h.quantile(0.5), h.quantile(0.99), h.max)
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+
+    def gauges(self) -> list:
+        """
+        * Текущие значения (имя, метки, значение)
+        """
+        with self._lock:
+            items = sorted(self._gauges.items())
+        result = []
+        for (name, labels), func in items:
+            try:
+                result.append((name, labels, float(func())))
+            except Exception:
+                pass
+        return result
+
+    def render(self) -> str:
+        """
+        * Все метрики в текстовом формате Prometheus
+        """
+        lines = []
+        described = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            histograms = [(name, labels, list(h.counts), h.count, h.total, h.errors) for (name, labels), h in sorted(self._histograms.items())]
+        for name, labels, counts, count, total, errors in histograms:
+            header(name, "histogram")
+            cumulative: int = 0
+            for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {total}")
+            lines.append(f"{name}_count{_labels_text(labels)} {count}")
+        for name, labels, counts, count, total, errors in histograms:
+            error_name: str = f"{name[:-len('_seconds')] if name.endswith('_seconds') else name}_errors_total"
+            header(error_name, "counter")
+            lines.append(f"{error_name}{_labels_text(labels)} {errors}")
+        for name, labels, value in self.gauges():
+            header(name, "gauge")
+            lines.append(f"{name}{_labels_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+class MetricsTimer:
+    """
+    * Контекстный менеджер для замера времени выполнения
+    """
+
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics: Metrics, name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.started: float = 0.0
+
+    def __enter__(self) -> "MetricsTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> bool:
+        self.metrics.observe(self.name, time.perf_counter() - self.started, exc_type is not None, **self.labels)
+        return False
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body: bytes = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetricsServer:
+    """
+    * HTTP-сервер для сбора метрик Prometheus (GET /metrics)
+    """
+
+    def __init__(self, metrics: Metrics, listen: str = DEFAULT_LISTEN, port: int = DEFAULT_PORT):
+        self.metrics = metrics
+        self.listen = listen
+        self.port = port
+        self._server: ThreadingHTTPServer = None
+
+    def start(self) -> int:
+        """
+        * Запуск сервера в фоновом потоке
+        *
+        * @return Номер порта
+        """
+        self._server = ThreadingHTTPServer((self.listen, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.metrics = self.metrics
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        return self.port
+
+_shared_metrics: Metrics = None
+_shared_lock = threading.Lock()
+
+def get_metrics() -> Metrics:
+    """
+    * Общие для всей программы метрики
+    """
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
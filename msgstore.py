@@ -0,0 +1,140 @@
+"""
+* Класс для журналирования сообщений Telegram в базу данных
+* *************************
+* Сообщения пользователей сохраняются в базу данных "telegram.db"
+* фоновым потоком (см. класс DBWriter), поэтому обработчик
+* сообщений Telegram не ждёт записи на диск. В той же транзакции
+* обновляются сводные таблицы (количество сообщений пользователя
+* по дням, время первого и последнего сообщения), по которым строятся
+* отчёты без просмотра всей таблицы сообщений.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import sqlite3
+import time
+from collections import namedtuple, Counter
+
+from dbwriter import DBWriter, DEFAULT_QUEUE_SIZE, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+from search import FtsBackfill, USER_MESSAGES_FTS, create_fts_index
+
+UserMessage = namedtuple("UserMessage", ["user_id", "first_name", "last_name", "msg", "date_create", "seen_at"])
+
+class MessageStore(DBWriter):
+    DB_FILENAME: str = "telegram.db" # база данных для хранения сообщений пользователей
+
+    def __init__(self, db_filename: str = DB_FILENAME, queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        DBWriter.__init__(self, db_filename, queue_size, batch_size, flush_interval)
+        self.known_users = set() # пользователи, которые уже есть в таблице telegram_users
+        self.backfill: FtsBackfill = None # индексация для /search строк, записанных до появления индекса
+
+    def migrate(self, cur: sqlite3.Cursor) -> None:
+        cur.execute('''
+            create table if not exists telegram_users (
+              user_id integer primary key not null,
+              first_name text,
+              last_name text,
+              date_create text not null default current_date
+            )
+        ''')
+        cur.execute('''
+            create table if not exists user_messages (
+              user_id integer not null,
+              msg text,
+              date_create text not null default current_date,
+              foreign key (user_id) references telegram_users(user_id)
+            )
+        ''')
+        cur.execute("create index if not exists idx_user_messages_user_id_date_create on user_messages (user_id asc, date_create desc)")
+        cur.execute("select 1 from sqlite_master where type = 'table' and name = 'user_activity'")
+        build_rollups: bool = cur.fetchone() is None
+        cur.execute('''
+            create table if not exists user_daily_counts (
+              user_id integer not null,
+              day text not null,
+              messages integer not null,
+              primary key (user_id, day)
+            ) without rowid
+        ''')
+        cur.execute("create index if not exists idx_user_daily_counts_day on user_daily_counts (day)")
+        cur.execute('''
+            create table if not exists user_activity (
+              user_id integer primary key not null,
+              first_seen text not null,
+              last_seen text not null,
+              messages integer not null
+            )
+        ''')
+        if build_rollups: # сводные таблицы появились только что - заполняем их по уже записанным сообщениям (однократно)
+            cur.execute("insert into user_daily_counts (user_id, day, messages) select user_id, date_create, count(*) from user_messages group by user_id, date_create")
+            cur.execute("insert into user_activity (user_id, first_seen, last_seen, messages) select user_id, min(date_create), max(date_create), count(*) from user_messages group by user_id")
+        cur.execute("select user_id from telegram_users")
+        self.known_users.update(row[0] for row in cur.fetchall())
+        if create_fts_index(cur, USER_MESSAGES_FTS): # индекс для /search обновляется триггерами
+            self.backfill = FtsBackfill(self.db_filename, USER_MESSAGES_FTS)
+
+    def start(self) -> bool:
+        if not DBWriter.start(self):
+            return False
+        if self.backfill is not None:
+            self.backfill.start()
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self.backfill is not None:
+            self.backfill.close(timeout)
+        DBWriter.close(self, timeout)
+
+    def add(self, user_id: int, first_name: str, last_name: str, msg: str) -> bool:
+        """
+        * Постановка сообщения пользователя в очередь на запись
+        *
+        * @param user_id Уникальный идентификатор пользователя в Telegram
+        * @param first_name Имя пользователя
+        * @param last_name Фамилия пользователя
+        * @param msg Текст сообщения
+        * @return True, если сообщение принято в очередь
+        """
+        now = time.gmtime()
+        return self.put(UserMessage(user_id, first_name, last_name, msg, time.strftime("%Y-%m-%d", now), time.strftime("%Y-%m-%d %H:%M:%S", now)))
+
+    def write_batch(self, cur: sqlite3.Cursor, items: list) -> None:
+        new_users = {}
+        for item in items:
+            if item.user_id not in self.known_users and item.user_id not in new_users:
+                new_users[item.user_id] = (item.user_id, item.first_name, item.last_name)
+        if new_users:
+            cur.executemany("insert or ignore into telegram_users (user_id, first_name, last_name) values (?, ?, ?)", new_users.values())
+        cur.executemany("insert into user_messages (user_id, msg, date_create) values (?, ?, ?)", ((item.user_id, item.msg, item.date_create) for item in items))
+        self.write_rollups(cur, items)
+
+    def write_rollups(self, cur: sqlite3.Cursor, items: list) -> None:
+        """
+        * Обновление сводных таблиц (одна запись на пользователя и день в пределах пакета)
+        """
+        daily = Counter((item.user_id, item.date_create) for item in items)
+        cur.executemany(
+            "insert into user_daily_counts (user_id, day, messages) values (?, ?, ?) "
+            "on conflict (user_id, day) do update set messages = messages + excluded.messages",
+            ((user_id, day, count) for (user_id, day), count in daily.items())
+        )
+        activity = {} # пользователь -> [первое сообщение, последнее сообщение, количество]
+        for item in items:
+            seen = activity.get(item.user_id)
+            if seen is None:
+                activity[item.user_id] = [item.seen_at, item.seen_at, 1]
+            else:
+                seen[0] = min(seen[0], item.seen_at)
+                seen[1] = max(seen[1], item.seen_at)
+                seen[2] += 1
+        cur.executemany(
+            "insert into user_activity (user_id, first_seen, last_seen, messages) values (?, ?, ?, ?) "
+            "on conflict (user_id) do update set first_seen = min(first_seen, excluded.first_seen), "
+            "last_seen = max(last_seen, excluded.last_seen), messages = messages + excluded.messages",
+            ((user_id, *seen) for user_id, seen in activity.items())
+        )
+
+    def after_commit(self, items: list) -> None:
+        self.known_users.update(item.user_id for item in items)
@@ -0,0 +1,164 @@
+"""
+* Класс "Хранилище фраз"
+* *************************
+* Для каждого файла фраз один раз строится индекс смещений строк,
+* который используется до изменения времени модификации (mtime) или
+* размера файла. Случайная фраза читается из файла по смещению (seek),
+* и декодируется только выбранная строка. Для каждого чата запоминаются
+* последние выданные фразы, чтобы они не повторялись подряд.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import os
+import random
+import threading
+import time
+from array import array
+from collections import namedtuple, deque
+
+PhraseStats = namedtuple("PhraseStats", ["files", "phrases", "rebuilds", "served"])
+CHECK_INTERVAL: float = 1.0 # как часто (в секундах) проверять mtime файлов фраз
+DEFAULT_HISTORY: int = 10 # сколько последних фраз не повторять в одном чате
+MAX_CHATS: int = 10000 # для скольких чатов хранится история выданных фраз
+
+class PhraseIndex:
+    """
+    * Индекс смещений непустых строк одного файла фраз
+    """
+
+    def __init__(self, filename: str, encoding: str):
+        self.filename = filename
+        self.encoding = encoding
+        self.starts = array("q") # смещение начала строки
+        self.ends = array("q") # смещение конца строки (без перевода строки)
+        self.signature = None # (mtime, размер) файла, по которому построен индекс
+        self.rebuilds: int = 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def refresh(self) -> bool:
+        """
+        * Перестроение индекса, если файл изменился
+        *
+        * @return True, если индекс был перестроен
+        """
+        stat = os.stat(self.filename)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return False
+        with open(self.filename, "rb") as f:
+            data: bytes = f.read()
+        starts = array("q")
+        ends = array("q")
+        position: int = 0
+        size: int = len(data)
+        while position < size:
+            end: int = data.find(b"\n", position)
+            end = size if end < 0 else end
+            line_end: int = end - 1 if end > position and data[end - 1] == 13 else end # без "\r"
+            if data[position:line_end].strip():
+                starts.append(position)
+                ends.append(line_end)
+            position = end + 1
+        self.starts, self.ends, self.signature = starts, ends, signature
+        self.rebuilds += 1
+        return True
+
+    def phrase(self, index: int) -> str:
+        """
+        * Чтение одной фразы по номеру
+        *
+        * @param index Номер фразы в индексе
+        * @return Текст фразы
+        """
+        start: int = self.starts[index]
+        with open(self.filename, "rb") as f:
+            f.seek(start)
+            data: bytes = f.read(self.ends[index] - start)
+        return data.decode(self.encoding, errors="replace").strip()
+
+class PhraseStore:
+
+    def __init__(self, filenames: list, encoding: str, history: int = DEFAULT_HISTORY):
+        """
+        * @param filenames Список файлов фраз (по одной фразе в строке)
+        * @param encoding Кодировка файлов
+        * @param history Сколько последних фраз не повторять в одном чате
+        """
+        self.indexes = [PhraseIndex(filename, encoding) for filename in filenames]
+        self.history = history if history >= 0 else DEFAULT_HISTORY
+        self.served: int = 0
+        self._recent = {} # чат -> последние выданные фразы (номер файла, номер строки)
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now: float = time.monotonic()
+        if self._checked_at > 0 and now - self._checked_at < CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        changed: bool = False
+        for index in self.indexes:
+            try:
+                changed = index.refresh() or changed
+            except OSError as e:
+                if index.signature is not None:
+                    print(f"Не удалось прочитать файл фраз {index.filename}: {e}")
+                index.starts, index.ends, index.signature = array("q"), array("q"), None
+        if changed: # номера строк изменились - история чатов больше не актуальна
+            self._recent.clear()
+
+    def _choose(self, total: int):
+        position: int = random.randrange(total)
+        for file_number, index in enumerate(self.indexes):
+            if position < len(index):
+                return file_number, position
+            position -= len(index)
+
+    def get_phrase(self, chat_id: int = None) -> str:
+        """
+        * Случайная фраза из всех файлов
+        *
+        * @param chat_id Идентификатор чата (для исключения повторов; None - без учёта истории)
+        * @return Текст фразы (пустая строка, если фраз нет)
+        """
+        with self._lock:
+            self._refresh()
+            total: int = sum(len(index) for index in self.indexes)
+            if total == 0:
+                return ""
+            recent: deque = None
+            if chat_id is not None and self.history > 0:
+                recent = self._recent.get(chat_id)
+                if recent is None:
+                    if len(self._recent) >= MAX_CHATS:
+                        self._recent.pop(next(iter(self._recent)))
+                    recent = deque()
+                    self._recent[chat_id] = recent
+                while len(recent) > min(self.history, total - 1):
+                    recent.popleft()
+            choice = self._choose(total)
+            if recent:
+                for _ in range(len(recent) * 4): # повторный выбор, пока фраза совпадает с недавней
+                    if choice not in recent:
+                        break
+                    choice = self._choose(total)
+                if choice in recent: # не повезло - берём первую подходящую
+                    choice = next((f, i) for f, index in enumerate(self.indexes) for i in range(len(index)) if (f, i) not in recent)
+            if recent is not None and self.history > 0 and total > 1:
+                recent.append(choice)
+            file_number, line_number = choice
+            self.served += 1
+            try:
+                return self.indexes[file_number].phrase(line_number)
+            except (OSError, IndexError) as e:
+                print(f"Не удалось прочитать фразу из файла {self.indexes[file_number].filename}: {e}")
+                return ""
+
+    def stats(self) -> PhraseStats:
+        with self._lock:
+            return PhraseStats(len(self.indexes), sum(len(index) for index in self.indexes), sum(index.rebuilds for index in self.indexes), self.served)
@@ -0,0 +1,101 @@
+"""
+* Класс "Снимок процессов"
+* *************************
+* Список процессов компьютера снимается не чаще одного раза в несколько
+* секунд и используется всеми запросами /ps до устаревания. Загрузка
+* CPU каждого процесса вычисляется по приросту процессорного времени
+* между двумя снимками, а первые N процессов по CPU или памяти (RSS)
+* выбираются частичной выборкой (heapq.nlargest) без полной сортировки.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import heapq
+import threading
+import time
+from collections import namedtuple
+from operator import attrgetter
+
+import psutil
+
+from metrics import get_metrics
+
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "name", "username", "cpu_percent", "rss"])
+ProcessSnapshot = namedtuple("ProcessSnapshot", ["taken_at", "processes"])
+SORT_CPU: str = "cpu"
+SORT_MEM: str = "mem"
+SORT_KEYS = {SORT_CPU: attrgetter("cpu_percent", "rss"), SORT_MEM: attrgetter("rss", "cpu_percent")}
+DEFAULT_MAX_AGE: float = 3.0 # сколько секунд снимок считается свежим
+PRIME_INTERVAL: float = 0.5 # пауза между первыми двумя снимками (для вычисления загрузки CPU)
+PROCESS_ATTRS = ["pid", "name", "username", "cpu_times", "memory_info", "create_time"]
+
+class ProcessSampler:
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE):
+        """
+        * @param max_age Сколько секунд снимок используется повторно
+        """
+        self.max_age = max_age if max_age > 0 else DEFAULT_MAX_AGE
+        self.samples: int = 0 # количество снятых снимков
+        self._snapshot: ProcessSnapshot = None
+        self._cpu_times = {} # (pid, время запуска) -> процессорное время в предыдущем снимке
+        self._cpu_taken_at: float = 0.0
+        self._lock = threading.Lock()
+        get_metrics().gauge("ps_samples_total", lambda: self.samples)
+
+    def _sample(self) -> ProcessSnapshot:
+        """
+        * Снятие снимка (загрузка CPU - по приросту процессорного времени с предыдущего снимка)
+        """
+        started: float = time.perf_counter()
+        taken_at: float = time.monotonic()
+        elapsed: float = taken_at - self._cpu_taken_at
+        cpu_times = {}
+        processes = []
+        for process in psutil.process_iter(PROCESS_ATTRS):
+            info = process.info
+            cpu = info["cpu_times"]
+            memory = info["memory_info"]
+            cpu_total: float = cpu.user + cpu.system if cpu is not None else 0.0
+            key = (info["pid"], info["create_time"])
+            cpu_times[key] = cpu_total
+            previous: float = self._cpu_times.get(key)
+            cpu_percent: float = (cpu_total - previous) / elapsed * 100 if previous is not None and elapsed > 0 else 0.0
+            processes.append(ProcessInfo(info["pid"], info["name"] or "", info["username"] or "", max(cpu_percent, 0.0), memory.rss if memory is not None else 0))
+        self._cpu_times = cpu_times
+        self._cpu_taken_at = taken_at
+        self.samples += 1
+        get_metrics().observe("ps_sample_seconds", time.perf_counter() - started)
+        return ProcessSnapshot(taken_at, processes)
+
+    def snapshot(self) -> ProcessSnapshot:
+        """
+        * Текущий снимок (новый снимается, только если прежний устарел)
+        """
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._snapshot.taken_at >= self.max_age:
+                if not self._cpu_times: # первый снимок нужен только как точка отсчёта процессорного времени
+                    self._sample()
+                    time.sleep(PRIME_INTERVAL)
+                self._snapshot = self._sample()
+            return self._snapshot
+
+    def top(self, sort: str = SORT_CPU, count: int = 10, offset: int = 0, pattern: str = ""):
+        """
+        * Первые процессы снимка по загрузке CPU или памяти
+        *
+        * @param sort SORT_CPU или SORT_MEM
+        * @param count Количество процессов
+        * @param offset Сколько первых процессов пропустить (для постраничного вывода)
+        * @param pattern Подстрока имени процесса (без учёта регистра, пустая строка - все процессы)
+        * @return Список ProcessInfo, количество подходящих процессов, возраст снимка (в секундах)
+        """
+        snapshot: ProcessSnapshot = self.snapshot()
+        processes = snapshot.processes
+        if not "".__eq__(pattern):
+            pattern = pattern.casefold()
+            processes = [process for process in processes if pattern in process.name.casefold()]
+        selected = heapq.nlargest(offset + count, processes, key=SORT_KEYS.get(sort, SORT_KEYS[SORT_CPU]))
+        return selected[offset:], len(processes), time.monotonic() - snapshot.taken_at
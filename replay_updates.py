@@ -0,0 +1,78 @@
+"""
+* Воспроизведение записанных обновлений Telegram на webhook бота
+* *************************
+* Программа отправляет POST-запросами обновления (JSON) из файла
+* на локальный адрес webhook, как это делает сервер Telegram. Файл
+* может содержать одно обновление, массив обновлений или по одному
+* обновлению в строке (JSON Lines). Полезно для проверки режима
+* webhook без доступа к Telegram.
+* Пример запуска:
+* $ python3 replay_updates.py updates.jsonl --url http://127.0.0.1:8443/telegram --secret_token my_secret
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+
+from webhook import SECRET_HEADER, DEFAULT_LISTEN, DEFAULT_PORT, DEFAULT_PATH
+
+def read_updates(filename: str) -> list:
+    """
+    * Чтение обновлений из файла
+    *
+    * @param filename Имя файла (JSON или JSON Lines)
+    * @return Список обновлений (словарей)
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        text: str = f.read()
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except ValueError: # JSON Lines
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def post_update(url: str, update: dict, secret_token: str = "", timeout: float = 10) -> int:
+    """
+    * Отправка одного обновления
+    *
+    * @return HTTP-код ответа
+    """
+    request = urllib.request.Request(url, data=json.dumps(update).encode("utf-8"), method="POST", headers={"Content-Type": "application/json"})
+    if secret_token:
+        request.add_header(SECRET_HEADER, secret_token)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных обновлений Telegram на webhook бота")
+    parser.add_argument("filename", help="файл с обновлениями (JSON или JSON Lines)")
+    parser.add_argument("--url", default=f"http://{DEFAULT_LISTEN}:{DEFAULT_PORT}{DEFAULT_PATH}", help="адрес webhook")
+    parser.add_argument("--secret_token", default="", help="секретный токен (заголовок X-Telegram-Bot-Api-Secret-Token)")
+    parser.add_argument("--delay", type=float, default=0.0, help="пауза между обновлениями (в секундах)")
+    parser.add_argument("--repeat", type=int, default=1, help="сколько раз повторить файл")
+    args = parser.parse_args()
+    updates = read_updates(args.filename)
+    codes = {}
+    started: float = time.perf_counter()
+    for _ in range(max(1, args.repeat)):
+        for update in updates:
+            code: int = post_update(args.url, update, args.secret_token)
+            codes[code] = codes.get(code, 0) + 1
+            if args.delay > 0:
+                time.sleep(args.delay)
+    elapsed: float = time.perf_counter() - started
+    total: int = sum(codes.values())
+    print(f"Отправлено обновлений: {total} за {elapsed:.3f} с ({total / elapsed if elapsed > 0 else 0:.1f} в секунду).")
+    print("Коды ответов: " + ", ".join(f"{code}: {count}" for code, count in sorted(codes.items())))
+
+if __name__ == "__main__":
+    main()
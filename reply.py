@@ -0,0 +1,121 @@
+"""
+* Класс для формирования многострочных ответов бота
+* *************************
+* Строки ответа упаковываются в минимальное количество сообщений
+* Telegram (не длиннее 4096 символов каждое) с разбиением только
+* по границам строк. Табличные данные можно выводить моноширинным
+* шрифтом (блок <pre> в режиме разметки HTML).
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import html
+
+TELEGRAM_MESSAGE_LIMIT: int = 4096 # максимальная длина сообщения Telegram (в символах UTF-16)
+PARSE_MODE_HTML: str = "HTML"
+PRE_OPEN: str = "<pre>"
+PRE_CLOSE: str = "</pre>"
+
+class ReplyBuilder:
+
+    def __init__(self, monospace: bool = False, header: str = "", limit: int = TELEGRAM_MESSAGE_LIMIT, max_messages: int = 0):
+        """
+        * @param monospace Выводить строки моноширинным шрифтом
+        * @param header Заголовок (обычным шрифтом) в начале первого сообщения
+        * @param limit Максимальная длина одного сообщения
+        * @param max_messages Максимальное количество сообщений (0 - без ограничения)
+        """
+        self.monospace = monospace
+        self.header = header
+        self.limit = limit
+        self.max_messages = max_messages
+        self.lines = []
+
+    @property
+    def parse_mode(self) -> str:
+        """
+        * Режим разметки, с которым нужно отправлять сообщения
+        """
+        return PARSE_MODE_HTML if self.monospace else None
+
+    @staticmethod
+    def length(text: str) -> int:
+        """
+        * Длина строки так, как её считает Telegram (в символах UTF-16)
+        """
+        return len(text.encode("utf-16-le")) // 2
+
+    def add(self, line: str) -> "ReplyBuilder":
+        """
+        * Добавление строки в ответ
+        """
+        self.lines.append(str(line))
+        return self
+
+    def extend(self, lines) -> "ReplyBuilder":
+        """
+        * Добавление нескольких строк в ответ
+        """
+        self.lines.extend(str(line) for line in lines)
+        return self
+
+    def _escape(self, text: str) -> str:
+        return html.escape(text, quote=False) if self.monospace else text
+
+    def _split_long_line(self, line: str, capacity: int) -> list:
+        pieces = []
+        piece: str = ""
+        piece_length: int = 0
+        for char in line:
+            char_length: int = self.length(self._escape(char))
+            if piece_length + char_length > capacity:
+                pieces.append(piece)
+                piece, piece_length = "", 0
+            piece += char
+            piece_length += char_length
+        if piece:
+            pieces.append(piece)
+        return [self._escape(piece) for piece in pieces]
+
+    def messages(self) -> list:
+        """
+        * Упаковка строк в сообщения
+        *
+        * @return Список текстов сообщений
+        """
+        prefix: str = PRE_OPEN if self.monospace else ""
+        suffix: str = PRE_CLOSE if self.monospace else ""
+        overhead: int = self.length(prefix) + self.length(suffix)
+        result = []
+        current = []
+        current_length: int = 0
+        first_prefix: str = (self._escape(self.header) + "\n" + prefix) if self.header else prefix
+        first_overhead: int = self.length(first_prefix) + self.length(suffix)
+
+        def flush():
+            nonlocal current, current_length
+            if current:
+                result.append((first_prefix if not result else prefix) + "\n".join(current) + suffix)
+            current, current_length = [], 0
+
+        for line in self.lines:
+            capacity: int = self.limit - (first_overhead if not result else overhead)
+            text: str = self._escape(line)
+            text_length: int = self.length(text)
+            pieces = [text] if text_length <= capacity else self._split_long_line(line, capacity)
+            for piece in pieces:
+                piece_length: int = self.length(piece)
+                added_length: int = piece_length + (1 if current else 0) # с учётом перевода строки
+                if current and current_length + added_length > self.limit - (first_overhead if not result else overhead):
+                    flush()
+                    added_length = piece_length
+                current.append(piece)
+                current_length += added_length
+        flush()
+        if not result and self.header:
+            result.append(self.header)
+        if self.max_messages > 0:
+            result = result[:self.max_messages]
+        return result
@@ -0,0 +1,189 @@
+"""
+* Отчёты об активности пользователей Telegram и участников IRC
+* *************************
+* Отчёты строятся по сводным таблицам, которые обновляются при записи
+* сообщений (см. MessageStore и IRCLogStore), поэтому время построения
+* отчёта не зависит от размера таблиц сообщений. Результат выводится
+* таблицей или сохраняется в формате CSV/JSON. Эти же отчёты выдаёт
+* команда /report в Telegram (только для администраторов).
+* Все даты и время - в UTC.
+* Пример запуска:
+* $ python3 report.py users
+* $ python3 report.py daily --days 30 --format csv --output daily.csv
+* $ python3 report.py irc_hours --format json
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from contextlib import closing
+from sqlite3 import OperationalError
+
+Report = namedtuple("Report", ["title", "columns", "rows"])
+TELEGRAM_DB: str = "telegram.db"
+IRC_DB: str = "irc.db"
+DEFAULT_DAYS: int = 7 # за сколько последних дней строятся отчёты по дням и часам
+DEFAULT_LIMIT: int = 100 # максимальное количество строк отчёта
+FORMAT_TABLE: str = "table"
+FORMAT_CSV: str = "csv"
+FORMAT_JSON: str = "json"
+
+REPORTS = { # имя отчёта -> (база данных, заголовок, колонки, запрос с параметрами :since и :limit)
+    "users": (
+        TELEGRAM_DB,
+        "Пользователи Telegram: количество сообщений, первое и последнее сообщение",
+        ["user_id", "first_name", "last_name", "messages", "first_seen", "last_seen"],
+        '''
+        select a.user_id, u.first_name, u.last_name, a.messages, a.first_seen, a.last_seen
+          from user_activity a
+            left join telegram_users u
+              using (user_id)
+          order by a.messages desc, a.user_id asc
+          limit :limit
+        '''
+    ),
+    "daily": (
+        TELEGRAM_DB,
+        "Сообщения пользователей Telegram по дням",
+        ["day", "user_id", "first_name", "messages"],
+        '''
+        select d.day, d.user_id, u.first_name, d.messages
+          from user_daily_counts d
+            left join telegram_users u
+              using (user_id)
+          where d.day >= :since
+          order by d.day desc, d.messages desc
+          limit :limit
+        '''
+    ),
+    "days": (
+        TELEGRAM_DB,
+        "Сообщения Telegram по дням (все пользователи)",
+        ["day", "users", "messages"],
+        '''
+        select day, count(*), sum(messages)
+          from user_daily_counts
+          where day >= :since
+          group by day
+          order by day desc
+          limit :limit
+        '''
+    ),
+    "irc_hours": (
+        IRC_DB,
+        "Сообщения IRC по часам суток",
+        ["hour", "messages", "avg_per_day"],
+        '''
+        select substr(hour, 12, 2), sum(messages), round(sum(messages) * 1.0 / count(distinct substr(hour, 1, 10)), 1)
+          from irc_hourly_counts
+          where hour >= :since
+          group by 1
+          order by 2 desc
+          limit :limit
+        '''
+    ),
+    "irc_volume": (
+        IRC_DB,
+        "Сообщения IRC по часам",
+        ["hour", "messages"],
+        '''
+        select hour, messages
+          from irc_hourly_counts
+          where hour >= :since
+          order by hour desc
+          limit :limit
+        '''
+    ),
+    "irc_nicks": (
+        IRC_DB,
+        "Участники IRC: количество сообщений, первое и последнее сообщение",
+        ["nick", "messages", "first_seen", "last_seen"],
+        '''
+        select nick, messages, first_seen, last_seen
+          from irc_nick_activity
+          order by messages desc, nick asc
+          limit :limit
+        '''
+    )
+}
+
+def build_report(name: str, days: int = DEFAULT_DAYS, limit: int = DEFAULT_LIMIT, telegram_db: str = TELEGRAM_DB, irc_db: str = IRC_DB) -> Report:
+    """
+    * Построение отчёта по сводным таблицам
+    *
+    * @param name Имя отчёта (ключ словаря REPORTS)
+    * @param days За сколько последних дней (для отчётов по дням и часам)
+    * @param limit Максимальное количество строк
+    * @param telegram_db Файл базы данных сообщений Telegram
+    * @param irc_db Файл базы данных чатлога IRC
+    * @return Отчёт (пустой список строк, если базы данных или сводных таблиц ещё нет)
+    """
+    db_name, title, columns, query = REPORTS[name]
+    db_filename: str = telegram_db if db_name == TELEGRAM_DB else irc_db
+    since: str = time.strftime("%Y-%m-%d", time.gmtime(time.time() - max(days - 1, 0) * 86400))
+    try:
+        with closing(sqlite3.connect(f"file:{db_filename}?mode=ro", uri=True, timeout=5)) as conn:
+            rows = conn.execute(query, {"since": since, "limit": limit}).fetchall()
+    except OperationalError:
+        rows = []
+    return Report(title, columns, rows)
+
+def format_table(report: Report) -> str:
+    """
+    * Отчёт в виде текстовой таблицы (для консоли и моноширинного вывода в Telegram)
+    """
+    cells = [[str(value) if value is not None else "" for value in row] for row in report.rows]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(report.columns)]
+    lines = [
+        "  ".join(column.ljust(widths[i]) for i, column in enumerate(report.columns)),
+        "  ".join("-" * width for width in widths)
+    ]
+    lines.extend("  ".join(value.ljust(widths[i]) for i, value in enumerate(row)) for row in cells)
+    return "\n".join(lines)
+
+def format_csv(report: Report) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(report.columns)
+    writer.writerows(report.rows)
+    return output.getvalue()
+
+def format_json(report: Report) -> str:
+    return json.dumps([dict(zip(report.columns, row)) for row in report.rows], ensure_ascii=False, indent=2)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Отчёты об активности пользователей Telegram и участников IRC")
+    parser.add_argument("report", choices=list(REPORTS), help="имя отчёта")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="за сколько последних дней (отчёты по дням и часам)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="максимальное количество строк")
+    parser.add_argument("--format", choices=(FORMAT_TABLE, FORMAT_CSV, FORMAT_JSON), default=FORMAT_TABLE, help="формат вывода")
+    parser.add_argument("--output", default="", help="файл для сохранения отчёта (по умолчанию - вывод в консоль)")
+    parser.add_argument("--telegram_db", default=TELEGRAM_DB, help="база данных сообщений Telegram")
+    parser.add_argument("--irc_db", default=IRC_DB, help="база данных чатлога IRC")
+    args = parser.parse_args()
+    report: Report = build_report(args.report, args.days, args.limit, args.telegram_db, args.irc_db)
+    if args.format == FORMAT_CSV:
+        text: str = format_csv(report)
+    elif args.format == FORMAT_JSON:
+        text = format_json(report)
+    else:
+        text = f"{report.title}\n{format_table(report)}\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        print(f"Отчёт сохранён в файл {args.output} (строк: {len(report.rows)}).")
+    else:
+        sys.stdout.write(text if text.endswith("\n") else text + "\n")
+
+# Точка запуска программы
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+* Класс для работы с RSS-лентами
+* *************************
+* Разбор RSS 2.0 (и Atom) без сторонних библиотек. Ленты опрашиваются
+* в фоне условными запросами (ETag / Last-Modified), а новые элементы
+* добавляются в хранилище в памяти, поэтому команда /rss отвечает сразу.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+from httpclient import get_client
+
+RssItem = namedtuple("RssItem", ["guid", "title", "link"])
+RssStats = namedtuple("RssStats", ["feeds", "polls", "not_modified", "new_items", "errors"])
+ATOM_NS: str = "{http://www.w3.org/2005/Atom}"
+DEFAULT_POLL_INTERVAL: float = 300 # интервал опроса лент (в секундах)
+DEFAULT_MAX_ITEMS: int = 200 # максимальное количество хранимых элементов одной ленты
+
+class RssFeed:
+
+    @staticmethod
+    def parse_items(xml_text: str, limit: int = 0) -> list:
+        """
+        * Разбор RSS-ленты
+        *
+        * @param xml_text Текст ленты (XML)
+        * @param limit Максимальное количество элементов (0 - без ограничения)
+        * @return Список RssItem в порядке следования в ленте
+        """
+        items = []
+        root = ET.fromstring(xml_text)
+        for node in root.iter():
+            if node.tag == "item": # RSS 2.0
+                title: str = (node.findtext("title") or "").strip()
+                link: str = (node.findtext("link") or "").strip()
+                guid: str = (node.findtext("guid") or link or title).strip()
+            elif node.tag == f"{ATOM_NS}entry": # Atom
+                title = (node.findtext(f"{ATOM_NS}title") or "").strip()
+                link_node = node.find(f"{ATOM_NS}link")
+                link = (link_node.get("href", "") if link_node is not None else "").strip()
+                guid = (node.findtext(f"{ATOM_NS}id") or link or title).strip()
+            else:
+                continue
+            items.append(RssItem(guid, title, link))
+            if limit > 0 and len(items) >= limit:
+                break
+        return items
+
+    @staticmethod
+    def parse_new_items(xml_text: str, known_guids, limit: int = 0) -> list:
+        """
+        * Разбор только новых элементов RSS-ленты
+        * (для уже известных элементов заголовок и ссылка не извлекаются)
+        *
+        * @param xml_text Текст ленты (XML)
+        * @param known_guids Множество идентификаторов уже известных элементов
+        * @param limit Максимальное количество элементов ленты, которые просматриваются (0 - без ограничения)
+        * @return Список идентификаторов всех элементов ленты и список новых RssItem
+        """
+        guids = []
+        items = []
+        root = ET.fromstring(xml_text)
+        for node in root.iter():
+            if node.tag == "item": # RSS 2.0
+                guid: str = (node.findtext("guid") or node.findtext("link") or node.findtext("title") or "").strip()
+                if guid not in known_guids:
+                    items.append(RssItem(guid, (node.findtext("title") or "").strip(), (node.findtext("link") or "").strip()))
+            elif node.tag == f"{ATOM_NS}entry": # Atom
+                link_node = node.find(f"{ATOM_NS}link")
+                link: str = (link_node.get("href", "") if link_node is not None else "").strip()
+                guid = (node.findtext(f"{ATOM_NS}id") or link or node.findtext(f"{ATOM_NS}title") or "").strip()
+                if guid not in known_guids:
+                    items.append(RssItem(guid, (node.findtext(f"{ATOM_NS}title") or "").strip(), link))
+            else:
+                continue
+            guids.append(guid)
+            if limit > 0 and len(guids) >= limit:
+                break
+        return guids, items
+
+class FeedState:
+    """
+    * Состояние одной RSS-ленты: элементы (новые в начале) и заголовки для условного запроса
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.items = [] # элементы ленты, новые в начале
+        self.guids = set() # идентификаторы элементов, уже встречавшихся в ленте
+        self.etag: str = ""
+        self.last_modified: str = ""
+        self.updated_at: float = 0.0 # время последнего успешного опроса (0 - лента ещё не загружена)
+
+class RssPoller:
+
+    def __init__(self, feeds: list, interval: float = DEFAULT_POLL_INTERVAL, max_items: int = DEFAULT_MAX_ITEMS, http_proxy: str = "", https_proxy: str = ""):
+        """
+        * @param feeds Список адресов RSS-лент
+        * @param interval Интервал опроса лент (в секундах)
+        * @param max_items Максимальное количество хранимых элементов одной ленты
+        * @param http_proxy URL proxy-сервера для HTTP
+        * @param https_proxy URL proxy-сервера для HTTPS
+        """
+        self.interval = interval if interval > 0 else DEFAULT_POLL_INTERVAL
+        self.max_items = max_items if max_items > 0 else DEFAULT_MAX_ITEMS
+        self.http_proxy = http_proxy
+        self.https_proxy = https_proxy
+        self.feeds = [FeedState(url) for url in feeds]
+        self.polls: int = 0 # выполнено запросов
+        self.not_modified: int = 0 # ответов 304 (лента не изменилась)
+        self.new_items: int = 0 # получено новых элементов
+        self.errors: int = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event() # все ленты опрошены хотя бы один раз
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        """
+        * Запуск фонового опроса лент
+        """
+        if self._thread is not None or not self.feeds:
+            return
+        self._thread = threading.Thread(target=self._run, name="RssPoller", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка фонового опроса лент
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """
+        * Ожидание первой загрузки всех лент
+        *
+        * @param timeout Максимальное время ожидания (в секундах)
+        * @return Загружены ли ленты
+        """
+        return self._ready.wait(timeout)
+
+    def items(self, feed_index: int, limit: int = 0) -> list:
+        """
+        * Элементы ленты из хранилища (без обращения к сети)
+        *
+        * @param feed_index Номер ленты (с нуля)
+        * @param limit Максимальное количество элементов (0 - все)
+        * @return Список RssItem, новые в начале
+        """
+        with self._lock:
+            items = self.feeds[feed_index].items
+            return list(items[:limit] if limit > 0 else items)
+
+    def stats(self) -> RssStats:
+        with self._lock:
+            return RssStats(len(self.feeds), self.polls, self.not_modified, self.new_items, self.errors)
+
+    def poll(self, feed: FeedState) -> int:
+        """
+        * Условный запрос ленты (If-None-Match / If-Modified-Since)
+        * и добавление новых элементов в хранилище
+        *
+        * @param feed Состояние ленты
+        * @return Количество новых элементов
+        """
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+        response = get_client().fetch(feed.url, self.http_proxy, self.https_proxy, headers=headers)
+        if response.status_code == 304: # лента не изменилась
+            with self._lock:
+                self.polls += 1
+                self.not_modified += 1
+                feed.updated_at = time.time()
+            return 0
+        response.raise_for_status()
+        guids, new_items = RssFeed.parse_new_items(response.text, feed.guids, self.max_items)
+        with self._lock:
+            self.polls += 1
+            self.new_items += len(new_items)
+            feed.items = (new_items + feed.items)[:self.max_items]
+            feed.guids = set(guids) | {item.guid for item in feed.items}
+            feed.etag = response.headers.get("ETag", "")
+            feed.last_modified = response.headers.get("Last-Modified", "")
+            feed.updated_at = time.time()
+        return len(new_items)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for feed in self.feeds:
+                if self._stop.is_set():
+                    return
+                try:
+                    self.poll(feed)
+                except Exception as e:
+                    with self._lock:
+                        self.errors += 1
+                    print(f"Не удалось прочитать RSS-ленту {feed.url}: {e}")
+            self._ready.set() # даже при ошибках, чтобы /rss не ждал напрасно
+            self._stop.wait(self.interval)
@@ -0,0 +1,233 @@
+"""
+* Полнотекстовый поиск по истории чатов (SQLite FTS5)
+* *************************
+* Для таблиц user_messages (telegram.db) и irc_log (irc.db) создаются
+* индексы FTS5 с внешним содержимым (текст хранится только в исходной
+* таблице). Новые и удалённые строки попадают в индекс через триггеры,
+* а строки, записанные до появления индекса, индексируются фоновым
+* потоком небольшими пакетами (прогресс сохраняется в таблице
+* fts_backfill, поэтому после перезапуска индексация продолжается
+* с места остановки). Результаты поиска упорядочиваются по релевантности
+* (bm25) и выдаются постранично вместе с фрагментами текста.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import heapq
+import sqlite3
+from sqlite3 import OperationalError, Error
+import threading
+from collections import namedtuple
+from contextlib import closing
+
+FtsIndex = namedtuple("FtsIndex", ["table", "column", "fts_table", "source"])
+SearchHit = namedtuple("SearchHit", ["source", "rowid", "date_create", "snippet", "rank", "user_id"])
+USER_MESSAGES_FTS: FtsIndex = FtsIndex("user_messages", "msg", "user_messages_fts", "telegram")
+IRC_LOG_FTS: FtsIndex = FtsIndex("irc_log", "message", "irc_log_fts", "irc")
+DEFAULT_PAGE_SIZE: int = 10 # результатов на одной странице
+DEFAULT_BACKFILL_BATCH: int = 5000 # строк в одной транзакции фоновой индексации
+BACKFILL_PAUSE: float = 0.05 # пауза между пакетами (чтобы не мешать записи новых сообщений)
+SNIPPET_TOKENS: int = 12 # длина фрагмента текста (в словах)
+MAX_TERMS: int = 10 # максимальное количество слов в запросе
+
+def is_fts5_available() -> bool:
+    """
+    * Проверка поддержки FTS5 в библиотеке SQLite
+    """
+    try:
+        with closing(sqlite3.connect(":memory:")) as conn:
+            conn.execute("create virtual table fts5_check using fts5(x)")
+        return True
+    except OperationalError:
+        return False
+
+def create_fts_index(cur: sqlite3.Cursor, index: FtsIndex) -> bool:
+    """
+    * Создание индекса FTS5 и триггеров синхронизации (вызывается из migrate() писателя)
+    * (строки, существовавшие до создания индекса, индексирует FtsBackfill)
+    *
+    * @param cur Курсор базы данных
+    * @param index Описание индекса
+    * @return True, если индекс создан или уже существует
+    """
+    cur.execute("select 1 from sqlite_master where type = 'table' and name = ?", (index.fts_table,))
+    if cur.fetchone() is not None:
+        return True
+    if not is_fts5_available():
+        print(f"Библиотека SQLite собрана без FTS5, поиск по таблице {index.table} недоступен.")
+        return False
+    cur.execute('''
+        create table if not exists fts_backfill (
+          fts_table text primary key not null,
+          done_rowid integer not null,
+          last_rowid integer not null
+        )
+    ''')
+    cur.execute(f"create virtual table {index.fts_table} using fts5({index.column}, content='{index.table}', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')")
+    cur.execute(f"insert into fts_backfill (fts_table, done_rowid, last_rowid) select ?, 0, coalesce(max(rowid), 0) from {index.table}", (index.fts_table,))
+    not_backfilled: str = f"not exists (select 1 from fts_backfill b where b.fts_table = '{index.fts_table}' and old.rowid > b.done_rowid and old.rowid <= b.last_rowid)"
+    cur.execute(f'''
+        create trigger {index.fts_table}_ai after insert on {index.table} begin
+          insert into {index.fts_table} (rowid, {index.column}) values (new.rowid, new.{index.column});
+        end
+    ''')
+    cur.execute(f'''
+        create trigger {index.fts_table}_ad after delete on {index.table} when {not_backfilled} begin
+          insert into {index.fts_table} ({index.fts_table}, rowid, {index.column}) values ('delete', old.rowid, old.{index.column});
+        end
+    ''')
+    cur.execute(f'''
+        create trigger {index.fts_table}_au after update of {index.column} on {index.table} when {not_backfilled} begin
+          insert into {index.fts_table} ({index.fts_table}, rowid, {index.column}) values ('delete', old.rowid, old.{index.column});
+          insert into {index.fts_table} (rowid, {index.column}) values (new.rowid, new.{index.column});
+        end
+    ''')
+    return True
+
+def build_query(terms: str) -> str:
+    """
+    * Преобразование слов пользователя в безопасный запрос FTS5
+    * (каждое слово - в кавычках, "слово*" - поиск по началу слова; все слова обязательны)
+    *
+    * @param terms Слова через пробел
+    * @return Запрос FTS5 (пустая строка, если слов нет)
+    """
+    parts = []
+    for term in terms.split()[:MAX_TERMS]:
+        prefix: bool = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if not "".__eq__(term):
+            parts.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(parts)
+
+class FtsBackfill:
+    """
+    * Фоновая индексация строк, записанных до создания индекса FTS5
+    """
+
+    def __init__(self, db_filename: str, index: FtsIndex, batch_size: int = DEFAULT_BACKFILL_BATCH):
+        self.db_filename = db_filename
+        self.index = index
+        self.batch_size = batch_size if batch_size > 0 else DEFAULT_BACKFILL_BATCH
+        self.indexed: int = 0 # строк проиндексировано за время работы
+        self._stopping = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"FtsBackfill({self.index.fts_table})", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка индексации (продолжится при следующем запуске)
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def step(self, conn: sqlite3.Connection) -> bool:
+        """
+        * Индексация одного пакета строк (в одной транзакции вместе с сохранением прогресса)
+        *
+        * @return True, если остались неиндексированные строки
+        """
+        cur = conn.cursor()
+        try:
+            cur.execute("select done_rowid, last_rowid from fts_backfill where fts_table = ?", (self.index.fts_table,))
+            row = cur.fetchone()
+            if row is None:
+                return False
+            done_rowid, last_rowid = row
+            cur.execute(f"select rowid, {self.index.column} from {self.index.table} where rowid > ? and rowid <= ? order by rowid limit ?", (done_rowid, last_rowid, self.batch_size))
+            rows = cur.fetchall()
+            if rows:
+                cur.executemany(f"insert into {self.index.fts_table} (rowid, {self.index.column}) values (?, ?)", rows)
+            if len(rows) < self.batch_size:
+                cur.execute("delete from fts_backfill where fts_table = ?", (self.index.fts_table,))
+            else:
+                cur.execute("update fts_backfill set done_rowid = ? where fts_table = ?", (rows[-1][0], self.index.fts_table))
+            conn.commit()
+            self.indexed += len(rows)
+            return len(rows) == self.batch_size
+        except Error:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def _run(self) -> None:
+        try:
+            conn = sqlite3.connect(self.db_filename, timeout=30)
+        except Error as e:
+            print(f"Не удалось открыть базу данных {self.db_filename} для индексации: {e}")
+            return
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if not self.step(conn):
+                        break
+                except OperationalError as e: # база занята - повторим позже
+                    print(f"Индексация {self.index.table} приостановлена: {e}")
+                    self._stopping.wait(1.0)
+                    continue
+                self._stopping.wait(BACKFILL_PAUSE)
+            if self.indexed > 0:
+                print(f"Проиндексировано строк таблицы {self.index.table}: {self.indexed}.")
+        except Error as e:
+            print(f"Ошибка при индексации таблицы {self.index.table}: {e}")
+        finally:
+            conn.close()
+
+class ChatSearch:
+    """
+    * Поиск по нескольким базам данных с общим ранжированием
+    """
+
+    def __init__(self, sources: list, page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        * @param sources Список пар (файл базы данных, FtsIndex)
+        * @param page_size Результатов на одной странице
+        """
+        self.sources = sources
+        self.page_size = page_size if page_size > 0 else DEFAULT_PAGE_SIZE
+
+    def _query(self, db_filename: str, index: FtsIndex, query: str, limit: int, user_id: int):
+        with_user: bool = index.table == USER_MESSAGES_FTS.table
+        sql: str = (
+            f"select {index.fts_table}.rowid, t.date_create, snippet({index.fts_table}, 0, '[', ']', '...', {SNIPPET_TOKENS}), {index.fts_table}.rank, {'t.user_id' if with_user else 'null'} "
+            f"from {index.fts_table} join {index.table} t on t.rowid = {index.fts_table}.rowid "
+            f"where {index.fts_table} match ?"
+        )
+        params = [query]
+        if with_user and user_id is not None:
+            sql += " and t.user_id = ?"
+            params.append(user_id)
+        sql += f" order by {index.fts_table}.rank limit ?"
+        params.append(limit)
+        try:
+            with closing(sqlite3.connect(f"file:{db_filename}?mode=ro", uri=True, timeout=5)) as conn:
+                return [SearchHit(index.source, *row) for row in conn.execute(sql, params)]
+        except OperationalError: # базы данных или индекса ещё нет
+            return []
+
+    def search(self, terms: str, page: int = 1, user_id: int = None):
+        """
+        * Поиск сообщений
+        *
+        * @param terms Слова через пробел ("слово*" - по началу слова)
+        * @param page Номер страницы (с 1)
+        * @param user_id Искать сообщения Telegram только этого пользователя (None - всех)
+        * @return Список SearchHit для страницы, есть ли следующая страница
+        """
+        query: str = build_query(terms)
+        if "".__eq__(query):
+            return [], False
+        page = max(page, 1)
+        limit: int = page * self.page_size + 1 # на одну запись больше - чтобы узнать, есть ли следующая страница
+        hits = heapq.merge(*(self._query(db_filename, index, query, limit, user_id) for db_filename, index in self.sources), key=lambda hit: hit.rank)
+        hits = list(hit for _, hit in zip(range(limit), hits))
+        return hits[(page - 1) * self.page_size:page * self.page_size], len(hits) == limit
@@ -0,0 +1,261 @@
+"""
+* Класс "Планировщик исходящих сообщений Telegram"
+* *************************
+* Все обращения к Telegram Bot API на отправку проходят через общую
+* очередь. Скорость отправки ограничивается глобальным "ведром токенов"
+* (около 30 сообщений в секунду) и отдельными "вёдрами" для каждого чата
+* (около 1 сообщения в секунду для личных чатов и 20 в минуту для групп).
+* Порядок сообщений внутри одного чата сохраняется, а при ответе 429
+* (Too Many Requests) отправка в чат откладывается на время retry_after.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple, deque
+from concurrent.futures import Future
+
+from metrics import get_metrics
+
+SendStats = namedtuple("SendStats", ["queued", "chats", "sent", "failed", "throttled", "avg_latency", "max_latency"])
+SendTask = namedtuple("SendTask", ["future", "func", "args", "kwargs", "submitted", "attempt"])
+DEFAULT_GLOBAL_RATE: float = 30 # сообщений в секунду для всего бота
+DEFAULT_CHAT_RATE: float = 1 # сообщений в секунду для личного чата
+DEFAULT_GROUP_RATE: float = 20 # сообщений в минуту для группы
+DEFAULT_CHAT_BURST: int = 3 # сколько сообщений подряд можно отправить в чат без ожидания
+DEFAULT_WORKERS: int = 4 # количество потоков, выполняющих отправку
+MAX_RETRIES: int = 5 # максимальное количество повторов после ответа 429
+BUCKET_IDLE_TIME: float = 60 # через сколько секунд простоя "ведро" чата удаляется
+
+class TokenBucket:
+    """
+    * "Ведро токенов" для ограничения частоты запросов
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate # токенов в секунду
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        * Сколько секунд нужно подождать до появления токена
+        """
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """
+        * Изъятие токена (предварительно нужно проверить delay())
+        """
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class SendScheduler:
+
+    def __init__(self, global_rate: float = DEFAULT_GLOBAL_RATE, chat_rate: float = DEFAULT_CHAT_RATE, group_rate: float = DEFAULT_GROUP_RATE, chat_burst: int = DEFAULT_CHAT_BURST, workers: int = DEFAULT_WORKERS):
+        """
+        * @param global_rate Сообщений в секунду для всего бота
+        * @param chat_rate Сообщений в секунду для личного чата
+        * @param group_rate Сообщений в минуту для группового чата
+        * @param chat_burst Сколько сообщений подряд можно отправить в один чат
+        * @param workers Количество потоков отправки
+        """
+        self.chat_rate = chat_rate if chat_rate > 0 else DEFAULT_CHAT_RATE
+        self.group_rate = (group_rate if group_rate > 0 else DEFAULT_GROUP_RATE) / 60
+        self.chat_burst = chat_burst if chat_burst > 0 else DEFAULT_CHAT_BURST
+        self.workers = workers if workers > 0 else DEFAULT_WORKERS
+        global_rate = global_rate if global_rate > 0 else DEFAULT_GLOBAL_RATE
+        self.sent: int = 0 # успешно отправлено
+        self.failed: int = 0 # не удалось отправить
+        self.throttled: int = 0 # сколько раз получен ответ 429
+        self.max_latency: float = 0.0 # максимальное время от постановки в очередь до отправки (в секундах)
+        self._latency_sum: float = 0.0
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._buckets = {} # "вёдра" чатов
+        self._chats = {} # очереди сообщений чатов
+        self._ready = [] # куча (время готовности, порядковый номер, чат)
+        self._in_flight = set() # чаты, сообщение которых отправляется прямо сейчас
+        self._queued: int = 0
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping: bool = False
+        self._pruned_at: float = time.monotonic()
+
+    def start(self) -> None:
+        """
+        * Запуск потоков отправки
+        """
+        if self._threads:
+            return
+        get_metrics().gauge("telegram_send_queue_depth", lambda: self._queued)
+        get_metrics().gauge("telegram_send_chats", lambda: len(self._chats))
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"SendScheduler-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, chat_id: int, func, *args, **kwargs) -> Future:
+        """
+        * Постановка обращения к Telegram API в очередь чата
+        *
+        * @param chat_id Идентификатор чата (для соблюдения порядка и лимитов)
+        * @param func Функция отправки (например, bot.send_message)
+        * @return Future с результатом функции
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._stopping:
+                future.set_exception(RuntimeError("Планировщик отправки остановлен"))
+                return future
+            chat_queue = self._chats.get(chat_id)
+            if chat_queue is None:
+                chat_queue = deque()
+                self._chats[chat_id] = chat_queue
+            chat_queue.append(SendTask(future, func, args, kwargs, time.monotonic(), 0))
+            self._queued += 1
+            if len(chat_queue) == 1 and chat_id not in self._in_flight:
+                self._schedule(chat_id, time.monotonic())
+            self._cond.notify()
+        return future
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка планировщика с отправкой накопленных сообщений
+        *
+        * @param timeout Максимальное время ожидания (в секундах)
+        """
+        deadline: float = time.monotonic() + timeout
+        with self._cond:
+            self._stopping = True
+            while (self._queued > 0 or self._in_flight) and time.monotonic() < deadline:
+                self._cond.wait(min(0.1, max(0.0, deadline - time.monotonic())))
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def stats(self) -> SendStats:
+        """
+        * Статистика отправки
+        *
+        * @return Длина очереди, количество чатов в очереди, отправлено, ошибок, ответов 429, среднее и максимальное время ожидания
+        """
+        with self._cond:
+            completed: int = self.sent + self.failed
+            return SendStats(self._queued, len(self._chats), self.sent, self.failed, self.throttled, self._latency_sum / completed if completed > 0 else 0.0, self.max_latency)
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            rate: float = self.group_rate if chat_id < 0 else self.chat_rate # у групп отрицательный идентификатор
+            bucket = TokenBucket(rate, self.chat_burst)
+            self._buckets[chat_id] = bucket
+        return bucket
+
+    def _schedule(self, chat_id: int, not_before: float) -> None:
+        heapq.heappush(self._ready, (max(not_before, time.monotonic() + self._bucket(chat_id).delay(time.monotonic())), next(self._sequence), chat_id))
+
+    def _prune(self, now: float) -> None:
+        if now - self._pruned_at < BUCKET_IDLE_TIME:
+            return
+        self._pruned_at = now
+        for chat_id in [c for c, b in self._buckets.items() if c not in self._chats and b.is_full(now)]:
+            del self._buckets[chat_id]
+
+    def _next_task(self):
+        with self._cond:
+            while True:
+                now: float = time.monotonic()
+                if self._stopping and self._queued == 0:
+                    return None, None
+                wait: float = 1.0
+                if self._ready:
+                    ready_at, _, chat_id = self._ready[0]
+                    wait = max(ready_at - now, self._global_bucket.delay(now))
+                    if wait <= 0:
+                        heapq.heappop(self._ready)
+                        self._global_bucket.take(now)
+                        self._bucket(chat_id).take(now)
+                        self._in_flight.add(chat_id)
+                        self._queued -= 1
+                        return chat_id, self._chats[chat_id].popleft()
+                self._prune(now)
+                self._cond.wait(min(wait, 1.0))
+
+    def _run(self) -> None:
+        while True:
+            chat_id, task = self._next_task()
+            if task is None:
+                return
+            retry_after: float = 0
+            started: float = time.perf_counter()
+            try:
+                result = task.func(*task.args, **task.kwargs)
+            except Exception as e:
+                get_metrics().observe("telegram_send_seconds", time.perf_counter() - started, True)
+                retry_after = self._retry_after(e)
+                if retry_after <= 0 or task.attempt >= MAX_RETRIES:
+                    self._complete(chat_id, task, None, e)
+                    continue
+            else:
+                get_metrics().observe("telegram_send_seconds", time.perf_counter() - started, False)
+                self._complete(chat_id, task, result, None)
+                continue
+            with self._cond: # ответ 429 - сообщение возвращается в начало очереди чата
+                self.throttled += 1
+                self._chats[chat_id].appendleft(task._replace(attempt=task.attempt + 1))
+                self._queued += 1
+                self._in_flight.discard(chat_id)
+                self._schedule(chat_id, time.monotonic() + retry_after)
+                self._cond.notify()
+
+    @staticmethod
+    def _retry_after(error: Exception) -> float:
+        """
+        * Время ожидания из ответа 429 (0 - если это другая ошибка)
+        """
+        if getattr(error, "error_code", None) != 429:
+            return 0
+        try:
+            return float(error.result_json["parameters"]["retry_after"])
+        except Exception:
+            return 1.0
+
+    def _complete(self, chat_id: int, task: SendTask, result, error: Exception) -> None:
+        latency: float = time.monotonic() - task.submitted
+        get_metrics().observe("telegram_send_queue_seconds", latency, error is not None)
+        with self._cond:
+            if error is None:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._latency_sum += latency
+            self.max_latency = max(self.max_latency, latency)
+            self._in_flight.discard(chat_id)
+            if self._chats[chat_id]:
+                self._schedule(chat_id, time.monotonic())
+            else:
+                del self._chats[chat_id]
+            self._cond.notify_all()
+        if error is None:
+            task.future.set_result(result)
+        else:
+            task.future.set_exception(error)
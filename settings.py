@@ -0,0 +1,179 @@
+"""
+* Класс для работы с файлом настроек программы
+* *************************
+* Файл настроек читается один раз при запуске и хранится в памяти
+* в виде неизменяемого снимка. Повторно файл перечитывается только
+* при изменении времени его модификации (mtime) или по сигналу SIGHUP.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import configparser
+import os
+import signal
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+SettingsStats = namedtuple("SettingsStats", ["reload_count", "last_reload", "mtime"])
+CHECK_INTERVAL: float = 1.0 # как часто (в секундах) проверять mtime файла настроек
+
+class SettingsSnapshot:
+    """
+    * Неизменяемый снимок файла настроек
+    """
+
+    __slots__ = ("sections", "mtime", "loaded_at")
+
+    def __init__(self, config: configparser.ConfigParser, mtime: int, loaded_at: float):
+        object.__setattr__(self, "sections", MappingProxyType({
+            section: MappingProxyType(dict(config[section])) for section in config.sections()
+        }))
+        object.__setattr__(self, "mtime", mtime)
+        object.__setattr__(self, "loaded_at", loaded_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Снимок настроек изменять нельзя")
+
+    def __contains__(self, section: str) -> bool:
+        return section in self.sections
+
+    def has(self, section: str, option: str) -> bool:
+        """
+        * Проверка наличия параметра в секции
+        *
+        * @param section Имя секции
+        * @param option Имя параметра
+        * @return True, если параметр задан
+        """
+        return section in self.sections and option in self.sections[section]
+
+    def get(self, section: str, option: str, fallback: str = "") -> str:
+        """
+        * Получение строкового значения параметра
+        *
+        * @param section Имя секции
+        * @param option Имя параметра
+        * @param fallback Значение по умолчанию
+        * @return Значение параметра без пробелов по краям
+        """
+        if not self.has(section, option):
+            return fallback
+        return self.sections[section][option].strip()
+
+    def getint(self, section: str, option: str, fallback: int = 0) -> int:
+        """
+        * Получение целочисленного значения параметра
+        * (при неверном значении возбуждается ValueError)
+        """
+        if not self.has(section, option):
+            return fallback
+        return int(self.get(section, option))
+
+    def getfloat(self, section: str, option: str, fallback: float = 0.0) -> float:
+        """
+        * Получение вещественного значения параметра
+        * (при неверном значении возбуждается ValueError)
+        """
+        if not self.has(section, option):
+            return fallback
+        return float(self.get(section, option))
+
+    def getbool(self, section: str, option: str, fallback: bool = False) -> bool:
+        """
+        * Получение логического значения параметра ("Y" - да, всё остальное - нет)
+        """
+        if not self.has(section, option):
+            return fallback
+        return self.get(section, option).upper() == "Y"
+
+class Settings:
+    """
+    * Кэш настроек программы, отслеживающий изменения файла
+    """
+
+    def __init__(self, filename: str, encoding: str):
+        self.filename = filename
+        self.encoding = encoding
+        self.reload_count: int = 0 # сколько раз файл был перечитан после первой загрузки
+        self.last_reload: float = 0.0 # время последней загрузки (Unix time)
+        self._snapshot: SettingsSnapshot = None
+        self._checked_at: float = 0.0
+        self._reload_requested: bool = False
+        self._lock = threading.Lock()
+
+    def _mtime(self) -> int:
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, mtime: int) -> SettingsSnapshot:
+        config = configparser.ConfigParser()
+        with open(self.filename, 'r', encoding=self.encoding) as f:
+            config.read_file(f)
+        return SettingsSnapshot(config, mtime, time.time())
+
+    def get(self) -> SettingsSnapshot:
+        """
+        * Получение актуального снимка настроек
+        * (файл перечитывается только при изменении mtime или по SIGHUP)
+        *
+        * @return Снимок настроек
+        """
+        snapshot = self._snapshot
+        now: float = time.monotonic()
+        if snapshot is not None and not self._reload_requested and now - self._checked_at < CHECK_INTERVAL:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            self._checked_at = now
+            mtime = self._mtime()
+            if snapshot is not None and not self._reload_requested and (mtime is None or mtime == snapshot.mtime):
+                return snapshot # файл не изменился (или временно недоступен) - работаем со старым снимком
+            self._reload_requested = False
+            try:
+                new_snapshot: SettingsSnapshot = self._load(mtime)
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                print(f"Ошибка при повторном чтении файла настроек, используются прежние значения: {e}")
+                return snapshot
+            if snapshot is not None:
+                self.reload_count += 1
+                print(f"Файл настроек перечитан (перезагрузка № {self.reload_count}).")
+            self.last_reload = new_snapshot.loaded_at
+            self._snapshot = new_snapshot
+            return new_snapshot
+
+    def request_reload(self) -> None:
+        """
+        * Запрос на принудительное перечитывание файла при следующем обращении
+        """
+        self._reload_requested = True
+
+    def install_signal_handler(self) -> bool:
+        """
+        * Установка обработчика SIGHUP (только для главного потока и ОС, где есть SIGHUP)
+        *
+        * @return True, если обработчик установлен
+        """
+        if not hasattr(signal, "SIGHUP"):
+            return False
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
+        except ValueError: # вызов не из главного потока
+            return False
+        return True
+
+    def stats(self) -> SettingsStats:
+        """
+        * Статистика перезагрузок файла настроек
+        *
+        * @return Количество перезагрузок, время последней загрузки, mtime файла
+        """
+        snapshot = self._snapshot
+        return SettingsStats(self.reload_count, self.last_reload, snapshot.mtime if snapshot is not None else None)
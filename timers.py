@@ -0,0 +1,213 @@
+"""
+* Класс "Планировщик таймеров"
+* *************************
+* Все таймеры обслуживаются одним потоком: ближайший таймер берётся
+* из кучи (heapq), а поток спит до его срока. Таймеры сохраняются
+* в базу данных "timers.db" фоновым потоком (см. класс DBWriter)
+* и загружаются при запуске; просроченные за время простоя таймеры
+* срабатывают сразу после запуска. Отменённые таймеры удаляются из
+* кучи "лениво" - при извлечении.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from dbwriter import DBWriter, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL
+
+Timer = namedtuple("Timer", ["timer_id", "chat_id", "due_at", "text"])
+TimerStats = namedtuple("TimerStats", ["pending", "chats", "fired", "cancelled"])
+DEFAULT_TIMER_QUEUE_SIZE: int = 100000 # очередь записи в БД (таймеры могут ставиться пачками)
+MAX_WAIT: float = 60 # максимальное время сна потока (на случай перевода системных часов)
+COMPACT_THRESHOLD: int = 1024 # сколько "мёртвых" записей допускается в куче до её перестроения
+_ADD: str = "add"
+_DELETE: str = "delete"
+
+class TimerScheduler(DBWriter):
+    DB_FILENAME: str = "timers.db" # база данных для хранения таймеров
+
+    def __init__(self, on_fire, db_filename: str = DB_FILENAME, queue_size: int = DEFAULT_TIMER_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        * @param on_fire Функция, вызываемая при срабатывании таймера: on_fire(timer)
+        """
+        DBWriter.__init__(self, db_filename, queue_size, batch_size, flush_interval)
+        self.on_fire = on_fire
+        self.fired: int = 0 # сработало таймеров
+        self.cancelled: int = 0 # отменено таймеров
+        self._timers = {} # идентификатор -> Timer
+        self._by_chat = {} # чат -> множество идентификаторов таймеров
+        self._heap = [] # куча (срок, идентификатор)
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stopping: bool = False
+        self._scheduler_thread: threading.Thread = None
+
+    def migrate(self, cur: sqlite3.Cursor) -> None:
+        cur.execute('''
+            create table if not exists timers (
+              timer_id integer primary key not null,
+              chat_id integer not null,
+              due_at real not null,
+              text text,
+              date_create text not null default current_timestamp
+            )
+        ''')
+        cur.execute("select timer_id, chat_id, due_at, text from timers")
+        with self._cond:
+            for row in cur.fetchall():
+                timer: Timer = Timer(*row)
+                self._register(timer)
+                self._heap.append((timer.due_at, timer.timer_id))
+            heapq.heapify(self._heap)
+            self._ids = itertools.count(max(self._timers, default=0) + 1)
+
+    def write_batch(self, cur: sqlite3.Cursor, items: list) -> None:
+        for operation, timer in items: # порядок операций важен (добавление и удаление одного таймера)
+            if operation == _ADD:
+                cur.execute("insert or replace into timers (timer_id, chat_id, due_at, text) values (?, ?, ?, ?)", timer)
+            else:
+                cur.execute("delete from timers where timer_id = ?", (timer.timer_id,))
+
+    def start(self) -> bool:
+        """
+        * Загрузка сохранённых таймеров и запуск потока планировщика
+        *
+        * @return True, если планировщик запущен
+        """
+        if not DBWriter.start(self):
+            return False
+        if self._scheduler_thread is None:
+            self._scheduler_thread = threading.Thread(target=self._run_timers, name="TimerScheduler", daemon=True)
+            self._scheduler_thread.start()
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        * Остановка планировщика (невыполненные таймеры остаются в БД)
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._scheduler_thread is not None:
+            self._scheduler_thread.join(timeout)
+            self._scheduler_thread = None
+        DBWriter.close(self, timeout)
+
+    def add(self, chat_id: int, seconds: float, text: str) -> Timer:
+        """
+        * Установка таймера
+        *
+        * @param chat_id Идентификатор чата
+        * @param seconds Через сколько секунд таймер сработает
+        * @param text Текст сообщения при срабатывании
+        * @return Установленный таймер
+        """
+        with self._cond:
+            timer: Timer = Timer(next(self._ids), chat_id, time.time() + seconds, text)
+            self._register(timer)
+            heapq.heappush(self._heap, (timer.due_at, timer.timer_id))
+            if self._heap[0][1] == timer.timer_id: # новый таймер - ближайший
+                self._cond.notify()
+        if not self.put((_ADD, timer)):
+            print(f"Таймер {timer.timer_id} не будет сохранён в БД: очередь записи переполнена.")
+        return timer
+
+    def cancel(self, chat_id: int, timer_id: int) -> bool:
+        """
+        * Отмена таймера
+        *
+        * @param chat_id Идентификатор чата (отменять можно только свои таймеры)
+        * @param timer_id Идентификатор таймера
+        * @return True, если таймер отменён
+        """
+        with self._cond:
+            timer: Timer = self._timers.get(timer_id)
+            if timer is None or timer.chat_id != chat_id:
+                return False
+            self._unregister(timer)
+            self.cancelled += 1
+            self._compact()
+        self.put((_DELETE, timer))
+        return True
+
+    def cancel_all(self, chat_id: int) -> int:
+        """
+        * Отмена всех таймеров чата
+        *
+        * @return Количество отменённых таймеров
+        """
+        with self._cond:
+            timers = [self._timers[timer_id] for timer_id in self._by_chat.get(chat_id, ())]
+            for timer in timers:
+                self._unregister(timer)
+            self.cancelled += len(timers)
+            self._compact()
+        for timer in timers:
+            self.put((_DELETE, timer))
+        return len(timers)
+
+    def list(self, chat_id: int) -> list:
+        """
+        * Таймеры чата в порядке срабатывания
+        *
+        * @return Список Timer
+        """
+        with self._cond:
+            return sorted((self._timers[timer_id] for timer_id in self._by_chat.get(chat_id, ())), key=lambda timer: timer.due_at)
+
+    def timer_stats(self) -> TimerStats:
+        with self._cond:
+            return TimerStats(len(self._timers), len(self._by_chat), self.fired, self.cancelled)
+
+    def _register(self, timer: Timer) -> None:
+        self._timers[timer.timer_id] = timer
+        self._by_chat.setdefault(timer.chat_id, set()).add(timer.timer_id)
+
+    def _unregister(self, timer: Timer) -> None:
+        del self._timers[timer.timer_id] # запись в куче станет "мёртвой" и будет пропущена
+        chat_timers: set = self._by_chat[timer.chat_id]
+        chat_timers.discard(timer.timer_id)
+        if not chat_timers:
+            del self._by_chat[timer.chat_id]
+
+    def _compact(self) -> None:
+        """
+        * Удаление из кучи отменённых таймеров, если их стало слишком много
+        """
+        if len(self._heap) - len(self._timers) > max(COMPACT_THRESHOLD, len(self._timers)):
+            self._heap = [entry for entry in self._heap if entry[1] in self._timers]
+            heapq.heapify(self._heap)
+
+    def _next_due(self):
+        with self._cond:
+            while not self._stopping:
+                while self._heap and self._heap[0][1] not in self._timers: # отменённые таймеры
+                    heapq.heappop(self._heap)
+                now: float = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    timer: Timer = self._timers[heapq.heappop(self._heap)[1]]
+                    self._unregister(timer)
+                    self.fired += 1
+                    return timer
+                self._cond.wait(min(self._heap[0][0] - now, MAX_WAIT) if self._heap else MAX_WAIT)
+            return None
+
+    def _run_timers(self) -> None:
+        while True:
+            timer: Timer = self._next_due()
+            if timer is None:
+                return
+            try:
+                self.on_fire(timer)
+            except Exception as e:
+                print(f"Ошибка при срабатывании таймера {timer.timer_id}: {e}")
+                traceback.print_exc()
+            self.put((_DELETE, timer))
@@ -0,0 +1,186 @@
+"""
+* Класс "Приёмник обновлений Telegram (webhook)"
+* *************************
+* Вместо периодического опроса (long polling) Telegram сам присылает
+* обновления POST-запросами на адрес бота. Локальный HTTP(S)-сервер
+* проверяет секретный заголовок X-Telegram-Bot-Api-Secret-Token,
+* сразу отвечает 200 и передаёт обновление тем же обработчикам,
+* что и при опросе (bot.process_new_updates). Запросы обслуживаются
+* пулом из заданного количества потоков.
+* Программа является кроссплатформенной. Она должна работать
+* под Microsoft Windows, Linux, macOS и т.д.
+*
+* @author Ефремов А. В., 18.10.2026
+"""
+
+import hmac
+import json
+import ssl
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from telebot.types import Update
+
+WebhookStats = namedtuple("WebhookStats", ["received", "rejected", "invalid", "errors"])
+SECRET_HEADER: str = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_LISTEN: str = "127.0.0.1"
+DEFAULT_PORT: int = 8443
+DEFAULT_PATH: str = "/telegram"
+DEFAULT_WORKERS: int = 4 # количество потоков, обслуживающих запросы
+MAX_BODY_SIZE: int = 1048576 # максимальный размер обновления (в байтах)
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    server_version = "YourFriendlyBot"
+
+    def do_POST(self):
+        webhook: "WebhookServer" = self.server.webhook
+        if self.path.split("?", 1)[0] != webhook.path:
+            self._reply(404)
+            return
+        if webhook.secret_token and not hmac.compare_digest(self.headers.get(SECRET_HEADER, ""), webhook.secret_token):
+            webhook.count("rejected")
+            self._reply(403)
+            return
+        try:
+            length: int = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if not (0 < length <= MAX_BODY_SIZE):
+            webhook.count("invalid")
+            self._reply(400)
+            return
+        try:
+            update: Update = Update.de_json(json.loads(self.rfile.read(length).decode("utf-8")))
+        except (ValueError, UnicodeDecodeError, TypeError, KeyError) as e:
+            webhook.count("invalid")
+            print(f"Получено некорректное обновление Telegram: {e}")
+            self._reply(400)
+            return
+        self._reply(200) # Telegram не должен ждать выполнения команды
+        webhook.dispatch(update)
+
+    def do_GET(self):
+        self._reply(405)
+
+    def _reply(self, code: int) -> None:
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args): # журнал запросов не нужен (каждое сообщение и так выводится)
+        pass
+
+class _PooledHTTPServer(HTTPServer):
+    """
+    * HTTP-сервер, обслуживающий запросы пулом потоков
+    """
+
+    def __init__(self, server_address, workers: int):
+        HTTPServer.__init__(self, server_address, _WebhookHandler)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="Webhook")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class WebhookServer:
+
+    def __init__(self, bot, secret_token: str = "", listen: str = DEFAULT_LISTEN, port: int = DEFAULT_PORT, path: str = DEFAULT_PATH, workers: int = DEFAULT_WORKERS, certfile: str = "", keyfile: str = ""):
+        """
+        * @param bot Экземпляр бота (обновления передаются в bot.process_new_updates)
+        * @param secret_token Секретный токен (пустая строка - без проверки заголовка)
+        * @param listen Адрес, на котором принимаются запросы
+        * @param port Порт
+        * @param path Путь, на который Telegram присылает обновления
+        * @param workers Количество потоков, обслуживающих запросы
+        * @param certfile Файл сертификата для HTTPS (пустая строка - HTTP, например, за reverse proxy)
+        * @param keyfile Файл закрытого ключа для HTTPS
+        """
+        self.bot = bot
+        self.secret_token = secret_token
+        self.listen = listen
+        self.port = port
+        self.path = path if path.startswith("/") else f"/{path}"
+        self.workers = workers if workers > 0 else DEFAULT_WORKERS
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.received: int = 0 # принято обновлений
+        self.rejected: int = 0 # отклонено из-за неверного секретного токена
+        self.invalid: int = 0 # некорректных запросов
+        self.errors: int = 0 # ошибок при обработке обновлений
+        self._lock = threading.Lock()
+        self._server: _PooledHTTPServer = None
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def dispatch(self, update: Update) -> None:
+        """
+        * Передача обновления обработчикам бота
+        """
+        self.count("received")
+        try:
+            self.bot.process_new_updates([update])
+        except Exception as e:
+            self.count("errors")
+            print(f"Ошибка при обработке обновления Telegram: {e}")
+            traceback.print_exc()
+
+    def start(self) -> int:
+        """
+        * Открытие порта (запросы начинают обслуживаться после вызова serve_forever())
+        *
+        * @return Номер порта (полезно, если задан порт 0)
+        """
+        self._server = _PooledHTTPServer((self.listen, self.port), self.workers)
+        self._server.webhook = self
+        if self.certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile, self.keyfile or None)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.port = self._server.server_address[1]
+        return self.port
+
+    def serve_forever(self) -> None:
+        """
+        * Обслуживание запросов до вызова stop()
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """
+        * Остановка сервера (можно вызывать из любого потока, в том числе из обработчика команды)
+        """
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self) -> None:
+        """
+        * Закрытие порта сервера, для которого не вызывался serve_forever()
+        * (shutdown() в этом случае ждал бы завершения цикла обслуживания вечно)
+        """
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+
+    def stats(self) -> WebhookStats:
+        with self._lock:
+            return WebhookStats(self.received, self.rejected, self.invalid, self.errors)